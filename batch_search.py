@@ -0,0 +1,233 @@
+"""
+Пакетний пошук без Qt: запити з файлу або stdin, результати як JSON lines.
+
+Запити виконуються паралельно пулом потоків з тими самими ключами кешу,
+проєкцією полів і режимами групування, що й у вікні, тож прогін
+заздалегідь наповнює search_cache.json для застосунку. За замовчуванням
+кеш прогону обмежений лише розміром (16 МБ), тож зберігаються сторінки
+всіх запитів, що вміщуються; вікно при запуску бере з файлу щонайбільше
+DEFAULT_MAX_ENTRIES (256) записів, останніх за часом використання. Кожен рядок
+виводу — один запит:
+    {"index": 0, "query": "...", "books": 20, "groups": [{"group": ..., "books": [...]}],
+     "pages_fetched": 1, "pages_cached": 0, "pages_shared": 0, "seconds": 0.42}
+або {"index": ..., "query": ..., "error": "..."} у разі помилки. Підсумок
+з кількістю запитів за секунду (і лічильниками HTTP: повтори, очікування
+обмежувача частоти, повторно використані з'єднання) виводиться в stderr.
+
+Запуск:
+    python batch_search.py titles.txt [--workers 8] [--group "Group by Author"] [--pages 2]
+    cat titles.txt | python batch_search.py - --catalog ~/.book_recommender/catalog.sqlite3
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from book_grouping import GROUP_MODES, NO_GROUPING, group_books
+from book_records import BookRecord, merge_record_pages, parse_volumes
+from books_api import DEFAULT_PAGE_SIZE, FIELD_PROJECTIONS, MAX_PAGE_SIZE, SEARCH_PROJECTION
+from http_transport import DEFAULT_RATE, HttpTransport
+from search_backends import GoogleBooksBackend
+from search_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, DEFAULT_SEARCH_CACHE_PATH, SearchCache
+from single_flight import SingleFlight
+
+
+def read_queries(stream):
+    """
+    Читає запити по одному в рядку, пропускаючи порожні рядки і коментарі (#).
+
+    Yields:
+        str: Запит без пробілів по краях.
+    """
+    for line in stream:
+        query = line.strip()
+        if query and not query.startswith("#"):
+            yield query
+
+
+def record_to_dict(record):
+    """
+    Повертає поля запису BookRecord як словник для JSON.
+    """
+    return {
+        "title": record.title,
+        "authors": list(record.authors),
+        "date": record.date,
+        "rating": record.rating,
+        "poster": record.poster,
+        "volume_id": record.volume_id,
+    }
+
+
+def search_query(query, backend, cache=None, pages=1, projection=SEARCH_PROJECTION, flights=None):
+    """
+    Виконує один пошук так само, як SearchWorker у вікні, але послідовно по сторінках.
+
+    Свіжий запис кешу використовується без запиту; застарілий, на відміну
+    від вікна, завантажується знову, бо прогін має оновити кеш.
+    Наступні сторінки не запитуються, якщо попередня виявилася неповною.
+
+    Args:
+        query (str): Запит пошуку.
+        backend (SearchBackend): Джерело результатів.
+        cache (SearchCache, optional): Кеш відповідей; використовується, лише якщо джерело кешоване.
+        pages (int, optional): Кількість сторінок.
+        projection (str, optional): Назва проєкції полів з FIELD_PROJECTIONS.
+        flights (SingleFlight, optional): Спільні завантаження: та сама сторінка (за ключем
+            кешу), яку вже завантажує інший потік, не запитується вдруге.
+
+    Returns:
+        tuple: (список BookRecord, stats з pages_fetched, pages_cached і pages_shared).
+    """
+    cache = cache if backend.cacheable else None
+    page_size = MAX_PAGE_SIZE if pages > 1 else DEFAULT_PAGE_SIZE
+    stats = {"pages_fetched": 0, "pages_cached": 0, "pages_shared": 0}
+    record_pages = {}
+    for page in range(max(1, pages)):
+        start_index = page * page_size
+        key = SearchCache.make_key(query, page_size, start_index, projection)
+        data = None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None and not cached[1]:
+                data = cached[0]
+                stats["pages_cached"] += 1
+        if data is None:
+            def fetch(cancel_event, start_index=start_index):
+                return backend.search(query, page_size, start_index, fields=FIELD_PROJECTIONS[projection])[0]
+
+            if flights is None:
+                data, shared = fetch(None), False
+            else:
+                data, shared = flights.do((backend.name, key), fetch)
+            stats["pages_shared" if shared else "pages_fetched"] += 1
+            if cache is not None and not shared:
+                cache.put(key, data)
+        record_pages[page] = parse_volumes(data, BookRecord)
+        if len(data.get("items", [])) < page_size:
+            break
+    return merge_record_pages(record_pages), stats
+
+
+def run_batch(queries, backend, out, cache=None, workers=8, group_mode=NO_GROUPING, pages=1):
+    """
+    Виконує запити паралельно і пише результат кожного рядком JSON у out.
+
+    Запити читаються з ітератора поступово: одночасно в роботі не більше
+    2 * workers запитів, тож список з тисяч назв не тримається в пам'яті
+    повністю. Рядки виводяться в порядку завершення; поле index — номер
+    запиту у вхідному списку.
+
+    Args:
+        queries (iterable): Запити.
+        backend (SearchBackend): Джерело результатів.
+        out: Текстовий потік для JSON lines.
+        cache (SearchCache, optional): Кеш відповідей.
+        workers (int, optional): Кількість потоків.
+        group_mode (str, optional): Один з GROUP_MODES.
+        pages (int, optional): Кількість сторінок на запит.
+
+    Однакові (після нормалізації) запити, що виконуються одночасно,
+    завантажують кожну сторінку один раз.
+
+    Returns:
+        dict: queries, errors, books, pages_shared (придушені дублікати), seconds, queries_per_second.
+    """
+    summary = {"queries": 0, "errors": 0, "books": 0}
+    write_lock = threading.Lock()
+    flights = SingleFlight()
+
+    def run_one(index, query):
+        start = time.perf_counter()
+        try:
+            records, stats = search_query(query, backend, cache, pages, flights=flights)
+        except Exception as e:
+            line = {"index": index, "query": query, "error": str(e)}
+            records = None
+        else:
+            line = {
+                "index": index,
+                "query": query,
+                "books": len(records),
+                "groups": [{"group": key, "books": [record_to_dict(record) for record in books]}
+                           for key, books in group_books(records, group_mode)],
+                **stats,
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+        text = json.dumps(line, ensure_ascii=False)
+        with write_lock:
+            out.write(text + "\n")
+            out.flush()
+            summary["queries"] += 1
+            if records is None:
+                summary["errors"] += 1
+            else:
+                summary["books"] += len(records)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for index, query in enumerate(queries):
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()  # помилка запису (наприклад, закритий stdout) зупиняє прогін
+            pending.add(executor.submit(run_one, index, query))
+        for future in wait(pending).done:
+            future.result()
+    elapsed = time.perf_counter() - start
+    summary["pages_shared"] = flights.shared
+    summary["seconds"] = round(elapsed, 3)
+    summary["queries_per_second"] = round(summary["queries"] / elapsed, 2) if elapsed else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетний пошук книг без інтерфейсу (JSON lines у stdout).")
+    parser.add_argument("files", nargs="*", default=["-"], help="Файли із запитами по одному в рядку; - для stdin")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--group", default=NO_GROUPING, choices=GROUP_MODES)
+    parser.add_argument("--pages", type=int, default=1, help=f"сторінок на запит (по {MAX_PAGE_SIZE} книг, якщо більше 1)")
+    parser.add_argument("--catalog", help="шукати в локальному каталозі замість Google Books")
+    parser.add_argument("--cache", default=DEFAULT_SEARCH_CACHE_PATH, help="файл кешу пошуку")
+    parser.add_argument("--no-cache", action="store_true", help="не читати і не записувати кеш")
+    parser.add_argument("--cache-entries", type=int, default=None,
+                        help=f"розмір кешу в записах; за замовчуванням усі сторінки прогону до "
+                             f"{DEFAULT_MAX_BYTES // (1024 * 1024)} МБ (вікно читає лише {DEFAULT_MAX_ENTRIES} "
+                             f"останніх)")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="найбільше запитів за секунду до API")
+    args = parser.parse_args(argv)
+
+    transport = None
+    if args.catalog:
+        from local_catalog import LocalCatalogBackend
+        backend = LocalCatalogBackend(args.catalog)
+    else:
+        transport = HttpTransport(rate=args.rate, pool_size=args.workers)
+        backend = GoogleBooksBackend(transport)
+    # Кеш записується один раз наприкінці, а не після кожної сторінки; без --cache-entries
+    # прогін не витісняє власні сторінки, доки вони вміщуються в ліміт байтів
+    cache = None if args.no_cache else SearchCache(max_entries=args.cache_entries, path=args.cache, autosave=False)
+
+    def queries():
+        for path in args.files:
+            if path == "-":
+                yield from read_queries(sys.stdin)
+            else:
+                with open(path, encoding="utf-8") as f:
+                    yield from read_queries(f)
+
+    summary = run_batch(queries(), backend, sys.stdout, cache, args.workers, args.group, args.pages)
+    if cache is not None:
+        cache.save()
+        summary["cache"] = cache.stats()
+    if transport is not None:
+        summary["http"] = transport.stats()
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
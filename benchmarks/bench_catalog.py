@@ -0,0 +1,99 @@
+"""
+Локальний каталог: швидкість масового імпорту та час пошуку FTS5.
+
+Запити — 1-3 слова з назви випадкової книги каталогу (користувач шукає
+книгу, яка існує), слова мають частоти за законом Ципфа.
+
+Запуск:
+    python benchmarks/bench_catalog.py [--volumes 1000000] [--queries 200]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # додає корінь проєкту
+
+from local_catalog import LocalCatalogBackend  # noqa: E402
+
+VOCABULARY = 50000
+
+# Слова синтетичного словника з частотами за законом Ципфа, як у природній мові
+_rng = random.Random(42)
+WORDS = ["".join(_rng.choices(string.ascii_lowercase, k=_rng.randint(3, 10))) for _ in range(VOCABULARY)]
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+CATEGORIES = ("Computers", "History", "Fiction", "Science", "Art", "Cooking", "Travel", "Music")
+
+
+def make_volumes(count, seed=0, titles=None):
+    """
+    Генерує томи зі схожим на Google Books складом полів.
+
+    Якщо передано список titles, у нього додається назва кожного сотого тому.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        words = rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=44)
+        if titles is not None and i % 100 == 0:
+            titles.append(words[:4])
+        yield {
+            "id": f"vol{i:08d}",
+            "volumeInfo": {
+                "title": " ".join(words[:4]),
+                "authors": [f"Author {rng.randrange(20000)}"],
+                "categories": [rng.choice(CATEGORIES)],
+                "description": " ".join(words[4:]),
+                "publishedDate": str(1950 + rng.randrange(75)),
+                "imageLinks": {"thumbnail": f"http://books.google.com/books/content?id=vol{i:08d}&zoom=1"},
+            },
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--volumes", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = LocalCatalogBackend(os.path.join(tmp, "catalog.sqlite3"))
+
+        start = time.perf_counter()
+        titles = []
+        catalog.import_volumes(make_volumes(args.volumes, titles=titles), args.batch_size)
+        import_time = time.perf_counter() - start
+        size = os.path.getsize(catalog.path)
+
+        rng = random.Random(1)
+        queries = [" ".join(rng.sample(rng.choice(titles), rng.choice((1, 2, 3)))) for _ in range(args.queries)]
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            catalog.search(query, max_results=20)
+            timings.append((time.perf_counter() - start) * 1000)
+        catalog.close()
+
+    timings.sort()
+    report = {
+        "volumes": args.volumes,
+        "import_seconds": round(import_time, 1),
+        "import_volumes_per_second": round(args.volumes / import_time),
+        "catalog_mb": round(size / 2 ** 20, 1),
+        "queries": len(queries),
+        "query_ms_p50": round(statistics.median(timings), 2),
+        "query_ms_p95": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "query_ms_max": round(timings[-1], 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Декодування обкладинок: потоки проти пулу процесів зі спільною пам'яттю.
+
+Для кожної кількості виконавців (1, 2, 4, ... до кількості ядер) декодує
+той самий набір JPEG-обкладинок двома способами:
+    threads   — decode_cover у ThreadPoolExecutor (як CoverLoader без decoder);
+    processes — CoverDecoder: пул процесів пише пікселі у слоти спільної пам'яті.
+Звіт містить обкладинки за секунду і прискорення відносно одного виконавця.
+
+Окремо вимірюється робота GUI-потоку на одну обкладинку: QImage над
+байтами Thumbnail з copy() (як для кешу) проти QImage над слотом
+спільної пам'яті, в обох випадках з QPixmap.fromImage.
+
+Запуск:
+    python benchmarks/bench_covers.py [--covers 400] [--cover-size 400x600]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # додає корінь проєкту
+
+from fake_books_api import make_cover, size  # noqa: E402
+
+
+def worker_counts(cores):
+    counts = [1]
+    while counts[-1] * 2 <= max(cores, 2):
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores and cores > 1:
+        counts.append(cores)
+    return counts
+
+
+def run_threads(covers, workers):
+    from cover_loader import decode_cover
+
+    with ThreadPoolExecutor(workers) as executor:
+        start = time.perf_counter()
+        list(executor.map(decode_cover, covers))
+        return time.perf_counter() - start
+
+
+def run_processes(covers, workers):
+    from cover_decoder import CoverDecoder
+
+    decoder = CoverDecoder(processes=workers, slots=2 * workers)
+
+    def decode(content):
+        slot, _, height, stride = decoder.decode(content)
+        view = decoder.view(slot, height, stride)
+        view.release()
+        decoder.release(slot)
+
+    try:
+        # Процеси запускаються до заміру, як у застосунку після першої обкладинки
+        with ThreadPoolExecutor(2 * workers) as executor:
+            list(executor.map(decode, covers[:2 * workers]))
+            start = time.perf_counter()
+            list(executor.map(decode, covers))
+            return time.perf_counter() - start
+    finally:
+        decoder.close()
+
+
+def gui_handoff(content, repeats):
+    """
+    Повертає мікросекунди GUI-потоку на обкладинку для обох способів передачі.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5 import sip
+    from PyQt5.QtGui import QImage, QPixmap
+    from PyQt5.QtWidgets import QApplication
+
+    from cover_decoder import CoverDecoder
+    from cover_loader import decode_cover, thumbnail_to_qimage
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    thumb = decode_cover(content)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        QPixmap.fromImage(thumbnail_to_qimage(thumb).copy())
+    copied = time.perf_counter() - start
+
+    decoder = CoverDecoder(processes=1, slots=1)
+    try:
+        slot, width, height, stride = decoder.decode(content)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            view = decoder.view(slot, height, stride)
+            QPixmap.fromImage(QImage(sip.voidptr(view), width, height, stride, QImage.Format_RGB888))
+            view.release()
+        shared = time.perf_counter() - start
+        decoder.release(slot)
+    finally:
+        decoder.close()
+    return {"qimage_copy": round(copied / repeats * 1e6, 1), "shared_slot": round(shared / repeats * 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--covers", type=int, default=400)
+    parser.add_argument("--cover-size", type=size, default=(400, 600), help="розмір вихідних JPEG, наприклад 128x192")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    # Кілька різних обкладинок, щоб декодер не працював з одним і тим самим буфером
+    variants = [make_cover(args.cover_size[0] + i, args.cover_size[1] + i) for i in range(8)]
+    covers = [variants[i % len(variants)] for i in range(args.covers)]
+
+    results = {}
+    for mode, run in (("threads", run_threads), ("processes", run_processes)):
+        rows = []
+        for workers in worker_counts(args.max_workers):
+            elapsed = run(covers, workers)
+            rows.append({"workers": workers, "covers_per_second": round(len(covers) / elapsed, 1)})
+        for row in rows:
+            row["speedup"] = round(row["covers_per_second"] / rows[0]["covers_per_second"], 2)
+        results[mode] = rows
+
+    print(json.dumps({
+        "cpu_count": os.cpu_count(),
+        "covers": args.covers,
+        "cover_size": "x".join(map(str, args.cover_size)),
+        "decode": results,
+        "gui_us_per_cover": gui_handoff(covers[0], 500),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Наскрізний бенчмарк: пошук -> розбір -> групування -> відображення -> обкладинки.
+
+Запускає benchmarks/fake_books_api.py в окремому процесі, спрямовує на
+нього пошук через BOOKS_API_URL і виконує серію пошуків у BookRecommender
+без екрана (QT_QPA_PLATFORM=offscreen). Кожен пошук має новий запит, тож
+кеші не допомагають. Результат — JSON з часом кожного етапу (p50/p95),
+пропускною здатністю, лічильниками сервера і знімком метрик застосунку
+(MetricsRegistry); з --baseline додається відношення p50 до попереднього
+запуску.
+
+Етапи:
+    first_result  — від search() до першого екрана карток;
+    results       — від search() до останньої картки всіх сторінок;
+    fetch         — завантаження і потоковий розбір у SearchWorker;
+    stream_parse  — частина fetch, витрачена на розбір JSON;
+    records       — parse_volumes у GUI-потоці;
+    grouping      — group_books;
+    first_screen  — побудова першого екрана карток (сума по сторінках);
+    render        — від початку відображення до останньої картки (сума по сторінках);
+    covers        — від першого екрана до останньої обкладинки;
+    gui_stall     — найдовша безперервна робота GUI-потоку за пошук (чим менше, тим чутливіше вікно).
+
+Запуск:
+    python benchmarks/bench_e2e.py [--searches 20] [--pages 2] [--latency-ms 50] [--output run.json]
+    python benchmarks/bench_e2e.py --baseline run.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)  # додає корінь проєкту
+
+SERVER_OPTIONS = ("latency_ms", "cover_latency_ms", "jitter_ms", "total_items", "description_words",
+                  "error_rate", "cover_error_rate", "seed")
+
+
+def summarize(values):
+    values = sorted(values)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(statistics.median(values), 2),
+        "p95": round(values[max(int(len(values) * 0.95) - 1, 0)], 2),
+        "mean": round(statistics.mean(values), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+def start_server(args):
+    command = [sys.executable, os.path.join(ROOT, "benchmarks", "fake_books_api.py"), "--port", "0"]
+    for option in SERVER_OPTIONS:
+        command += ["--" + option.replace("_", "-"), str(getattr(args, option))]
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    return server, json.loads(server.stdout.readline())
+
+
+def run(args, volumes_url):
+    # Адресу API і платформу Qt треба задати до імпорту books_api і PyQt5
+    os.environ["BOOKS_API_URL"] = volumes_url
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+
+    import main as app_main
+    from http_transport import HttpTransport
+    from search_cache import SearchCache
+    from thumbnail_cache import ThumbnailCache
+
+    timings = defaultdict(list)
+    current = {}
+
+    def timed(stage, function):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                current[stage] = current.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+        return wrapper
+
+    app_main.parse_volumes = timed("records", app_main.parse_volumes)
+    app_main.group_books = timed("grouping", app_main.group_books)
+
+    class InstrumentedRecommender(app_main.BookRecommender):
+        """
+        BookRecommender, що фіксує моменти відображення і завершення пошуку.
+        """
+        def start_search_worker(self, worker):
+            worker.signals.stats.connect(self.search_done)
+            worker.signals.error.connect(self.search_failed)
+            super().start_search_worker(worker)
+
+        def observe_first_screen(self, elapsed):
+            super().observe_first_screen(elapsed)
+            current["first_screen"] = current.get("first_screen", 0.0) + elapsed * 1000
+            current.setdefault("first_rendered_at", time.perf_counter())
+
+        def observe_render(self, elapsed):
+            super().observe_render(elapsed)
+            current["render"] = current.get("render", 0.0) + elapsed * 1000
+            current["rendered_at"] = time.perf_counter()
+
+        def search_done(self, stats):
+            current["fetch"] = stats["elapsed"] * 1000
+            current["stream_parse"] = stats["parse_time"] * 1000
+            current["bytes"] = stats["bytes"]
+            current["items"] = stats["items"]
+            current["done"] = True
+
+        def search_failed(self, error):
+            current["error"] = error
+            current["done"] = True
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    # Фейковий сервер віддає і пошук, і обкладинки з одного хоста, тож обмеження частоти
+    # (--rate) діяло б і на обкладинки; за замовчуванням його немає
+    window = InstrumentedRecommender(search_cache=SearchCache(), thumbnail_cache=ThumbnailCache(),
+                                     transport=HttpTransport(rate=args.rate))
+    window.pages_box.setValue(args.pages)
+    window.show()
+    covers = []
+    window.cover_loader.cover_ready.connect(lambda url, pixmap: covers.append(url))
+
+    errors = 0
+    total_items = total_bytes = 0
+    phase_start = time.perf_counter()
+    for i in range(args.searches):
+        current.clear()
+        covers_before = len(covers)
+        window.search_box.setText(f"benchmark query {i}")
+        started = time.perf_counter()
+        window.search()
+
+        deadline = started + args.timeout
+        stall = 0.0
+        while (not current.get("done") or window.result_renderer.active) and time.perf_counter() < deadline:
+            tick = time.perf_counter()
+            qt_app.processEvents()
+            stall = max(stall, time.perf_counter() - tick)
+            time.sleep(0.0005)
+        if current.get("error") or not current.get("done"):
+            errors += 1
+            window.cancel_active_search()
+            continue
+
+        window.cover_loader.threadpool.waitForDone(int(args.timeout * 1000))
+        qt_app.processEvents()
+        covers_done = time.perf_counter()
+
+        timings["first_result"].append((current["first_rendered_at"] - started) * 1000)
+        timings["results"].append((current["rendered_at"] - started) * 1000)
+        timings["covers"].append((covers_done - current["first_rendered_at"]) * 1000)
+        timings["gui_stall"].append(stall * 1000)
+        for stage in ("fetch", "stream_parse", "records", "grouping", "first_screen", "render"):
+            timings[stage].append(current.get(stage, 0.0))
+        timings["cover_count"].append(len(covers) - covers_before)
+        total_items += current["items"]
+        total_bytes += current["bytes"]
+    phase_time = time.perf_counter() - phase_start
+
+    window.cancel_active_search()
+    window.threadpool.waitForDone()
+    window.cover_loader.threadpool.waitForDone()
+    app_metrics = window.metrics.snapshot()
+    window.close()
+
+    completed = args.searches - errors
+    cover_time = sum(timings["covers"]) / 1000
+    return {
+        "searches": args.searches,
+        "errors": errors,
+        "stages_ms": {stage: summarize(values) for stage, values in timings.items() if stage != "cover_count"},
+        "throughput": {
+            "searches_per_second": round(completed / phase_time, 2),
+            "books_per_second": round(total_items / phase_time, 1),
+            "covers_per_second": round(sum(timings["cover_count"]) / cover_time, 1) if cover_time else 0.0,
+            "search_kb_per_search": round(total_bytes / 1024 / max(completed, 1), 1),
+        },
+        "app_metrics": app_metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=1, help="кількість сторінок на пошук (як у вікні)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--cover-latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--total-items", type=int, default=200)
+    parser.add_argument("--description-words", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cover-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="секунд на один пошук")
+    parser.add_argument("--rate", type=float, help="обмеження HTTP-запитів за секунду (за замовчуванням немає)")
+    parser.add_argument("--output", help="файл для JSON-звіту (за замовчуванням stdout)")
+    parser.add_argument("--baseline", help="попередній JSON-звіт для порівняння p50")
+    args = parser.parse_args()
+
+    server, address = start_server(args)
+    try:
+        report = {"config": {option: getattr(args, option) for option in SERVER_OPTIONS + ("searches", "pages")}}
+        # Повідомлення застосунку (наприклад, "Search error") не змішуються з JSON у stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            report.update(run(args, address["volumes_url"]))
+        with urllib.request.urlopen(address["url"] + "/stats") as response:
+            report["server"] = json.load(response)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["stages_ms"]
+        report["p50_vs_baseline"] = {
+            stage: round(summary["p50"] / baseline[stage]["p50"], 2)
+            for stage, summary in report["stages_ms"].items()
+            if summary.get("p50") and baseline.get(stage, {}).get("p50")
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
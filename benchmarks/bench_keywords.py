@@ -0,0 +1,72 @@
+"""
+Масштабування перевірки ключових слів: підрядковий пошук проти Aho-Corasick.
+
+Запуск:
+    python benchmarks/bench_keywords.py [--titles 1000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # додає корінь проєкту
+
+from keyword_matcher import KeywordAutomaton  # noqa: E402
+
+WORDS = ("python", "data", "science", "history", "war", "peace", "learning", "deep", "guide",
+         "practical", "modern", "art", "of", "programming", "ukraine", "kyiv", "novel", "poems")
+
+
+def make_keyword(rng, i):
+    return f"{rng.choice(WORDS)}{i}" if i >= len(WORDS) else WORDS[i]
+
+
+def naive_find(keywords, title):
+    lowered = title.lower()
+    return [keyword for keyword in keywords if keyword in lowered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--titles", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    titles = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9))) for _ in range(args.titles)]
+
+    report = []
+    for count in (10, 100, 1000, 10000):
+        keywords = {make_keyword(rng, i) for i in range(count)}
+
+        start = time.perf_counter()
+        naive = [naive_find(keywords, title) for title in titles]
+        naive_time = time.perf_counter() - start
+
+        automaton = KeywordAutomaton()
+        start = time.perf_counter()
+        for keyword in keywords:
+            automaton.add(keyword)
+        automaton.find_many(titles[:1])  # перша побудова суфіксних посилань
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matched = automaton.find_many(titles)
+        automaton_time = time.perf_counter() - start
+
+        assert [sorted(m) for m in matched] == [sorted(n) for n in naive]
+        report.append({
+            "keywords": len(keywords),
+            "titles": len(titles),
+            "naive_ms": round(naive_time * 1000, 2),
+            "automaton_ms": round(automaton_time * 1000, 2),
+            "automaton_build_ms": round(build_time * 1000, 2),
+            "speedup": round(naive_time / automaton_time, 1),
+        })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Пам'ять на 10 000 книг: сирі словники API проти компактних BookRecord.
+
+Запуск:
+    python benchmarks/bench_records.py [--books 10000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # додає корінь проєкту
+
+from book_records import parse_volumes  # noqa: E402
+
+
+class PlainBook:
+    """Запис зі звичайним __dict__, як BookLeaf до переходу на __slots__."""
+    def __init__(self, title, poster, date, rating, authors=None, volume_id=None):
+        self.title = title
+        self.poster = poster
+        self.date = date
+        self.rating = rating
+        self.authors = authors or []
+        self.volume_id = volume_id
+
+
+def make_response(count):
+    """
+    Генерує відповідь, схожу на повний ресурс volumes Google Books API.
+    """
+    items = []
+    for i in range(count):
+        items.append({
+            "kind": "books#volume",
+            "id": f"vol{i:07d}",
+            "etag": f"etag{i}",
+            "selfLink": f"https://www.googleapis.com/books/v1/volumes/vol{i:07d}",
+            "volumeInfo": {
+                "title": f"Python Programming Volume {i % 2000}",
+                "authors": [f"Author {i % 300}", f"Co-Author {i % 50}"],
+                "publisher": f"Publisher {i % 40}",
+                "publishedDate": f"{1990 + i % 35}-0{1 + i % 9}-1{i % 9}",
+                "description": "A practical guide to programming. " * 12,
+                "industryIdentifiers": [
+                    {"type": "ISBN_13", "identifier": f"978{i:010d}"},
+                    {"type": "ISBN_10", "identifier": f"{i:010d}"},
+                ],
+                "pageCount": 300 + i % 500,
+                "categories": ["Computers"],
+                "averageRating": 3.5 + (i % 3) / 2,
+                "ratingsCount": i % 100,
+                "language": "en",
+                "imageLinks": {
+                    "smallThumbnail": f"http://books.google.com/books/content?id=vol{i:07d}&zoom=5",
+                    "thumbnail": f"http://books.google.com/books/content?id=vol{i:07d}&zoom=1",
+                },
+            },
+            "saleInfo": {"country": "UA", "saleability": "NOT_FOR_SALE", "isEbook": False},
+            "accessInfo": {"country": "UA", "viewability": "PARTIAL", "embeddable": True,
+                           "epub": {"isAvailable": False}, "pdf": {"isAvailable": True}},
+            "searchInfo": {"textSnippet": "A practical guide to programming..."},
+        })
+    return json.dumps({"kind": "books#volumes", "totalItems": count, "items": items})
+
+
+def measure(build):
+    """
+    Повертає кількість байтів, що залишаються виділеними для результату build().
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=10000)
+    args = parser.parse_args()
+
+    body = make_response(args.books)
+
+    raw = measure(lambda: json.loads(body)["items"])
+    plain = measure(lambda: parse_volumes(json.loads(body), PlainBook))
+    compact = measure(lambda: parse_volumes(json.loads(body)))
+
+    report = {
+        "books": args.books,
+        "raw_json_bytes": raw,
+        "plain_objects_bytes": plain,
+        "book_record_bytes": compact,
+        "reduction_vs_raw": round(raw / compact, 1),
+        "reduction_vs_plain": round(plain / compact, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Перемальовування результатів: пул віджетів проти видалення і створення заново.
+
+Виконує серію "пошуків" у BookRecommender без екрана і без мережі: кожен
+пошук — новий набір книг (по черзі з --variants різних наборів), який
+відображається через render_results() до останньої картки. Обкладинки
+заздалегідь лежать у кеші в пам'яті, тож вимірюється лише робота з
+віджетами. Режими:
+    rebuild — WidgetPool(max_idle=0): кожна картка видаляється і створюється
+              заново, як до появи пулу;
+    pool    — WidgetPool за замовчуванням: картки прив'язуються до нових книг.
+
+Для кожного режиму звіт містить час на пошук (очищення + усі картки +
+відкладені видалення, мс, p50/p95), кількість створених віджетів на
+пошук і кількість нових QObject (картки, мітки, кнопки, layout) за
+один додатковий пошук після заміру: їх рахує фільтр подій ChildAdded,
+який сповільнив би сам замір.
+
+Запуск:
+    python benchmarks/bench_render.py [--searches 30] [--books 80] [--group "Group by Author"]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)  # додає корінь проєкту
+
+
+def make_books(variant, count):
+    from book_components import BookLeaf
+
+    return [
+        BookLeaf(f"Book {variant}-{i}", f"http://covers.local/{i % 16}.jpg", f"20{i % 25:02d}",
+                 round(3 + (i % 20) / 10, 1), [f"Author {(i + variant) % 12}"])
+        for i in range(count)
+    ]
+
+
+def run_mode(qt_app, args, max_idle):
+    from PyQt5.QtCore import QEvent, QObject
+
+    import main as app_main
+    from search_cache import SearchCache
+    from thumbnail_cache import Thumbnail, ThumbnailCache
+    from widget_pool import WidgetPool
+
+    thumbnails = ThumbnailCache()
+    for i in range(16):
+        thumbnails.put(f"http://covers.local/{i}.jpg", Thumbnail(140, 200, bytes(140 * 200 * 3)))
+    window = app_main.BookRecommender(search_cache=SearchCache(), thumbnail_cache=thumbnails)
+    window.widget_pool = WidgetPool() if max_idle is None else WidgetPool(max_idle=max_idle)
+    window.grouping_box.setCurrentText(args.group)
+    window.show()
+    variants = [make_books(variant, args.books) for variant in range(args.variants)]
+
+    def settle():
+        # deleteLater виконується лише в циклі подій; без цього видалення не потрапило б у замір
+        qt_app.sendPostedEvents(None, QEvent.DeferredDelete)
+        qt_app.processEvents()
+
+    class ChildCounter(QObject):
+        count = 0
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.ChildAdded:
+                ChildCounter.count += 1
+            return False
+
+    times, created = [], []
+    for i in range(args.searches + 1):
+        window.current_books = variants[i % len(variants)]
+        created_before = window.widget_pool.created
+        start = time.perf_counter()
+        window.render_results()
+        window.result_renderer.finish()
+        settle()
+        elapsed = time.perf_counter() - start
+        if i == 0:
+            continue  # перший пошук створює картки в обох режимах
+        times.append(elapsed * 1000)
+        created.append(window.widget_pool.created - created_before)
+
+    counter = ChildCounter()
+    qt_app.installEventFilter(counter)
+    window.current_books = variants[(args.searches + 1) % len(variants)]
+    window.render_results()
+    window.result_renderer.finish()
+    settle()
+    qt_app.removeEventFilter(counter)
+    window.close()
+
+    times.sort()
+    return {
+        "ms_per_search": {
+            "p50": round(statistics.median(times), 2),
+            "p95": round(times[max(int(len(times) * 0.95) - 1, 0)], 2),
+        },
+        "widgets_created_per_search": round(statistics.mean(created), 1),
+        "qobjects_created_per_search": ChildCounter.count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=30)
+    parser.add_argument("--books", type=int, default=80, help="книг на пошук (до VIRTUAL_VIEW_THRESHOLD)")
+    parser.add_argument("--variants", type=int, default=3, help="скільки різних наборів книг чергувати")
+    parser.add_argument("--group", default="Group by Author")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    report = {
+        "searches": args.searches,
+        "books": args.books,
+        "group": args.group,
+        "rebuild": run_mode(qt_app, args, max_idle=0),
+        "pool": run_mode(qt_app, args, max_idle=None),
+    }
+    report["pool_vs_rebuild"] = round(report["pool"]["ms_per_search"]["p50"] /
+                                      report["rebuild"]["ms_per_search"]["p50"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+"Схожі книги": швидкість інкрементального додавання, час запиту і recall@k.
+
+Книги додаються сторінками по 40, як з пошуку, в індекс на диску; запит —
+схожі для випадкової книги індексу. Після додавання індекс закривається
+і відкривається знову (час відкриття memmap-індексу), а потім для
+кількох налаштувань наближеного пошуку вимірюється recall@k відносно
+точного пошуку (query_terms=None, posting_limit=None).
+
+Запуск:
+    python benchmarks/bench_similar.py [--books 100000] [--queries 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))  # додає корінь проєкту
+
+from bench_catalog import make_volumes  # noqa: E402
+from book_records import parse_volumes  # noqa: E402
+from recommendations import SimilarBooksIndex  # noqa: E402
+
+PAGE_SIZE = 40
+
+# (query_terms, posting_limit, rerank); перший рядок — точний пошук
+SETTINGS = [
+    (None, None, 0),
+    (8, 500, 20),
+    (16, 500, 50),
+    (16, 1000, 100),
+    (32, 2000, 200),
+]
+
+
+def percentile(timings, fraction):
+    return timings[max(int(len(timings) * fraction) - 1, 0)]
+
+
+def run_queries(index, samples, k):
+    timings, results = [], []
+    for record in samples:
+        start = time.perf_counter()
+        similar = index.similar(record, k)
+        timings.append((time.perf_counter() - start) * 1000)
+        results.append({r.volume_id for r, _ in similar})
+    timings.sort()
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    volumes = list(make_volumes(args.books))
+    pages = [{"items": volumes[i:i + PAGE_SIZE]} for i in range(0, len(volumes), PAGE_SIZE)]
+    pages = [(page, parse_volumes(page)) for page in pages]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "similar")
+        index = SimilarBooksIndex(path)
+        page_times = []
+        start = time.perf_counter()
+        for data, records in pages:
+            page_start = time.perf_counter()
+            index.add_volumes(data, records)
+            page_times.append((time.perf_counter() - page_start) * 1000)
+        add_time = time.perf_counter() - start
+        index.close()
+
+        start = time.perf_counter()
+        index = SimilarBooksIndex(path)
+        open_time = time.perf_counter() - start
+
+        rng = random.Random(1)
+        samples = [index.record(rng.randrange(len(index))) for _ in range(args.queries)]
+        timings, _ = run_queries(index, samples, args.k)
+
+        # Налаштування порівнюються на повністю злитому індексі
+        sweep = []
+        exact = None
+        for query_terms, posting_limit, rerank in SETTINGS:
+            index.query_terms, index.rerank = query_terms, rerank
+            if posting_limit != index.posting_limit or index.merges == 0:
+                index.posting_limit = posting_limit
+                index.merge()
+            sweep_timings, results = run_queries(index, samples, args.k)
+            if exact is None:
+                exact = results
+            recall = statistics.mean(len(found & expected) / max(len(expected), 1)
+                                     for found, expected in zip(results, exact))
+            sweep.append({
+                "query_terms": query_terms,
+                "posting_limit": posting_limit,
+                "rerank": rerank,
+                f"recall_at_{args.k}": round(recall, 3),
+                "query_ms_p50": round(statistics.median(sweep_timings), 2),
+                "query_ms_p95": round(percentile(sweep_timings, 0.95), 2),
+            })
+        books = len(index)
+        merges = index.merges
+        index.close()
+
+    page_times.sort()
+    report = {
+        "books": books,
+        "add_books_per_second": round(books / add_time),
+        "add_page_ms_p50": round(statistics.median(page_times), 2),
+        "add_page_ms_max": round(page_times[-1], 1),
+        "merges": merges,
+        "open_ms": round(open_time * 1000, 2),
+        "queries": args.queries,
+        "query_ms_p50": round(statistics.median(timings), 2),
+        "query_ms_p95": round(percentile(timings, 0.95), 2),
+        "query_ms_max": round(timings[-1], 2),
+        "settings": sweep,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
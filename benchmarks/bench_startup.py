@@ -0,0 +1,146 @@
+"""
+Холодний запуск: час імпорту і час до першого вікна.
+
+Кожен замір — окремий новий процес Python, як при запуску main.py. HOME
+підміняється тимчасовим каталогом, тож кеші і сесія користувача з
+~/.book_recommender не читаються. Вікно показується без екрана
+(QT_QPA_PLATFORM=offscreen).
+
+Етапи (мс від запуску процесу):
+    interpreter   — до першого рядка проби (старт інтерпретатора і site);
+    import_core   — імпорт модулів без Qt (CORE_MODULES);
+    import_main   — імпорт main разом з PyQt5;
+    first_window  — QApplication, create_window(), show() і перше відображення (paintEvent);
+    similar_index — відкриття індексу схожих книг після фонового імпорту numpy і scipy.
+
+Звіт також містить, які важкі залежності вже завантажені на момент
+першого вікна, і найповільніші модулі з python -X importtime для main.
+
+Запуск:
+    python benchmarks/bench_startup.py [--runs 10] [--output startup.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Логіка пошуку, розбору, групування, історії та спостерігача без Qt і PIL
+CORE_MODULES = ("book_records", "book_grouping", "search_memento", "observer", "search_cache",
+                "session_store", "books_api", "search_backends", "local_catalog", "metrics", "batch_search")
+HEAVY_MODULES = ("numpy", "scipy", "requests", "PIL")
+STAGES = ("interpreter", "import_core", "import_main", "first_window", "similar_index")
+
+
+def probe():
+    """
+    Виконується в дочірньому процесі: друкує JSON з моментами етапів.
+    """
+    started = float(os.environ["BENCH_STARTED"])
+    marks = {"interpreter": time.time()}
+    sys.path.insert(0, ROOT)  # додає корінь проєкту
+
+    for name in CORE_MODULES:
+        __import__(name)
+    marks["import_core"] = time.time()
+
+    import main as app_main
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+    marks["import_main"] = time.time()
+
+    heavy = []
+
+    class FirstPaint(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and "first_window" not in marks:
+                marks["first_window"] = time.time()
+                heavy.extend(name for name in HEAVY_MODULES if name in sys.modules)
+            return False
+
+    app = QApplication(sys.argv)
+    window = app_main.create_window()
+    first_paint = FirstPaint()
+    window.installEventFilter(first_paint)
+    window.show()
+    while "first_window" not in marks or window._similar_index is None:
+        app.processEvents()
+        if window._similar_index is not None:
+            marks.setdefault("similar_index", time.time())
+    window.close()
+
+    print(json.dumps({
+        "stages_ms": {stage: (mark - started) * 1000 for stage, mark in marks.items()},
+        "heavy_at_first_window": heavy,
+    }))
+
+
+def run_probe(env):
+    env = dict(env, BENCH_STARTED=repr(time.time()))
+    output = subprocess.run([sys.executable, __file__, "--probe"], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def slowest_imports(env, count):
+    """
+    Повертає модулі верхнього рівня з найбільшим сукупним часом імпорту main.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and name.startswith("   ") and not name.startswith("    "):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    modules.sort(reverse=True)
+    return {name: round(ms, 1) for ms, name in modules[:count]}
+
+
+def main():
+    if "--probe" in sys.argv:
+        probe()
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10, help="скільки найповільніших модулів показати")
+    parser.add_argument("--output", help="файл для JSON-звіту (за замовчуванням stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen")
+        run_probe(env)  # перший запуск створює каталоги і прогріває кеш файлової системи
+        runs = [run_probe(env) for _ in range(args.runs)]
+        report = {
+            "runs": args.runs,
+            "stages_ms": {
+                stage: {
+                    "p50": round(statistics.median(values), 1),
+                    "min": round(min(values), 1),
+                    "max": round(max(values), 1),
+                }
+                for stage in STAGES
+                for values in [[run["stages_ms"][stage] for run in runs]]
+            },
+            "heavy_at_first_window": runs[-1]["heavy_at_first_window"],
+            "slowest_imports_ms": slowest_imports(env, args.top),
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Локальний замінник Google Books API для бенчмарків.
+
+Віддає /books/v1/volumes у форматі Google Books (з gzip, якщо клієнт його
+приймає) і обкладинки /covers/<id>.jpg, на які посилаються imageLinks.
+Затримка відповіді, розмір опису книг, загальна кількість результатів
+(а отже кількість сторінок) і частка помилок налаштовуються. Відповіді
+детерміновані: той самий запит і startIndex дають ті самі книги.
+Параметр fields не застосовується, повертаються всі поля.
+
+/stats повертає лічильники TCP-з'єднань, запитів, помилок і переданих байтів.
+
+Запуск:
+    python benchmarks/fake_books_api.py [--port 8765] [--latency-ms 50] [--error-rate 0.05]
+    BOOKS_API_URL=http://127.0.0.1:8765/books/v1/volumes python main.py
+
+Перший рядок виводу — JSON з адресою сервера (зручно з --port 0).
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_catalog import CATEGORIES, CUM_WEIGHTS, WORDS  # noqa: E402
+
+VOLUMES_PATH = "/books/v1/volumes"
+COVERS_PATH = "/covers/"
+
+
+def make_cover(width, height):
+    """
+    Створює JPEG-обкладинку з деталями (фрактал), щоб декодування було не тривіальним.
+    """
+    image = Image.effect_mandelbrot((width, height), (-2.0, -1.5, 1.0, 1.5), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+class FakeBooksServer(ThreadingHTTPServer):
+    """
+    HTTP-сервер із налаштуваннями і лічильниками.
+
+    Args:
+        address (tuple): (host, port); порт 0 — будь-який вільний.
+        config (argparse.Namespace): Налаштування з parse_args().
+
+    Attributes:
+        stats (dict): Лічильники запитів, помилок і байтів.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeBooksHandler)
+        self.config = config
+        self.cover = make_cover(*config.cover_size)
+        self.random = random.Random(config.seed)
+        self.stats = {"connections": 0, "volume_requests": 0, "volume_errors": 0, "cover_requests": 0,
+                      "cover_errors": 0, "items_sent": 0, "bytes_sent": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def fail(self, rate):
+        with self._lock:
+            return self.random.random() < rate
+
+    def delay(self, latency_ms):
+        with self._lock:
+            jitter = self.random.uniform(0, self.config.jitter_ms)
+        time.sleep((latency_ms + jitter) / 1000)
+
+    def volumes(self, query, start_index, max_results):
+        """
+        Повертає сторінку результатів для запиту.
+        """
+        config = self.config
+        end = min(start_index + max_results, config.total_items)
+        items = [self.volume(query, index) for index in range(start_index, end)]
+        return {"kind": "books#volumes", "totalItems": config.total_items, "items": items}
+
+    def volume(self, query, index):
+        volume_id = f"{zlib.crc32(query.encode('utf-8')):08x}{index:05d}"
+        rng = random.Random(volume_id)
+        words = rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=4 + self.config.description_words)
+        return {
+            "kind": "books#volume",
+            "id": volume_id,
+            "volumeInfo": {
+                "title": " ".join(words[:4]).title(),
+                "authors": [f"Author {rng.randrange(5000)}"],
+                "publishedDate": str(1950 + rng.randrange(75)),
+                "averageRating": rng.choice((3.0, 3.5, 4.0, 4.5, 5.0)),
+                "categories": [rng.choice(CATEGORIES)],
+                "description": " ".join(words[4:]),
+                "imageLinks": {"thumbnail": f"{self.url}{COVERS_PATH}{volume_id}.jpg"},
+            },
+        }
+
+
+class FakeBooksHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count(connections=1)  # обробник створюється на кожне TCP-з'єднання, а не на запит
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        server = self.server
+        if url.path == VOLUMES_PATH:
+            server.count(volume_requests=1)
+            server.delay(server.config.latency_ms)
+            if server.fail(server.config.error_rate):
+                server.count(volume_errors=1)
+                self.reply(503, b'{"error": {"code": 503, "message": "Backend Error"}}', "application/json")
+                return
+            params = parse_qs(url.query)
+            data = server.volumes(params.get("q", [""])[0],
+                                  int(params.get("startIndex", ["0"])[0]),
+                                  min(int(params.get("maxResults", ["10"])[0]), 40))
+            server.count(items_sent=len(data["items"]))
+            self.reply(200, json.dumps(data).encode("utf-8"), "application/json; charset=UTF-8")
+        elif url.path.startswith(COVERS_PATH):
+            server.count(cover_requests=1)
+            server.delay(server.config.cover_latency_ms)
+            if server.fail(server.config.cover_error_rate):
+                server.count(cover_errors=1)
+                self.reply(404, b"", "text/plain")
+                return
+            self.reply(200, server.cover, "image/jpeg", compress=False)
+        elif url.path == "/stats":
+            with server._lock:
+                body = json.dumps(server.stats).encode("utf-8")
+            self.reply(200, body, "application/json", compress=False)
+        else:
+            self.reply(404, b"", "text/plain")
+
+    def reply(self, status, body, content_type, compress=True):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if compress and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(bytes_sent=len(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Локальний замінник Google Books API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="затримка відповіді volumes")
+    parser.add_argument("--cover-latency-ms", type=float, default=20.0, help="затримка відповіді обкладинки")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="випадкова добавка до затримки")
+    parser.add_argument("--total-items", type=int, default=200, help="totalItems для кожного запиту")
+    parser.add_argument("--description-words", type=int, default=60, help="розмір опису книги в словах")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="частка відповідей 503 на volumes")
+    parser.add_argument("--cover-error-rate", type=float, default=0.0, help="частка відповідей 404 на обкладинки")
+    parser.add_argument("--cover-size", type=size, default=(128, 192), help="розмір обкладинки, наприклад 128x192")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    config = parse_args(argv)
+    server = FakeBooksServer((config.host, config.port), config)
+    print(json.dumps({"url": server.url, "volumes_url": server.url + VOLUMES_PATH}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
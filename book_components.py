@@ -1,10 +1,10 @@
 # Composite 
 
-from PyQt5.QtWidgets import QLabel, QVBoxLayout, QFrame
-from PyQt5.QtGui import QPixmap, QImage
-from PIL import Image
-from io import BytesIO
-import requests
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QFrame, QPushButton
+
+from book_records import BookRecord
+from cover_loader import COVER_SIZE, default_cover_loader
 
 class BookComponent:
     """
@@ -14,64 +14,129 @@ class BookComponent:
        Використовується паттерн **Composite** для організації компонентів у дерево,
        що дозволяє працювати зі складовими і простими об'єктами однаково.
     """
-    def display(self, layout, show_date=True, show_rating=True):
+    __slots__ = ()
+
+    def display(self, layout, show_date=True, show_rating=True, cover_loader=None, on_similar=None, pool=None,
+                position=-1):
         pass
 
-class BookLeaf(BookComponent):
+class BookLeaf(BookRecord, BookComponent):
     """
     Листовий елемент у Composite.
 
+    Поля зберігаються у слотах BookRecord, тому BookLeaf можна
+    створювати прямо з parse_volumes() без проміжних словників.
+
     .. note::
        Паттерн **Composite** — листовий (простіший) елемент, що не містить дочірніх компонентів.
     """
-    def __init__(self, title, poster, date, rating, authors=None):
-        self.title = title
-        self.poster = poster
-        self.date = date
-        self.rating = rating
-        self.authors = authors or []  # список авторів
-
-    def display(self, layout, show_date=True, show_rating=True):
-        frame = QFrame()
-        frame.setStyleSheet("background-color: white;")
-        frame_layout = QVBoxLayout(frame)
-
-        # Заголовок
-        title_label = QLabel(self.title)
-        frame_layout.addWidget(title_label)
+    __slots__ = ()
+
+    def display(self, layout, show_date=True, show_rating=True, cover_loader=None, on_similar=None, pool=None,
+                position=-1):
+        """
+        Додає картку книги в layout.
+
+        Обкладинка не завантажується тут: замість неї одразу показується
+        заглушка, а саме зображення підвантажує CoverLoader у фоні.
+
+        Args:
+            cover_loader (CoverLoader, optional): Завантажувач обкладинок.
+                За замовчуванням використовується спільний.
+            on_similar (callable, optional): Викликається з цією книгою при
+                натисканні "Similar". Без нього кнопка не показується.
+            pool (WidgetPool, optional): Пул, з якого береться картка
+                попереднього пошуку. Без нього створюється нова.
+            position (int, optional): Позиція картки в layout. За замовчуванням — у кінці.
+        """
+        card = pool.acquire(BookCard) if pool is not None else BookCard()
+        card.bind(self, show_date, show_rating, cover_loader, on_similar)
+        layout.insertWidget(position, card)
+        card.show()
+
+class BookCard(QFrame):
+    """
+    Картка книги, яку можна повторно прив'язати до іншої книги.
+
+    Усі мітки і кнопка створюються один раз; bind() лише змінює текст і
+    ховає рядки, яких немає в книги або вимкнено прапорцями.
+
+    Attributes:
+        book (BookLeaf): Книга, до якої прив'язана картка.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("background-color: white;")
+        self.book = None
+        self.on_similar = None
+        frame_layout = QVBoxLayout(self)
+
+        self.title_label = QLabel()
+        self.author_label = QLabel()
+        self.image_label = QLabel()
+        self.image_label.setFixedSize(*COVER_SIZE)
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setStyleSheet("background-color: #EEEEEE; color: gray;")
+        self.date_label = QLabel()
+        self.rating_label = QLabel()
+        self.similar_button = QPushButton("Similar")
+        self.similar_button.clicked.connect(self.similar_clicked)
+        for widget in (self.title_label, self.author_label, self.image_label,
+                       self.date_label, self.rating_label, self.similar_button):
+            frame_layout.addWidget(widget)
+
+    def bind(self, book, show_date=True, show_rating=True, cover_loader=None, on_similar=None):
+        """
+        Показує в картці дані книги.
+
+        Args:
+            book (BookLeaf): Книга.
+            cover_loader (CoverLoader, optional): Завантажувач обкладинки.
+                За замовчуванням використовується спільний.
+            on_similar (callable, optional): Обробник кнопки "Similar".
+        """
+        self.book = book
+        self.on_similar = on_similar
+        self.title_label.setText(book.title)
 
         # Автор(и)
-        if self.authors:
-            authors_str = ", ".join(self.authors)
-            author_label = QLabel(f"Author(s): {authors_str}")
-            frame_layout.addWidget(author_label)
-
-        # Зображення
-        if self.poster:
-            try:
-                response = requests.get(self.poster)
-                img = Image.open(BytesIO(response.content))
-                img = img.resize((140, 200))
-                img = img.convert("RGB")
-                qimage = QImage(img.tobytes(), img.width, img.height, QImage.Format_RGB888)
-                pixmap = QPixmap.fromImage(qimage)
-                image_label = QLabel()
-                image_label.setPixmap(pixmap)
-                frame_layout.addWidget(image_label)
-            except:
-                pass
+        self.author_label.setVisible(bool(book.authors))
+        if book.authors:
+            self.author_label.setText(f"Author(s): {', '.join(book.authors)}")
+
+        # Зображення: setText() прибирає обкладинку попередньої книги
+        self.image_label.setVisible(bool(book.poster))
+        if book.poster:
+            self.image_label.setText("Loading cover...")
+            (cover_loader or default_cover_loader()).load(book.poster, self.image_label)
 
         # Дата
+        self.date_label.setVisible(show_date)
         if show_date:
-            date_label = QLabel(f"Date: {self.date}")
-            frame_layout.addWidget(date_label)
+            self.date_label.setText(f"Date: {book.date}")
 
         # Рейтинг
+        self.rating_label.setVisible(show_rating)
         if show_rating:
-            rating_label = QLabel(f"Rating: {self.rating}")
-            frame_layout.addWidget(rating_label)
+            self.rating_label.setText(f"Rating: {book.rating}")
+
+        # Схожі книги
+        self.similar_button.setVisible(on_similar is not None)
 
-        layout.addWidget(frame)
+    def similar_clicked(self):
+        if self.on_similar is not None:
+            self.on_similar(self.book)
+
+class GroupHeading(QLabel):
+    """
+    Заголовок групи результатів, який можна повторно прив'язати до іншої групи.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("color: darkblue; margin-top: 10px;")
+
+    def bind(self, name):
+        self.setText(f"<h3>{name}</h3>")
 
 class BookComposite(BookComponent):
     """
@@ -88,10 +153,25 @@ class BookComposite(BookComponent):
     def add(self, component):
         self.children.append(component)
 
-    def display(self, layout, show_date=True, show_rating=True):
-        heading = QLabel(f"<h3>{self.name}</h3>")
-        heading.setStyleSheet("color: darkblue; margin-top: 10px;")
-        layout.addWidget(heading)
-
+    def display_heading(self, layout, pool=None, position=-1):
+        """
+        Додає в layout лише заголовок групи (для поступового відображення).
+
+        Args:
+            position (int, optional): Позиція заголовка в layout. За замовчуванням — у кінці.
+        """
+        heading = pool.acquire(GroupHeading) if pool is not None else GroupHeading()
+        heading.bind(self.name)
+        layout.insertWidget(position, heading)
+        heading.show()
+
+    def display(self, layout, show_date=True, show_rating=True, cover_loader=None, on_similar=None, pool=None,
+                position=-1):
+        count = layout.count()
+        self.display_heading(layout, pool, position)
         for child in self.children:
-            child.display(layout, show_date, show_rating)
+            if position >= 0:
+                # Дочірній композит може додати кілька віджетів
+                position += layout.count() - count
+                count = layout.count()
+            child.display(layout, show_date, show_rating, cover_loader, on_similar, pool, position)
@@ -0,0 +1,102 @@
+# Групування книг
+
+NO_GROUPING = "No Grouping"
+
+GROUP_MODES = (
+    NO_GROUPING,
+    "Group by Year",
+    "Group by Rating",
+    "Group by First Letter",
+    "Group by Author",
+)
+
+
+def group_key(book, group_mode):
+    """
+    Визначає ключ групи для книги.
+
+    Args:
+        book: Об'єкт з атрибутами title, date, rating, authors (наприклад, BookLeaf).
+        group_mode (str): Один з GROUP_MODES.
+
+    Returns:
+        str | None: Назва групи або None, якщо групування вимкнене.
+    """
+    if group_mode == "Group by Year":
+        return book.date.split('-')[0] if book.date != 'N/A' else "Unknown"
+    if group_mode == "Group by Rating":
+        return str(book.rating) if book.rating != 'N/A' else "No Rating"
+    if group_mode == "Group by First Letter":
+        return book.title[0].upper() if book.title and book.title[0].isalpha() else "#"
+    if group_mode == "Group by Author":
+        return book.authors[0] if book.authors else "Unknown Author"
+    return None
+
+
+def group_books(books, group_mode):
+    """
+    Розкладає книги по групах.
+
+    Порядок книг усередині групи зберігається, групи відсортовані за назвою.
+
+    Args:
+        books (list): Книги у порядку результатів пошуку.
+        group_mode (str): Один з GROUP_MODES.
+
+    Returns:
+        list: Пари (ключ, список книг). Для NO_GROUPING — одна пара (None, books).
+    """
+    if group_mode == NO_GROUPING:
+        return [(None, list(books))]
+
+    grouped = {}
+    for book in books:
+        grouped.setdefault(group_key(book, group_mode), []).append(book)
+    return [(key, grouped[key]) for key in sorted(grouped)]
+
+
+def group_rows(groups):
+    """
+    Розгортає групи в плоский список рядків відображення.
+
+    Args:
+        groups (list): Результат group_books().
+
+    Returns:
+        list: (ключ, None) для заголовка групи і (None, книга) для книги.
+    """
+    rows = []
+    for key, books in groups:
+        if key is not None:
+            rows.append((key, None))
+        rows.extend((None, book) for book in books)
+    return rows
+
+
+def added_rows(old_rows, new_rows):
+    """
+    Знаходить рядки, які треба вставити у вже показані, щоб отримати new_rows.
+
+    Нова сторінка результатів лише додає книги (і заголовки нових груп):
+    групи відсортовані, а порядок книг у групі — порядок сторінок, тож
+    показані рядки залишаються в new_rows у тому самому порядку.
+
+    Args:
+        old_rows (list): Показані рядки (результат group_rows()).
+        new_rows (list): Рядки після додавання сторінки.
+
+    Returns:
+        list | None: Пари (позиція в new_rows, рядок) у порядку зростання
+        позицій або None, якщо old_rows не є підпослідовністю new_rows
+        (наприклад, книгу замінив дублікат з попередньої сторінки).
+    """
+    inserted = []
+    matched = 0
+    for position, (key, book) in enumerate(new_rows):
+        if matched < len(old_rows) and old_rows[matched][0] == key and old_rows[matched][1] is book:
+            matched += 1
+        else:
+            inserted.append((position, (key, book)))
+    if matched < len(old_rows):
+        return None
+    return inserted
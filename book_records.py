@@ -0,0 +1,108 @@
+# Компактні записи книг
+
+import sys
+
+
+class BookRecord:
+    """
+    Компактний запис про книгу, розібраний з відповіді Google Books API.
+
+    Використовує __slots__ замість __dict__, а рядки, що часто повторюються
+    (дати, автори, назви з повторних пошуків), інтернуються. Після розбору
+    сирий JSON більше не потрібен.
+
+    Args:
+        title (str): Назва.
+        poster (str): URL обкладинки.
+        date (str): Дата публікації або 'N/A'.
+        rating (float | str): Середній рейтинг або 'N/A'.
+        authors (list, optional): Автори.
+        volume_id (str, optional): Ідентифікатор тому в Google Books.
+    """
+    __slots__ = ("title", "poster", "date", "rating", "authors", "volume_id")
+
+    def __init__(self, title, poster, date, rating, authors=None, volume_id=None):
+        self.title = title
+        self.poster = poster
+        self.date = date
+        self.rating = rating
+        self.authors = tuple(authors) if authors else ()
+        self.volume_id = volume_id
+
+
+def parse_volumes(data, record_type=BookRecord):
+    """
+    Розбирає відповідь Google Books API у список компактних записів.
+
+    Args:
+        data (dict): JSON-дані від Google Books API.
+        record_type (type, optional): Клас запису, сумісний з BookRecord
+            (наприклад, BookLeaf для відображення).
+
+    Returns:
+        list: Записи у порядку відповіді.
+    """
+    intern = sys.intern
+    records = []
+    for item in data.get('items', []):
+        info = item.get('volumeInfo', {})
+        volume_id = item.get('id')
+        records.append(record_type(
+            intern(info.get('title', 'N/A')),
+            info.get('imageLinks', {}).get('thumbnail', ''),
+            intern(info.get('publishedDate', 'N/A')),
+            info.get('averageRating', 'N/A'),
+            [intern(author) for author in info.get('authors', [])],
+            intern(volume_id) if volume_id else None,
+        ))
+    return records
+
+
+def merge_record_pages(pages):
+    """
+    Об'єднує сторінки записів у порядку їх номерів без дублікатів за volume_id.
+
+    Args:
+        pages (dict): Номер сторінки -> список записів.
+
+    Returns:
+        list: Об'єднаний список записів.
+    """
+    records = []
+    seen_ids = set()
+    for page in sorted(pages):
+        for record in pages[page]:
+            if record.volume_id is not None:
+                if record.volume_id in seen_ids:
+                    continue
+                seen_ids.add(record.volume_id)
+            records.append(record)
+    return records
+
+
+def merge_pages(pages):
+    """
+    Об'єднує сторінки результатів у порядку їх номерів.
+
+    Книги, що повторюються на сусідніх сторінках (однаковий id), додаються лише раз.
+
+    Args:
+        pages (dict): Номер сторінки -> JSON-відповідь API.
+
+    Returns:
+        dict: Відповідь у форматі API з об'єднаним списком items.
+    """
+    items = []
+    seen_ids = set()
+    total_items = 0
+    for page in sorted(pages):
+        data = pages[page]
+        total_items = max(total_items, data.get('totalItems', 0))
+        for item in data.get('items', []):
+            volume_id = item.get('id')
+            if volume_id is not None:
+                if volume_id in seen_ids:
+                    continue
+                seen_ids.add(volume_id)
+            items.append(item)
+    return {'totalItems': total_items, 'items': items}
@@ -0,0 +1,258 @@
+# Доступ до Google Books API
+
+import codecs
+import json
+import os
+import time
+
+from http_transport import RequestCancelled, default_transport
+
+# BOOKS_API_URL дозволяє спрямувати пошук на інший сервер (наприклад, локальний для бенчмарків)
+API_URL = os.environ.get("BOOKS_API_URL", "https://www.googleapis.com/books/v1/volumes")
+
+MAX_PAGE_SIZE = 40  # Google Books API повертає щонайбільше 40 книг на сторінку
+DEFAULT_PAGE_SIZE = 20  # розмір сторінки одно-сторінкового пошуку; входить у ключ SearchCache
+
+# Проєкції полів (параметр fields) для кожного вигляду результатів.
+# None означає повний ресурс volumes.
+FIELD_PROJECTIONS = {
+    "cards": "totalItems,items(id,volumeInfo(title,authors,publishedDate,averageRating,imageLinks/thumbnail))",
+    # картки + текст для рекомендацій "схожі книги"
+    "similar": "totalItems,items(id,volumeInfo(title,authors,publishedDate,averageRating,imageLinks/thumbnail,"
+               "categories,description))",
+    "full": None,
+}
+
+# Проєкція, з якою шукає вікно. Категорії та опис для "схожих книг" не
+# завантажуються з кожною сторінкою, а лише для книги-зразка (VOLUME_TEXT_FIELDS)
+SEARCH_PROJECTION = "cards"
+
+# Поля одного тому (volumes/{id}), потрібні лише для пошуку схожих книг
+VOLUME_TEXT_FIELDS = "volumeInfo(categories,description)"
+
+# Google віддає gzip лише клієнтам, у User-Agent яких є слово "gzip"
+REQUEST_HEADERS = {
+    "Accept-Encoding": "gzip",
+    "User-Agent": "book-recommender/1.0 (gzip)",
+}
+
+CHUNK_SIZE = 16 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class SearchCancelled(Exception):
+    """
+    Пошук скасовано: новіший запит зробив його результат непотрібним.
+    """
+
+
+class StreamingVolumesDecoder:
+    """
+    Інкрементальний розбір відповіді volumes по мірі надходження байтів.
+
+    Кожен елемент масиву "items" повертається з feed() одразу, як тільки
+    його JSON повністю отримано, тому книги можна обробляти ще до кінця
+    відповіді. Інші ключі верхнього рівня (totalItems, kind) збираються в meta.
+
+    Attributes:
+        meta (dict): Значення верхнього рівня, крім items.
+    """
+    def __init__(self):
+        self.meta = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = None
+
+    def feed(self, chunk, final=False):
+        """
+        Додає наступну порцію байтів.
+
+        Args:
+            chunk (bytes): Чергова порція тіла відповіді.
+            final (bool, optional): True для останньої порції.
+
+        Returns:
+            list[dict]: Елементи items, що завершилися в цій порції.
+
+        Raises:
+            ValueError: Якщо відповідь не є JSON-об'єктом очікуваної форми.
+        """
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk, final)
+        self._pos = 0
+        items = []
+        while self._step(items, final):
+            pass
+        return items
+
+    def _skip(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else None
+
+    def _value(self, final):
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        # Число в кінці буфера може бути неповним ("12" з "123")
+        if end == len(self._buffer) and not final:
+            return False, None
+        self._pos = end
+        return True, value
+
+    def _step(self, items, final):
+        char = self._skip()
+        if char is None:
+            return False
+
+        if self._state == "start":
+            if char != "{":
+                raise ValueError("Expected a JSON object")
+            self._pos += 1
+            self._state = "key"
+        elif self._state == "key":
+            if char == ",":
+                self._pos += 1
+                return True
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+                return False
+            ok, key = self._value(final)
+            if not ok:
+                return False
+            self._key = key
+            self._state = "colon"
+        elif self._state == "colon":
+            if char != ":":
+                raise ValueError("Expected ':'")
+            self._pos += 1
+            self._state = "items_start" if self._key == "items" else "value"
+        elif self._state == "value":
+            ok, value = self._value(final)
+            if not ok:
+                return False
+            self.meta[self._key] = value
+            self._state = "key"
+        elif self._state == "items_start":
+            if char != "[":
+                raise ValueError("Expected 'items' to be an array")
+            self._pos += 1
+            self._state = "item"
+        elif self._state == "item":
+            if char == ",":
+                self._pos += 1
+                return True
+            if char == "]":
+                self._pos += 1
+                self._state = "key"
+                return True
+            ok, item = self._value(final)
+            if not ok:
+                return False
+            items.append(item)
+        else:
+            return False
+        return True
+
+
+def fetch_volumes(query, max_results=DEFAULT_PAGE_SIZE, start_index=0, fields=None, on_items=None, cancel_event=None,
+                  transport=None):
+    """
+    Завантажує одну сторінку volumes зі стисненням і потоковим розбором.
+
+    Args:
+        query (str): Запит пошуку.
+        max_results (int, optional): Розмір сторінки.
+        start_index (int, optional): Зсув сторінки.
+        fields (str, optional): Проєкція полів (див. FIELD_PROJECTIONS).
+        on_items (callable, optional): Викликається зі списком книг щойно
+            вони розібрані, ще до завершення завантаження.
+        cancel_event (threading.Event, optional): Якщо встановлено, завантаження
+            переривається між порціями і з'єднання закривається.
+        transport (HttpTransport, optional): HTTP-транспорт. За замовчуванням спільний.
+
+    Returns:
+        tuple: (data, stats), де data має формат відповіді API, а stats —
+        словник з bytes (байти з мережі), parse_time (с) та items.
+
+    Raises:
+        RuntimeError: Якщо API повернуло статус, відмінний від 200.
+        SearchCancelled: Якщо cancel_event встановлено під час завантаження.
+    """
+    params = {"q": query, "maxResults": max_results}
+    if start_index:
+        params["startIndex"] = start_index
+    if fields:
+        params["fields"] = fields
+
+    try:
+        response = (transport or default_transport()).get(
+            API_URL, params=params, headers=REQUEST_HEADERS, stream=True, cancel_event=cancel_event)
+    except RequestCancelled:
+        raise SearchCancelled()
+    if response.status_code != 200:
+        response.close()
+        raise RuntimeError("Error fetching data from Google Books API.")
+
+    decoder = StreamingVolumesDecoder()
+    items = []
+    decoded_bytes = 0
+    parse_time = 0.0
+    try:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if cancel_event is not None and cancel_event.is_set():
+                raise SearchCancelled()
+            decoded_bytes += len(chunk)
+            start = time.perf_counter()
+            new_items = decoder.feed(chunk)
+            parse_time += time.perf_counter() - start
+            if new_items:
+                items.extend(new_items)
+                if on_items is not None:
+                    on_items(new_items)
+        start = time.perf_counter()
+        items.extend(decoder.feed(b"", final=True))
+        parse_time += time.perf_counter() - start
+    finally:
+        response.close()
+
+    # tell() у urllib3 повертає кількість байтів з мережі (до розпакування gzip)
+    wire_bytes = getattr(response.raw, "tell", None)
+    wire_bytes = wire_bytes() if callable(wire_bytes) else None
+    if not isinstance(wire_bytes, int):
+        wire_bytes = decoded_bytes
+
+    data = dict(decoder.meta)
+    data["items"] = items
+    stats = {"bytes": wire_bytes, "decoded_bytes": decoded_bytes, "parse_time": parse_time, "items": len(items)}
+    return data, stats
+
+
+def fetch_volume_text(volume_id, transport=None):
+    """
+    Завантажує категорії та опис одного тому.
+
+    Args:
+        volume_id (str): Ідентифікатор тому.
+        transport (HttpTransport, optional): HTTP-транспорт. За замовчуванням спільний.
+
+    Returns:
+        tuple: (categories, description); порожні, якщо API їх не має.
+
+    Raises:
+        RuntimeError: Якщо API повернуло статус, відмінний від 200.
+    """
+    response = (transport or default_transport()).get(
+        f"{API_URL}/{volume_id}", params={"fields": VOLUME_TEXT_FIELDS}, headers=REQUEST_HEADERS)
+    if response.status_code != 200:
+        response.close()
+        raise RuntimeError("Error fetching data from Google Books API.")
+    info = response.json().get("volumeInfo", {})
+    return tuple(info.get("categories", ())), info.get("description", "")
@@ -0,0 +1,223 @@
+# Декодування обкладинок у пулі процесів зі спільною пам'яттю
+
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context, shared_memory
+
+COVER_SIZE = (140, 200)
+COVER_STRIDE = COVER_SIZE[0] * 3  # байтів у рядку RGB888, без вирівнювання
+DEFAULT_SLOT_TIMEOUT = 5.0  # скільки секунд decode() чекає на вільний слот
+
+
+def open_cover(content):
+    """
+    Декодує байти зображення і зменшує його до COVER_SIZE.
+
+    JPEG одразу декодується у зменшеному масштабі (draft), тож для великих
+    обкладинок не розпаковується кожен піксель оригіналу.
+
+    Args:
+        content (bytes): Сирі байти зображення (JPEG/PNG тощо).
+
+    Returns:
+        PIL.Image.Image: Зображення COVER_SIZE у режимі RGB.
+    """
+    from PIL import Image  # PIL потрібен лише з першою обкладинкою, а не під час запуску
+
+    img = Image.open(BytesIO(content))
+    img.draft("RGB", COVER_SIZE)
+    img = img.resize(COVER_SIZE)
+    return img.convert("RGB")
+
+
+_segments = {}  # назва сегмента -> SharedMemory, приєднані в процесі пулу
+
+
+def decode_into(segment_name, offset, content):
+    """
+    Виконується в процесі пулу: пише RGB888-пікселі обкладинки у спільну пам'ять.
+
+    Args:
+        segment_name (str): Назва сегмента SharedMemory.
+        offset (int): Початок слота в сегменті.
+        content (bytes): Сирі байти зображення.
+
+    Returns:
+        tuple: (width, height, stride) записаного зображення.
+    """
+    segment = _segments.get(segment_name)
+    if segment is None:
+        segment = _segments[segment_name] = shared_memory.SharedMemory(name=segment_name)
+    img = open_cover(content)
+    pixels = img.tobytes()
+    segment.buf[offset:offset + len(pixels)] = pixels
+    return img.width, img.height, img.width * 3
+
+
+class CoverDecoder:
+    """
+    Пул процесів, що декодує і зменшує обкладинки поза GIL застосунку.
+
+    Процес пулу пише RGB888-пікселі в слот спільного сегмента пам'яті, а
+    GUI-потік будує QImage прямо над слотом (з явним stride) і звільняє
+    слот, щойно з нього зроблено QPixmap. Пікселі не передаються через
+    pickle, а GUI-потік не копіює їх до QPixmap.fromImage.
+
+    Процеси запускаються методом spawn: fork процесу з потоками Qt
+    небезпечний. Пул і сегмент створюються при першому decode().
+
+    Args:
+        processes (int, optional): Кількість процесів. За замовчуванням — кількість ядер.
+        slots (int, optional): Кількість слотів. Обмежує, скільки декодованих
+            обкладинок може чекати на GUI-потік; decode() чекає на вільний слот.
+        slot_timeout (float, optional): Найдовше очікування вільного слота в секундах.
+    """
+    def __init__(self, processes=None, slots=32, slot_timeout=DEFAULT_SLOT_TIMEOUT):
+        self.processes = processes or os.cpu_count() or 1
+        self.slots = slots
+        self.slot_timeout = slot_timeout
+        self.slot_size = COVER_STRIDE * COVER_SIZE[1]
+        self._executor = None
+        self._segment = None
+        self._free = list(range(slots))
+        self._condition = threading.Condition()
+        self._start_lock = threading.Lock()
+
+    def decode(self, content, timeout=None):
+        """
+        Декодує обкладинку у вільний слот; викликається з фонового потоку.
+
+        Args:
+            content (bytes): Сирі байти зображення.
+            timeout (float, optional): Очікування вільного слота. За замовчуванням slot_timeout.
+
+        Returns:
+            tuple: (slot, width, height, stride). Слот треба звільнити release().
+
+        Raises:
+            TimeoutError: Якщо за timeout не звільнився жоден слот.
+            Exception: Помилка декодування з процесу пулу (слот звільняється).
+        """
+        self._start()
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._free,
+                                            self.slot_timeout if timeout is None else timeout):
+                raise TimeoutError("no free cover slot")
+            slot = self._free.pop()
+        try:
+            width, height, stride = self._executor.submit(
+                decode_into, self._segment.name, slot * self.slot_size, content).result()
+        except BaseException:
+            self.release(slot)
+            raise
+        return slot, width, height, stride
+
+    def view(self, slot, height, stride):
+        """
+        Повертає memoryview на пікселі слота без копіювання.
+
+        memoryview треба звільнити (release()) до close().
+        """
+        offset = slot * self.slot_size
+        return self._segment.buf[offset:offset + height * stride]
+
+    def release(self, slot):
+        """
+        Повертає слот у пул вільних.
+        """
+        with self._condition:
+            self._free.append(slot)
+            self._condition.notify()
+
+    def free_slots(self):
+        with self._condition:
+            return len(self._free)
+
+    def close(self):
+        """
+        Зупиняє процеси і видаляє сегмент спільної пам'яті.
+        """
+        with self._start_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+            if self._segment is not None:
+                self._segment.close()
+                self._segment.unlink()
+                self._segment = None
+
+    def _start(self):
+        with self._start_lock:
+            if self._executor is None:
+                self._segment = shared_memory.SharedMemory(create=True, size=self.slots * self.slot_size)
+                self._executor = ProcessPoolExecutor(self.processes, mp_context=get_context("spawn"))
+
+
+class SlotLease:
+    """
+    Слот з декодованою обкладинкою, переданий отримувачу (GUI-потоку).
+
+    Слот звільняється release() або, якщо отримувач так і не обробив
+    сигнал (CoverLoader видалено і подію відкинуто), коли на лізинг не
+    лишається посилань. Так слоти спільного декодера не губляться.
+
+    Args:
+        decoder (CoverDecoder): Декодер, якому належить слот.
+        slot (int): Номер слота.
+        width (int): Ширина зображення.
+        height (int): Висота зображення.
+        stride (int): Байтів у рядку.
+    """
+    __slots__ = ("decoder", "slot", "width", "height", "stride", "_released")
+
+    def __init__(self, decoder, slot, width, height, stride):
+        self.decoder = decoder
+        self.slot = slot
+        self.width = width
+        self.height = height
+        self.stride = stride
+        self._released = False
+
+    def view(self):
+        """
+        Повертає memoryview на пікселі слота (див. CoverDecoder.view()).
+        """
+        return self.decoder.view(self.slot, self.height, self.stride)
+
+    def release(self):
+        """
+        Повертає слот декодеру; повторні виклики нічого не роблять.
+        """
+        if not self._released:
+            self._released = True
+            self.decoder.release(self.slot)
+
+    def __del__(self):
+        self.release()
+
+
+_default_decoder = None
+
+
+def default_cover_decoder():
+    """
+    Повертає спільний CoverDecoder, створюючи його при першому виклику.
+
+    На одноядерній машині пул не дає паралельності, а лише додає передачу
+    байтів між процесами, тож повертається None
+    (декодування в потоках завантаження). Сегмент спільної пам'яті
+    видаляється при виході з програми.
+
+    Returns:
+        CoverDecoder | None: Спільний пул або None.
+    """
+    global _default_decoder
+    if (os.cpu_count() or 1) < 2:
+        return None
+    if _default_decoder is None:
+        _default_decoder = CoverDecoder()
+        atexit.register(_default_decoder.close)
+    return _default_decoder
@@ -0,0 +1,284 @@
+# Асинхронне завантаження обкладинок
+
+import time
+
+from PyQt5 import sip
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage, QPixmap
+
+from cover_decoder import COVER_SIZE, SlotLease, open_cover
+from http_transport import default_transport
+from single_flight import SingleFlight
+from thumbnail_cache import Thumbnail
+
+COVER_URL_PROPERTY = "cover_url"  # властивість QLabel: URL обкладинки, яку мітка чекає зараз
+
+
+def decode_cover(content):
+    """
+    Декодує байти зображення і зменшує його до COVER_SIZE.
+
+    Args:
+        content (bytes): Сирі байти зображення (JPEG/PNG тощо).
+
+    Returns:
+        Thumbnail: Пікселі у форматі RGB888.
+    """
+    img = open_cover(content)
+    return Thumbnail(img.width, img.height, img.tobytes())
+
+
+def thumbnail_to_qimage(thumb):
+    """
+    Обгортає пікселі Thumbnail у QImage без копіювання.
+
+    QImage посилається на thumb.data, тож thumb має жити, доки живе
+    зображення (або доки з нього не зроблено QPixmap чи copy()).
+    """
+    return QImage(thumb.data, thumb.width, thumb.height, thumb.width * 3, QImage.Format_RGB888)
+
+
+class CoverSignals(QObject):
+    """
+    Сигнали для CoverWorker.
+
+    Attributes:
+        loaded (pyqtSignal): URL обкладинки і декодоване зображення.
+        decoded (pyqtSignal): URL обкладинки і SlotLease зі слотом CoverDecoder.
+        failed (pyqtSignal): URL обкладинки, яку не вдалося завантажити.
+    """
+    loaded = pyqtSignal(str, QImage)
+    decoded = pyqtSignal(str, object)
+    failed = pyqtSignal(str)
+
+
+class CoverWorker(QRunnable):
+    """
+    Завантажує і декодує одну обкладинку у фоновому потоці.
+
+    Args:
+        url (str): Адреса зображення.
+        cache (ThumbnailCache, optional): Кеш, що перевіряється перед завантаженням.
+        metrics (MetricsRegistry, optional): Куди записувати час завантаження і декодування.
+        decoder (CoverDecoder, optional): Пул процесів для декодування. Якщо задано,
+            пікселі передаються сигналом decoded через слот спільної пам'яті.
+        transport (HttpTransport, optional): HTTP-транспорт. За замовчуванням спільний.
+        flights (SingleFlight, optional): Спільні завантаження: якщо той самий URL уже
+            завантажує інший воркер, цей отримує його байти без другого запиту.
+    """
+    def __init__(self, url, cache=None, metrics=None, decoder=None, transport=None, flights=None):
+        super().__init__()
+        self.url = url
+        self.cache = cache
+        self.metrics = metrics
+        self.decoder = decoder
+        self.transport = transport
+        self.flights = flights
+        self.signals = CoverSignals()
+
+    @pyqtSlot()
+    def run(self):
+        """
+        Завантажує зображення і відправляє сигнал loaded або failed.
+
+        QPixmap тут не створюється — він дозволений лише в GUI-потоці.
+        """
+        try:
+            thumb = self.cache.get(self.url) if self.cache is not None else None
+            if thumb is None:
+                start = time.perf_counter()
+                content, shared = self.download()
+                downloaded = time.perf_counter()
+                if self.decoder is not None:
+                    try:
+                        self.decode_in_pool(content, downloaded - start, shared)
+                        return
+                    except TimeoutError:
+                        pass  # усі слоти чекають на GUI-потік: декодуємо тут, а не блокуємо потік
+                thumb = decode_cover(content)
+                if self.metrics is not None:
+                    self.metrics.histogram("cover_download_seconds", "Cover download time").observe(downloaded - start)
+                    self.metrics.histogram("cover_decode_seconds", "Cover decode and resize time").observe(
+                        time.perf_counter() - downloaded)
+                    if not shared:
+                        self.metrics.counter("cover_bytes_total", "Cover bytes downloaded").inc(len(content))
+                if self.cache is not None:
+                    self.cache.put(self.url, thumb)
+            # copy() відв'язує QImage від буфера thumb.data перед передачею в інший потік
+            self.signals.loaded.emit(self.url, thumbnail_to_qimage(thumb).copy())
+        except Exception:
+            if self.metrics is not None:
+                self.metrics.counter("cover_failures_total", "Covers that failed to load").inc()
+            self.signals.failed.emit(self.url)
+
+    def download(self):
+        """
+        Завантажує байти обкладинки або чекає на завантаження того самого URL іншим воркером.
+
+        Returns:
+            tuple: (content, shared), де shared означає, що байти завантажив інший воркер.
+        """
+        def get(cancel_event):
+            response = (self.transport or default_transport()).get(self.url)
+            response.raise_for_status()
+            return response.content
+
+        if self.flights is None:
+            return get(None), False
+        return self.flights.do(self.url, get)
+
+    def decode_in_pool(self, content, download_time, shared=False):
+        # Винятки обробляє run(): якщо декодування не вдалося, слот уже звільнено
+        start = time.perf_counter()
+        # Якщо сигнал не буде оброблено (CoverLoader видалено), слот звільнить сам лізинг
+        lease = SlotLease(self.decoder, *self.decoder.decode(content))
+        if self.metrics is not None:
+            self.metrics.histogram("cover_download_seconds", "Cover download time").observe(download_time)
+            self.metrics.histogram("cover_decode_seconds", "Cover decode and resize time").observe(
+                time.perf_counter() - start)
+            if not shared:
+                self.metrics.counter("cover_bytes_total", "Cover bytes downloaded").inc(len(content))
+        if self.cache is not None:
+            view = lease.view()
+            self.cache.put(self.url, Thumbnail(lease.width, lease.height, bytes(view)))
+            view.release()
+        self.signals.decoded.emit(self.url, lease)
+
+
+class CoverLoader(QObject):
+    """
+    Пул фонових завантажень обкладинок.
+
+    Кожна обкладинка завантажується паралельно у власному потоці, а готовий
+    QPixmap передається у відповідні QLabel через сигнал. Однакові URL, що
+    вже завантажуються, не запускаються повторно: мітка додається до тих,
+    що чекають. Після cancel_pending() новий воркер того самого URL не
+    запитує його вдруге, а чекає на завантаження, що ще йде (SingleFlight).
+
+    Args:
+        max_threads (int, optional): Кількість паралельних завантажень. За замовчуванням 8.
+        cache (ThumbnailCache, optional): Кеш декодованих обкладинок.
+        metrics (MetricsRegistry, optional): Метрики завантажень і глибини черги.
+        decoder (CoverDecoder, optional): Пул процесів для декодування і зменшення.
+            Без нього обкладинки декодуються в потоках завантаження.
+        transport (HttpTransport, optional): HTTP-транспорт. За замовчуванням спільний.
+
+    Attributes:
+        cover_ready (pyqtSignal): URL і готовий QPixmap для всіх зацікавлених.
+        flights (SingleFlight): Завантаження, що виконуються, за URL.
+    """
+    cover_ready = pyqtSignal(str, QPixmap)
+
+    def __init__(self, max_threads=8, cache=None, parent=None, metrics=None, decoder=None, transport=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.metrics = metrics
+        self.decoder = decoder
+        self.transport = transport
+        self.flights = SingleFlight()
+        self.waiting_duplicates = 0  # load() для URL, що вже в черзі: мітка чекає на той самий воркер
+        self.threadpool = QThreadPool()
+        self.threadpool.setMaxThreadCount(max_threads)
+        self._pending = {}  # url -> список QLabel, що чекають на обкладинку
+        if metrics is not None:
+            metrics.gauge("cover_queue_depth", self.queue_depth, "Covers waiting for a free download thread")
+
+    def load(self, url, label=None):
+        """
+        Ставить обкладинку в чергу на завантаження.
+
+        Args:
+            url (str): Адреса зображення.
+            label (QLabel, optional): Мітка, у яку буде встановлено QPixmap.
+        """
+        if label is not None:
+            # Мітку картки з пулу могли прив'язати до іншої книги, поки йшло завантаження
+            label.setProperty(COVER_URL_PROPERTY, url)
+        # Влучання в пам'ять обробляється одразу, без фонового потоку
+        thumb = self.cache.get_memory(url) if self.cache is not None else None
+        if thumb is not None:
+            pixmap = QPixmap.fromImage(thumbnail_to_qimage(thumb))
+            if label is not None:
+                label.setPixmap(pixmap)
+            self.cover_ready.emit(url, pixmap)
+            return
+
+        labels = self._pending.get(url)
+        if labels is not None:
+            self.waiting_duplicates += 1
+            if label is not None:
+                labels.append(label)
+            return
+
+        self._pending[url] = [label] if label is not None else []
+        worker = CoverWorker(url, self.cache, self.metrics, self.decoder, self.transport, self.flights)
+        worker.signals.loaded.connect(self._on_loaded)
+        worker.signals.decoded.connect(self._on_decoded)
+        worker.signals.failed.connect(self._on_failed)
+        self.threadpool.start(worker)
+
+    @property
+    def coalesced(self):
+        """
+        Скільки запитів обкладинок обійшлися без окремого завантаження.
+        """
+        return self.waiting_duplicates + self.flights.shared
+
+    def queue_depth(self):
+        """
+        Повертає кількість обкладинок, що чекають на вільний потік.
+        """
+        return max(len(self._pending) - self.threadpool.activeThreadCount(), 0)
+
+    def cancel_pending(self):
+        """
+        Прибирає з черги обкладинки, які ще не почали завантажуватися.
+
+        Завантаження, що вже виконуються, завершуються і потрапляють у кеш,
+        але мітки попереднього пошуку більше не оновлюються.
+        """
+        self.threadpool.clear()
+        self._pending.clear()
+
+    def _on_loaded(self, url, image):
+        self._deliver(url, QPixmap.fromImage(image))
+
+    def _on_decoded(self, url, lease):
+        # QImage читає пікселі прямо зі спільної пам'яті; QPixmap.fromImage робить
+        # єдину копію, після якої слот можна віддати наступній обкладинці
+        view = lease.view()
+        image = QImage(sip.voidptr(view), lease.width, lease.height, lease.stride, QImage.Format_RGB888)
+        pixmap = QPixmap.fromImage(image)
+        del image
+        view.release()
+        lease.release()
+        self._deliver(url, pixmap)
+
+    def _deliver(self, url, pixmap):
+        for label in self._pending.pop(url, []):
+            # мітка могла бути видалена або прив'язана до іншої обкладинки поки йшло завантаження
+            if self._waiting(label, url):
+                label.setPixmap(pixmap)
+        self.cover_ready.emit(url, pixmap)
+
+    def _on_failed(self, url):
+        for label in self._pending.pop(url, []):
+            if self._waiting(label, url):
+                label.setText("No cover")
+
+    @staticmethod
+    def _waiting(label, url):
+        return not sip.isdeleted(label) and label.property(COVER_URL_PROPERTY) == url
+
+
+_default_loader = None
+
+
+def default_cover_loader():
+    """
+    Повертає спільний CoverLoader, створюючи його при першому виклику.
+    """
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = CoverLoader()
+    return _default_loader
@@ -0,0 +1,308 @@
+# Спільний HTTP-транспорт: пули з'єднань, тайм-аути, повтори й обмеження частоти
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = (3.05, 15)  # (з'єднання, читання) у секундах; тайм-аут читання діє між порціями тіла
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_RATE = 10.0  # запитів за секунду до API (квота Google Books — близько 1000 запитів за 100 с)
+DEFAULT_BURST = 20
+MAX_RETRY_AFTER = 60.0  # довше не чекаємо, навіть якщо сервер просить
+
+
+class RequestCancelled(Exception):
+    """
+    Запит скасовано під час очікування повтору або дозволу обмежувача частоти.
+    """
+
+
+def parse_retry_after(value, now=None):
+    """
+    Розбирає заголовок Retry-After (секунди або HTTP-дата).
+
+    Args:
+        value (str | None): Значення заголовка.
+        now (float, optional): Поточний час (time.time()) для дати.
+
+    Returns:
+        float | None: Секунди очікування (0..MAX_RETRY_AFTER) або None, якщо заголовка немає чи його не розібрано.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date is None:
+            return None
+        seconds = date.timestamp() - (time.time() if now is None else now)
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _sleep(seconds, cancel_event=None):
+    """
+    Чекає seconds; повертає True, якщо за цей час встановлено cancel_event.
+    """
+    if cancel_event is not None:
+        return cancel_event.wait(seconds)
+    time.sleep(seconds)
+    return False
+
+
+class TokenBucket:
+    """
+    Обмежувач частоти запитів, спільний для всіх потоків.
+
+    Кожен запит забирає один токен; токени поповнюються зі швидкістю rate
+    за секунду до burst. block() зупиняє видачу токенів на вказаний час
+    (наприклад, за Retry-After), тож чекають усі потоки, а не лише той,
+    що отримав 429.
+
+    Args:
+        rate (float | None): Токенів за секунду; None — без обмеження, лише block().
+        burst (int): Найбільша кількість токенів.
+    """
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event=None):
+        """
+        Чекає на токен.
+
+        Returns:
+            float: Скільки секунд довелося чекати.
+
+        Raises:
+            RequestCancelled: Якщо cancel_event встановлено під час очікування.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # _updated може бути в майбутньому після block()
+                if self.rate is None:
+                    delay = self._updated - now
+                    if delay <= 0:
+                        return waited
+                else:
+                    self._tokens = min(self.burst, self._tokens + max(now - self._updated, 0.0) * self.rate)
+                    self._updated = max(now, self._updated)
+                    if self._tokens >= 1 and self._updated <= now:
+                        self._tokens -= 1
+                        return waited
+                    delay = max(self._updated - now, 0.0) + max(1 - self._tokens, 0.0) / self.rate
+            if _sleep(delay, cancel_event):
+                raise RequestCancelled()
+            waited += delay
+
+    def block(self, seconds):
+        """
+        Забирає всі токени і не поповнює їх наступні seconds секунд.
+        """
+        with self._lock:
+            self._tokens = 0.0
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+
+class HttpTransport:
+    """
+    Один requests.Session для пошуку й обкладинок з повторами та обмеженням частоти.
+
+    Session тримає окремий пул keep-alive з'єднань для кожного хоста, тож
+    запити до API і до сервера обкладинок не відкривають нове TCP/TLS
+    з'єднання щоразу. Кожен запит має тайм-аути з'єднання і читання.
+    Помилки з'єднання, тайм-аути і статуси RETRY_STATUSES повторюються
+    з експоненційною затримкою з випадковим розкидом (full jitter). Якщо
+    відповідь має Retry-After, чекає він, і чекають усі потоки, що
+    звертаються до цього хоста.
+
+    requests імпортується при першому запиті, а не під час запуску програми.
+
+    Args:
+        timeout (tuple, optional): (з'єднання, читання) в секундах.
+        retries (int, optional): Скільки разів повторювати запит.
+        backoff (float, optional): Базова затримка першого повтору в секундах.
+        max_backoff (float, optional): Найбільша затримка між повторами.
+        rate (float, optional): Запитів за секунду до одного хоста. За замовчуванням
+            без обмеження (Retry-After однаково виконується).
+        burst (int, optional): Скільки запитів можна зробити одразу, без очікування.
+        host_rates (dict, optional): Хост -> (rate, burst) для хостів з іншим обмеженням.
+        pool_size (int, optional): Скільки з'єднань з одним хостом тримати відкритими.
+    """
+    def __init__(self, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5, max_backoff=8.0,
+                 rate=None, burst=DEFAULT_BURST, host_rates=None, pool_size=16):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = dict(host_rates or {})
+        self.pool_size = pool_size
+        self._session = None
+        self._adapter = None
+        self._retry_errors = ()
+        self._buckets = {}  # хост -> TokenBucket
+        self._closed_pools = (0, 0)  # (з'єднання, запити) пулів, закритих close()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "attempts": 0, "retries": 0, "failures": 0,
+                       "throttled": 0, "throttle_seconds": 0.0, "retry_after": 0}
+
+    def get(self, url, params=None, headers=None, stream=False, cancel_event=None):
+        """
+        Виконує GET з повторами.
+
+        Args:
+            url (str): Адреса.
+            params (dict, optional): Параметри запиту.
+            headers (dict, optional): Заголовки.
+            stream (bool, optional): Не читати тіло одразу (iter_content).
+            cancel_event (threading.Event, optional): Перериває очікування повтору.
+
+        Returns:
+            requests.Response: Відповідь; після останньої спроби — навіть зі статусом з RETRY_STATUSES.
+
+        Raises:
+            requests.RequestException: Помилка з'єднання або тайм-аут після всіх спроб.
+            RequestCancelled: Якщо cancel_event встановлено під час очікування.
+        """
+        session = self.session()
+        bucket = self.bucket(urlsplit(url).netloc)
+        self._count(requests=1)
+        attempt = 0
+        while True:
+            waited = bucket.acquire(cancel_event)
+            if waited:
+                self._count(throttled=1, throttle_seconds=waited)
+            self._count(attempts=1)
+            try:
+                response = session.get(url, params=params, headers=headers, stream=stream, timeout=self.timeout)
+            except self._retry_errors:
+                if attempt >= self.retries:
+                    self._count(failures=1)
+                    raise
+                delay = self.backoff_delay(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.content  # дочитує коротке тіло помилки, щоб з'єднання повернулося в пул
+                response.close()
+                if retry_after is None:
+                    delay = self.backoff_delay(attempt)
+                else:
+                    self._count(retry_after=1)
+                    bucket.block(retry_after)
+                    delay = retry_after
+            attempt += 1
+            self._count(retries=1)
+            if _sleep(delay, cancel_event):
+                raise RequestCancelled()
+
+    def backoff_delay(self, attempt):
+        """
+        Випадкова затримка від 0 до backoff * 2**attempt (не більше max_backoff).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def session(self):
+        """
+        Повертає спільний requests.Session, створюючи його при першому виклику.
+        """
+        with self._lock:
+            if self._session is None:
+                import requests  # імпорт requests займає ~150 мс, тож він відкладається до першого запиту
+                from requests.adapters import HTTPAdapter
+
+                # Повтори виконує get(): HTTPAdapter сам не повторює (max_retries=0)
+                self._adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_size, max_retries=0)
+                session = requests.Session()
+                session.mount("http://", self._adapter)
+                session.mount("https://", self._adapter)
+                self._retry_errors = (requests.ConnectionError, requests.Timeout)
+                self._session = session
+            return self._session
+
+    def bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def stats(self):
+        """
+        Повертає лічильники запитів, повторів, очікування і повторного використання з'єднань.
+
+        connections_opened — скільки TCP-з'єднань відкрили пули хостів;
+        connections_reused — скільки запитів пішло вже відкритими з'єднаннями.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            opened, sent = self._pool_counts()
+        stats["throttle_seconds"] = round(stats["throttle_seconds"], 3)
+        stats["connections_opened"] = self._closed_pools[0] + opened
+        stats["connections_reused"] = max(self._closed_pools[1] + sent - stats["connections_opened"], 0)
+        return stats
+
+    def close(self):
+        """
+        Закриває з'єднання; наступний get() створить нову сесію.
+        """
+        with self._lock:
+            if self._session is not None:
+                opened, sent = self._pool_counts()
+                self._closed_pools = (self._closed_pools[0] + opened, self._closed_pools[1] + sent)
+                self._session.close()
+                self._session = None
+                self._adapter = None
+
+    def _pool_counts(self):
+        # Лічильники urllib3: з'єднання, відкриті пулами хостів, і запити, надіслані через них
+        opened = sent = 0
+        if self._adapter is not None:
+            pools = self._adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    sent += pool.num_requests
+        return opened, sent
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._stats[name] += value
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """
+    Повертає спільний HttpTransport, створюючи його при першому виклику.
+
+    Квота Google Books стосується лише API, тож обмежувач частоти діє на
+    хост API_URL, а обкладинки завантажуються без нього. Викликається з
+    потоків пошуку й обкладинок, тому створення захищене блокуванням.
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            from books_api import API_URL  # books_api імпортує цей модуль, тож не на рівні модуля
+
+            _default_transport = HttpTransport(rate=None, host_rates={
+                urlsplit(API_URL).netloc: (DEFAULT_RATE, DEFAULT_BURST)})
+        return _default_transport
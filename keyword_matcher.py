@@ -0,0 +1,123 @@
+# Пошук багатьох ключових слів (Aho-Corasick)
+
+import threading
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Автомат Ахо-Корасік для пошуку всіх ключових слів за один прохід.
+
+    Нові слова вставляються в бор одразу, а суфіксні посилання
+    перебудовуються ліниво — один раз перед наступним пошуком, скільки б
+    слів не додали між пошуками. Пошук займає O(довжина тексту + кількість
+    збігів) незалежно від кількості ключових слів.
+
+    Пошук нечутливий до регістру: слова і текст переводяться в нижній регістр.
+    Автомат можна поповнювати з одного потоку і шукати з іншого.
+    """
+    def __init__(self):
+        self._goto = [{}]      # вузол -> {символ: вузол}
+        self._fail = [0]       # вузол -> суфіксне посилання
+        self._output = [()]    # вузол -> ключові слова, що закінчуються тут (разом із суфіксними)
+        self._terminal = [None]
+        self._count = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def add(self, keyword):
+        """
+        Додає ключове слово до автомата.
+
+        Args:
+            keyword (str): Ключове слово (порожні рядки ігноруються).
+        """
+        keyword = keyword.lower()
+        if not keyword:
+            return
+        with self._lock:
+            self._insert(keyword)
+
+    def _insert(self, keyword):
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._terminal.append(None)
+                self._goto[node][char] = next_node
+            node = next_node
+        if self._terminal[node] is None:
+            self._terminal[node] = keyword
+            self._count += 1
+            self._dirty = True
+
+    def find(self, text):
+        """
+        Повертає ключові слова, що зустрічаються в тексті.
+
+        Args:
+            text (str): Текст (наприклад, назва книги).
+
+        Returns:
+            list[str]: Знайдені слова у порядку першої появи в тексті.
+        """
+        return self.find_many((text,))[0]
+
+    def find_many(self, texts):
+        """
+        Пакетний пошук для списку текстів (наприклад, сторінки результатів).
+
+        Автомат перебудовується (якщо потрібно) лише раз на всю пачку.
+
+        Args:
+            texts (iterable): Тексти.
+
+        Returns:
+            list[list[str]]: Знайдені слова для кожного тексту.
+        """
+        with self._lock:
+            if self._dirty:
+                self._build()
+            return self._scan(texts)
+
+    def _scan(self, texts):
+        goto, fail, output = self._goto, self._fail, self._output
+        results = []
+        for text in texts:
+            found = {}
+            node = 0
+            for char in text.lower():
+                while node and char not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(char, 0)
+                for keyword in output[node]:
+                    found[keyword] = None
+            results.append(list(found))
+        return results
+
+    def _build(self):
+        # BFS від кореня: суфіксне посилання вузла вказує на найдовший власний суфікс у борі
+        goto, fail, output, terminal = self._goto, self._fail, self._output, self._terminal
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            output[child] = (terminal[child],) if terminal[child] is not None else ()
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                own = (terminal[child],) if terminal[child] is not None else ()
+                output[child] = own + output[fail[child]]
+                queue.append(child)
+        self._dirty = False
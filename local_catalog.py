@@ -0,0 +1,373 @@
+"""
+Локальний каталог книг з повнотекстовим індексом SQLite FTS5.
+
+Імпорт томів у каталог:
+    python local_catalog.py dumps/*.json [--catalog PATH] [--batch-size 5000]
+
+Підтримуються відповіді volumes (API-дампи), файли JSON lines (по тому
+або відповіді в рядку) і файл кешу пошуку search_cache.json.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+from books_api import CHUNK_SIZE, StreamingVolumesDecoder
+from search_backends import SearchBackend
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".book_recommender", "catalog.sqlite3")
+
+# Вага стовпців у bm25: збіг у назві важить більше, ніж в описі
+RANK_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Оператори запиту Google Books, що відповідають стовпцям індексу
+QUERY_OPERATORS = {"intitle": "title", "inauthor": "authors", "subject": "categories"}
+
+# Стовпці першого рівня пошуку; опис переглядається, лише коли їх збігів не вистачає на сторінку
+PRIMARY_COLUMNS = ("title", "authors", "categories")
+
+# Префікс шукається лише для слів від такої довжини (коротші розгортаються в тисячі термінів)
+MIN_PREFIX_LENGTH = 3
+
+# Слова, що трапляються в більшій частці томів (і щонайменше в STOP_TERM_MIN_DOCS),
+# вважаються стоп-словами: поруч з рідшими словами вони пропускаються, бо
+# читання їх довгих списків томів дорожче за всю решту пошуку, а вага в bm25
+# майже нульова. Для меншої кількості збігів bm25 займає лічені мілісекунди.
+STOP_TERM_FRACTION = 0.02
+STOP_TERM_MIN_DOCS = 10000
+
+_TOKEN = re.compile(r"(?:(\w+):)?(\w+)")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS volumes (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT,
+    authors TEXT,
+    categories TEXT,
+    description TEXT,
+    data TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS volumes_fts USING fts5(
+    title, authors, categories, description,
+    content='volumes', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2', prefix='3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS volumes_vocab USING fts5vocab(volumes_fts, 'row');
+CREATE TABLE IF NOT EXISTS stop_terms (
+    term TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS catalog_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+INSERT OR REPLACE INTO volumes_fts(volumes_fts, rank) VALUES ('rank', 'bm25({", ".join(map(str, RANK_WEIGHTS))})');
+"""
+
+# Тригери підтримують індекс при поштучних змінах; на час масового імпорту
+# в порожній каталог вони знімаються, а індекс будується одним rebuild
+_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS volumes_ai AFTER INSERT ON volumes BEGIN
+    INSERT INTO volumes_fts(rowid, title, authors, categories, description)
+    VALUES (new.rowid, new.title, new.authors, new.categories, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS volumes_ad AFTER DELETE ON volumes BEGIN
+    INSERT INTO volumes_fts(volumes_fts, rowid, title, authors, categories, description)
+    VALUES ('delete', old.rowid, old.title, old.authors, old.categories, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS volumes_au AFTER UPDATE ON volumes BEGIN
+    INSERT INTO volumes_fts(volumes_fts, rowid, title, authors, categories, description)
+    VALUES ('delete', old.rowid, old.title, old.authors, old.categories, old.description);
+    INSERT INTO volumes_fts(rowid, title, authors, categories, description)
+    VALUES (new.rowid, new.title, new.authors, new.categories, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO volumes (id, title, authors, categories, description, data) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    title = excluded.title, authors = excluded.authors, categories = excluded.categories,
+    description = excluded.description, data = excluded.data
+WHERE volumes.data != excluded.data
+"""
+
+
+def query_words(query):
+    """
+    Повертає слова запиту без операторів, у нижньому регістрі.
+    """
+    return [word for _, word in _TOKEN.findall(query.lower())]
+
+
+def to_fts_query(query, columns=None, stop_terms=frozenset()):
+    """
+    Перетворює запит користувача на безпечний вираз FTS5.
+
+    Кожне слово береться в лапки (спецсимволи FTS5 не інтерпретуються),
+    останнє шукається як префікс, щоб підходити для пошуку під час набору
+    (крім коротких слів і стоп-слів). Стоп-слова пропускаються, якщо в
+    запиті є інші слова. Оператори intitle:, inauthor: і subject:
+    обмежують слово стовпцем.
+
+    Args:
+        query (str): Запит.
+        columns (tuple, optional): Обмежити весь вираз цими стовпцями.
+        stop_terms (set, optional): Стоп-слова каталогу.
+
+    Returns:
+        str | None: Вираз MATCH або None, якщо в запиті немає слів.
+    """
+    terms = []
+    matches = _TOKEN.findall(query.lower())
+    if any(word not in stop_terms for _, word in matches):
+        matches = [(operator, word) for operator, word in matches if word not in stop_terms]
+    for i, (operator, word) in enumerate(matches):
+        term = f'"{word}"'
+        if i == len(matches) - 1 and len(word) >= MIN_PREFIX_LENGTH and word not in stop_terms:
+            term += "*"
+        column = QUERY_OPERATORS.get(operator)
+        terms.append(f"{column} : {term}" if column else term)
+    if not terms:
+        return None
+    expression = " AND ".join(terms)
+    if columns:
+        return f"{{{' '.join(columns)}}} : ({expression})"
+    return expression
+
+
+def volume_row(item):
+    """
+    Готує рядок таблиці volumes з елемента items відповіді API.
+
+    Returns:
+        tuple | None: Значення стовпців або None для тому без id.
+    """
+    volume_id = item.get("id")
+    if not volume_id:
+        return None
+    info = item.get("volumeInfo", {})
+    return (
+        volume_id,
+        info.get("title", ""),
+        ", ".join(info.get("authors", ())),
+        ", ".join(info.get("categories", ())),
+        info.get("description", ""),
+        json.dumps(item, ensure_ascii=False, separators=(",", ":")),
+    )
+
+
+def iter_volumes(path):
+    """
+    Послідовно читає томи з файлу, не завантажуючи великі дампи в пам'ять цілком.
+
+    Args:
+        path (str): Відповідь volumes (.json), JSON lines (.jsonl) або файл кешу пошуку.
+
+    Yields:
+        dict: Елементи items.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                if "items" in obj:
+                    yield from obj["items"]
+                else:
+                    yield obj
+        return
+
+    decoder = StreamingVolumesDecoder()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            yield from decoder.feed(chunk)
+    yield from decoder.feed(b"", final=True)
+    # Файл кешу пошуку: ключ -> [час збереження, відповідь]
+    for value in decoder.meta.values():
+        if isinstance(value, list) and len(value) == 2 and isinstance(value[1], dict):
+            yield from value[1].get("items", ())
+
+
+class LocalCatalogBackend(SearchBackend):
+    """
+    Офлайн-пошук у локальному каталозі томів.
+
+    Томи зберігаються в SQLite разом з повнотекстовим індексом FTS5 по
+    назві, авторах, категоріях та опису. Результати впорядковуються за
+    bm25 з вагами RANK_WEIGHTS і повертаються у форматі відповіді Google
+    Books API. Збережений том повертається повністю, незалежно від fields.
+
+    Пошук дворівневий: спершу за PRIMARY_COLUMNS, де збігів на порядки
+    менше, ніж в описах, і лише якщо їх не вистачає на сторінку — за
+    описом серед решти томів. Так bm25 не рахується для сотень тисяч
+    описів, де трапляється поширене слово. Стоп-слова поруч з іншими
+    словами пропускаються, а запит лише зі стоп-слів повертає перші збіги
+    без ранжування.
+
+    Args:
+        path (str, optional): Файл каталогу (":memory:" для тестів).
+    """
+    name = "Local catalog"
+    cacheable = False
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Пошук виконується з потоків пулу, тому з'єднання не прив'язане до потоку створення
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        if self._conn.execute("SELECT 1 FROM catalog_state WHERE key = 'bulk_import'").fetchone():
+            # Попередній масовий імпорт перервано до побудови індексу
+            self._finish_bulk_import()
+        self._conn.executescript(_TRIGGERS)
+        self.stop_terms = frozenset(row[0] for row in self._conn.execute("SELECT term FROM stop_terms"))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM volumes").fetchone()[0]
+
+    def search(self, query, max_results=20, start_index=0, fields=None, cancel_event=None):
+        start = time.perf_counter()
+        rows = []
+        primary = to_fts_query(query, PRIMARY_COLUMNS, self.stop_terms)
+        if primary is not None:
+            ranked = any(word not in self.stop_terms for word in query_words(query))
+            with self._lock:
+                found = self._matches(primary, start_index + max_results, 0, ranked)
+                rows = found[start_index:]
+                if len(found) < start_index + max_results:
+                    rows += self._matches(f"({to_fts_query(query, stop_terms=self.stop_terms)}) NOT {primary}",
+                                          max_results - len(rows), max(0, start_index - len(found)), ranked)
+        items = [json.loads(row[0]) for row in rows]
+        data = {"totalItems": start_index + len(items), "items": items}
+        stats = {"bytes": 0, "parse_time": time.perf_counter() - start, "items": len(items)}
+        return data, stats
+
+    def _matches(self, expression, limit, offset, ranked=True):
+        # Ранжування і LIMIT виконуються всередині FTS5, таблиця томів читається лише для сторінки
+        if not ranked:
+            return self._conn.execute(
+                "SELECT v.data FROM (SELECT rowid FROM volumes_fts WHERE volumes_fts MATCH ? LIMIT ? OFFSET ?) AS hits "
+                "JOIN volumes v ON v.rowid = hits.rowid",
+                (expression, limit, offset)).fetchall()
+        return self._conn.execute(
+            "SELECT v.data FROM (SELECT rowid, rank FROM volumes_fts WHERE volumes_fts MATCH ? "
+            "ORDER BY rank LIMIT ? OFFSET ?) AS hits "
+            "JOIN volumes v ON v.rowid = hits.rowid ORDER BY hits.rank",
+            (expression, limit, offset)).fetchall()
+
+    def import_volumes(self, volumes, batch_size=5000, progress=None):
+        """
+        Масово додає томи в каталог; том з наявним id оновлюється.
+
+        Кожна пачка записується однією транзакцією. Якщо каталог порожній,
+        індекс не оновлюється по рядку, а будується одним rebuild після
+        завантаження (удвічі швидше). Після імпорту індекс оптимізується
+        (злиття сегментів FTS5 пришвидшує пошук) і перераховуються стоп-слова.
+
+        Args:
+            volumes (iterable): Елементи items відповідей API.
+            batch_size (int, optional): Кількість томів у транзакції.
+            progress (callable, optional): Викликається після кожної пачки з
+                кількістю оброблених томів і секундами від початку.
+
+        Returns:
+            int: Кількість оброблених томів.
+        """
+        start = time.perf_counter()
+        processed = 0
+        batch = []
+        self._conn.execute("PRAGMA synchronous=OFF")
+        bulk = len(self) == 0
+        if bulk:
+            with self._lock, self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO catalog_state VALUES ('bulk_import', '1')")
+                for trigger in ("volumes_ai", "volumes_au", "volumes_ad"):
+                    self._conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        try:
+            for item in volumes:
+                row = volume_row(item)
+                if row is None:
+                    continue
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    processed += self._write_batch(batch)
+                    batch = []
+                    if progress is not None:
+                        progress(processed, time.perf_counter() - start)
+            if batch:
+                processed += self._write_batch(batch)
+                if progress is not None:
+                    progress(processed, time.perf_counter() - start)
+            with self._lock:
+                if bulk:
+                    self._finish_bulk_import()
+                    self._conn.executescript(_TRIGGERS)
+            with self._lock, self._conn:
+                self._conn.execute("INSERT INTO volumes_fts(volumes_fts) VALUES ('optimize')")
+                total = self._conn.execute("SELECT count(*) FROM volumes").fetchone()[0]
+                self._conn.execute("DELETE FROM stop_terms")
+                self._conn.execute("INSERT INTO stop_terms SELECT term FROM volumes_vocab WHERE doc > ?",
+                                   (max(total * STOP_TERM_FRACTION, STOP_TERM_MIN_DOCS),))
+                self.stop_terms = frozenset(row[0] for row in self._conn.execute("SELECT term FROM stop_terms"))
+        finally:
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return processed
+
+    def _finish_bulk_import(self):
+        with self._conn:
+            self._conn.execute("INSERT INTO volumes_fts(volumes_fts) VALUES ('rebuild')")
+            self._conn.execute("DELETE FROM catalog_state WHERE key = 'bulk_import'")
+
+    def _write_batch(self, batch):
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, batch)
+        return len(batch)
+
+    def close(self):
+        """
+        Закриває з'єднання з каталогом.
+        """
+        self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Імпорт томів у локальний каталог книг.")
+    parser.add_argument("files", nargs="+", help="Дампи відповідей volumes, .jsonl або search_cache.json")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    def report(processed, elapsed):
+        rate = processed / elapsed if elapsed else 0.0
+        print(f"\r{processed} volumes, {rate:,.0f} volumes/s", end="", file=sys.stderr, flush=True)
+
+    catalog = LocalCatalogBackend(args.catalog)
+    start = time.perf_counter()
+    processed = 0
+    for path in args.files:
+        volumes = iter_volumes(path)
+        processed += catalog.import_volumes(
+            volumes, args.batch_size, lambda n, _: report(processed + n, time.perf_counter() - start))
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(json.dumps({
+        "files": len(args.files),
+        "processed": processed,
+        "catalog_volumes": len(catalog),
+        "seconds": round(elapsed, 2),
+        "volumes_per_second": round(processed / elapsed) if elapsed else None,
+    }, indent=2))
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,43 @@
+import os
 import sys
-import requests
-from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+import threading
+from functools import partial
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
-    QCheckBox, QScrollArea, QComboBox
+    QCheckBox, QScrollArea, QComboBox, QSpinBox
 )
 
 from book_components import BookComposite, BookLeaf  # переконайся, що ці класи коректні
+from book_grouping import GROUP_MODES, added_rows, group_books, group_rows
+from book_records import merge_pages, merge_record_pages, parse_volumes
+from books_api import DEFAULT_PAGE_SIZE, FIELD_PROJECTIONS, MAX_PAGE_SIZE, SEARCH_PROJECTION, SearchCancelled
+from cover_decoder import default_cover_decoder
+from cover_loader import CoverLoader
+from http_transport import default_transport
 from observer import BookNotifier, UserKeywordSubscriber
+from result_renderer import ProgressiveRenderer
+from results_view import BookListModel, BookListView, BookRole
+from local_catalog import DEFAULT_CATALOG_PATH, LocalCatalogBackend
+from metrics import DEFAULT_METRICS_DIR, MetricsRegistry, format_summary
+from search_backends import GoogleBooksBackend
+from search_cache import DEFAULT_SEARCH_CACHE_PATH, SearchCache
 from search_memento import SearchMemento, SearchHistory
+from session_store import DEFAULT_SESSION_PATH, SessionStore
+from single_flight import FlightCancelled, SingleFlight
+from thumbnail_cache import DEFAULT_CACHE_DIR, ThumbnailCache
+from widget_pool import WidgetPool
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import time
 
-from PyQt5.QtWidgets import QMessageBox
 
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
-from PyQt5.QtCore import QEventLoop, QUrl
+VIRTUAL_VIEW_THRESHOLD = 100  # з цієї кількості книг результати показуються у віртуалізованому списку
+SEARCH_DEBOUNCE_MS = 400  # пауза в наборі тексту, після якої запускається живий пошук
+SIMILAR_BOOKS = 20  # скільки схожих книг показувати
+METRICS_REFRESH_MS = 1000  # період оновлення панелі метрик
+SESSION_SAVE_DELAY_MS = 1000  # зміни історії за цей час записуються в сесію однією транзакцією
 
 
 class WorkerSignals(QObject):
@@ -27,27 +46,114 @@ class WorkerSignals(QObject):
 
     Attributes:
         finished (pyqtSignal): Сигнал з результатами пошуку і часом виконання.
+        page_ready (pyqtSignal): Сигнал з однією сторінкою результатів і її номером.
+        stats (pyqtSignal): Статистика пошуку: байти з мережі, час розбору тощо.
         error (pyqtSignal): Сигнал з повідомленням про помилку.
     """
     finished = pyqtSignal(dict, float)
+    page_ready = pyqtSignal(dict, int)
+    stats = pyqtSignal(dict)
     error = pyqtSignal(str)
 
+
+class IndexSignals(QObject):
+    """
+    Signals для IndexWorker.
+
+    Attributes:
+        finished (pyqtSignal): Результат операції.
+        failed (pyqtSignal): Повідомлення про помилку, якщо операція завершилась винятком.
+    """
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class IndexWorker(QRunnable):
+    """
+    Виконує операцію з індексом схожих книг у потоці індексу.
+
+    Імпорт numpy і scipy, відкриття індексу, додавання книг і злиття
+    основної частини (до секунд на мільйоні книг) не блокують GUI-потік.
+    Виняток операції не виходить за межі потоку (інакше PyQt завершив би
+    процес), а передається сигналом failed.
+
+    Args:
+        function (callable): Операція без аргументів; її результат передається сигналом finished.
+    """
+    def __init__(self, function):
+        super().__init__()
+        self.function = function
+        self.signals = IndexSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.function()
+        except Exception as error:
+            self.signals.failed.emit(f"{type(error).__name__}: {error}")
+            return
+        self.signals.finished.emit(result)
+
+
 class SearchWorker(QRunnable):
     """
-    Клас для асинхронного пошуку книг через Google Books API.
+    Клас для асинхронного пошуку книг через джерело пошуку (за замовчуванням Google Books API).
+
+    Якщо передано кеш і джерело дозволяє кешування, свіжа відповідь з кешу
+    повертається без мережевого запиту, а застаріла — повертається одразу
+    і оновлюється у фоні.
+
+    При pages > 1 сторінки завантажуються паралельно через startIndex, і
+    кожна з них відправляється сигналом page_ready одразу після отримання.
+    Після всіх сторінок finished містить об'єднаний список книг.
+
+    API запитується лише з полями, потрібними вигляду (projection), зі
+    стисненням gzip і потоковим розбором. Після пошуку сигнал stats
+    повідомляє, скільки байтів передано і скільки тривав розбір.
+
+    Після cancel() воркер не відправляє жодних сигналів, не запускає
+    сторінки, що ще не почали завантажуватися, і перериває поточні завантаження.
 
     Args:
         query (str): Запит пошуку.
-        max_results (int, optional): Максимальна кількість результатів. За замовчуванням 20.
+        max_results (int, optional): Кількість результатів на сторінку (не більше 40). За замовчуванням 20.
+        cache (SearchCache, optional): Кеш відповідей API.
+        pages (int, optional): Кількість сторінок для завантаження. За замовчуванням 1.
+        start_page (int, optional): Номер першої сторінки. За замовчуванням 0.
+        projection (str, optional): Назва проєкції полів з FIELD_PROJECTIONS. За замовчуванням "cards".
+        backend (SearchBackend, optional): Джерело результатів. За замовчуванням GoogleBooksBackend.
+        flights (SingleFlight, optional): Спільні завантаження сторінок. Якщо та сама
+            сторінка (за ключем кешу) вже завантажується іншим воркером, цей чекає
+            на її результат замість другого запиту.
 
     Attributes:
         signals (WorkerSignals): Сигнали для результатів і помилок.
     """
-    def __init__(self, query, max_results=20):
+    def __init__(self, query, max_results=DEFAULT_PAGE_SIZE, cache=None, pages=1, projection="cards", backend=None,
+                 flights=None, start_page=0):
         super().__init__()
         self.query = query
-        self.max_results = max_results
+        self.max_results = min(max_results, MAX_PAGE_SIZE)
+        self.backend = backend if backend is not None else GoogleBooksBackend()
+        self.cache = cache if self.backend.cacheable else None
+        self.pages = max(1, pages)
+        self.start_page = start_page
+        self.projection = projection
+        self.flights = flights
         self.signals = WorkerSignals()
+        self._stats = {"bytes": 0, "parse_time": 0.0, "pages_fetched": 0, "pages_cached": 0, "pages_shared": 0}
+        self._stats_lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """
+        Скасовує пошук, результат якого вже не потрібен.
+        """
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
 
     @pyqtSlot()
     def run(self):
@@ -56,20 +162,132 @@ class SearchWorker(QRunnable):
 
         Відправляє сигнал finished з результатами або сигнал error у разі помилки.
         """
+        start_time = time.perf_counter()
+        stale_pages = []
+        if self.cancelled:
+            return
+
         try:
-            start_time = time.perf_counter()
-            url = f"https://www.googleapis.com/books/v1/volumes?q={self.query}&maxResults={self.max_results}"
-            response = requests.get(url)
-            if response.status_code != 200:
-                self.signals.error.emit("Error fetching data from Google Books API.")
+            if self.pages == 1:
+                start_index = self.start_page * self.max_results
+                data, is_stale = self.load_page(start_index)
+                if is_stale:
+                    stale_pages.append(start_index)
+            else:
+                pages = {}
+                executor = ThreadPoolExecutor(max_workers=self.pages)
+                try:
+                    futures = {
+                        executor.submit(self.load_page, page * self.max_results): page
+                        for page in range(self.start_page, self.start_page + self.pages)
+                    }
+                    for future in as_completed(futures):
+                        page = futures[future]
+                        page_data, is_stale = future.result()
+                        if is_stale:
+                            stale_pages.append(page * self.max_results)
+                        pages[page] = page_data
+                        if self.cancelled:
+                            break
+                        self.signals.page_ready.emit(page_data, page)
+                finally:
+                    # Сторінки, що ще не почали завантажуватися, після скасування не запускаються
+                    executor.shutdown(wait=True, cancel_futures=self.cancelled)
+                data = merge_pages(pages)
+
+            if self.cancelled:
                 return
-
-            data = response.json()
             elapsed = time.perf_counter() - start_time
             self.signals.finished.emit(data, elapsed)
+            self.signals.stats.emit(dict(self._stats, elapsed=elapsed, items=len(data.get('items', []))))
 
+        except SearchCancelled:
+            return
         except Exception as e:
-            self.signals.error.emit(str(e))
+            if not self.cancelled:
+                self.signals.error.emit(str(e))
+            return
+
+        # stale-while-revalidate: користувач вже бачить результат, оновлюємо кеш
+        for start_index in stale_pages:
+            self.revalidate(start_index)
+
+    def load_page(self, start_index):
+        """
+        Повертає сторінку результатів з кешу або з API.
+
+        Args:
+            start_index (int): Зсув першої книги сторінки.
+
+        Returns:
+            tuple: (data, is_stale), де is_stale означає застарілий запис кешу.
+        """
+        if self.cache is None:
+            return self.fetch(start_index), False
+
+        key = SearchCache.make_key(self.query, self.max_results, start_index, self.projection)
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self._stats_lock:
+                self._stats["pages_cached"] += 1
+            return cached
+
+        data = self.fetch(start_index)
+        self.cache.put(key, data)
+        return data, False
+
+    def revalidate(self, start_index):
+        """
+        Оновлює застарілий запис кешу для сторінки, якщо його ще ніхто не оновлює.
+        """
+        key = SearchCache.make_key(self.query, self.max_results, start_index, self.projection)
+        if not self.cache.begin_refresh(key):
+            return
+        try:
+            self.cache.put(key, self.fetch(start_index))
+        except Exception:
+            pass
+        finally:
+            self.cache.end_refresh(key)
+
+    def fetch(self, start_index=0):
+        """
+        Запитує сторінку результатів у джерела пошуку.
+
+        Args:
+            start_index (int, optional): Зсув першої книги сторінки.
+
+        Returns:
+            dict: JSON-відповідь API.
+
+        Raises:
+            RuntimeError: Якщо API повернуло статус, відмінний від 200.
+            SearchCancelled: Якщо пошук скасовано під час завантаження.
+        """
+        if self.cancelled:
+            raise SearchCancelled()
+
+        def search(cancel_event):
+            return self.backend.search(self.query, self.max_results, start_index,
+                                       fields=FIELD_PROJECTIONS[self.projection], cancel_event=cancel_event)
+
+        if self.flights is None:
+            (data, stats), shared = search(self._cancelled), False
+        else:
+            # Ключ кешу нормалізує запит, тож "Python" і " python" — одне завантаження
+            key = (self.backend.name, SearchCache.make_key(self.query, self.max_results, start_index, self.projection))
+            try:
+                (data, stats), shared = self.flights.do(key, search, self._cancelled)
+            except FlightCancelled:
+                raise SearchCancelled()
+        with self._stats_lock:
+            if shared:
+                self._stats["pages_shared"] += 1
+            else:
+                self._stats["bytes"] += stats["bytes"]
+                self._stats["parse_time"] += stats["parse_time"]
+                self._stats["pages_fetched"] += 1
+        return data
 
 
 class BookRecommender(QWidget):
@@ -83,25 +301,107 @@ class BookRecommender(QWidget):
         notifier (BookNotifier): Об’єкт для повідомлення про нові книги.
         keyword_subscriber (UserKeywordSubscriber): Підписник на ключові слова.
         history (SearchHistory): Історія пошуку.
+        search_cache (SearchCache): Кеш відповідей API.
+        thumbnail_cache (ThumbnailCache): Кеш обкладинок у пам'яті та на диску.
+        result_renderer (ProgressiveRenderer): Поступове додавання карток результатів.
+        widget_pool (WidgetPool): Картки і заголовки попередніх пошуків для повторного використання.
+        search_flights (SingleFlight): Одне завантаження сторінки на всі пошуки з тим самим запитом, що йдуть одночасно.
+        cover_loader (CoverLoader): Фонове завантаження обкладинок; декодування — у пулі процесів, якщо ядер більше одного.
+        transport (HttpTransport): Спільні з'єднання, повтори й обмеження частоти для пошуку й обкладинок.
+        session (SessionStore | None): Збереження сесії між запусками.
+        backends (list[SearchBackend]): Доступні джерела пошуку.
+        similar_index (SimilarBooksIndex): Індекс "схожих книг" з усіх отриманих результатів.
+        index_pool (QThreadPool): Один потік, у якому по черзі виконуються всі операції з similar_index.
+        metrics (MetricsRegistry): Час етапів пошуку і відображення, лічильники кешів і черг.
 
     .. note::
            Використовується паттерн **Memento** для збереження стану.
     """
-    def __init__(self):
+    def __init__(self, search_cache=None, session=None, catalog=None, similar_index=None, thumbnail_cache=None,
+                 metrics=None, metrics_dir=DEFAULT_METRICS_DIR, transport=None):
         """
         Ініціалізує інтерфейс та підписки.
+
+        Args:
+            search_cache (SearchCache, optional): Кеш відповідей API.
+                За замовчуванням створюється кеш лише в пам'яті.
+            session (SessionStore, optional): Сховище сесії. Якщо задано,
+                вікно відкривається в останньому збереженому стані.
+            catalog (LocalCatalogBackend, optional): Локальний каталог для
+                офлайн-пошуку, доступний як друге джерело.
+            similar_index (SimilarBooksIndex, optional): Індекс схожих книг.
+                За замовчуванням індекс лише в пам'яті створюється при першому зверненні.
+            thumbnail_cache (ThumbnailCache, optional): Кеш обкладинок.
+                За замовчуванням — кеш у пам'яті та в DEFAULT_CACHE_DIR.
+            metrics (MetricsRegistry, optional): Реєстр метрик. За замовчуванням створюється новий.
+            metrics_dir (str, optional): Каталог для експорту metrics.json і metrics.prom.
+            transport (HttpTransport, optional): HTTP-транспорт пошуку й обкладинок.
+                За замовчуванням спільний для всієї програми.
         """
         super().__init__()
         self.threadpool = QThreadPool()
+        # Індекс схожих книг не потокобезпечний: усі звернення до нього йдуть по черзі в одному потоці
+        self.index_pool = QThreadPool()
+        self.index_pool.setMaxThreadCount(1)
 
-        # Створюємо об’єкт BookNotifier і підписника
-        self.notifier = BookNotifier()
+        # Створюємо об’єкт BookNotifier і підписника; сповіщення доставляються у фоновому потоці
+        self.notifier = BookNotifier(async_dispatch=True)
         self.keyword_subscriber = UserKeywordSubscriber()
         self.notifier.subscribe(self.keyword_subscriber)
         self.history = SearchHistory()
-
+        self.search_cache = search_cache if search_cache is not None else SearchCache()
+        self.metrics = metrics if metrics is not None else MetricsRegistry()
+        self.metrics_dir = metrics_dir
+        if thumbnail_cache is None:
+            thumbnail_cache = ThumbnailCache(cache_dir=DEFAULT_CACHE_DIR)
+        self.thumbnail_cache = thumbnail_cache
+        self.transport = transport if transport is not None else default_transport()
+        self.cover_loader = CoverLoader(cache=self.thumbnail_cache, parent=self, metrics=self.metrics,
+                                        decoder=default_cover_decoder(), transport=self.transport)
+        self.widget_pool = WidgetPool()
+        self.search_flights = SingleFlight()
+        self.register_metrics()
+
+        # Останній розібраний набір книг: групування і прапорці застосовуються до нього локально
+        self.current_query = None
+        self.current_books = []
+        self.showing_similar = False  # current_books — схожі книги, а не результати запиту
+        # Показані рядки (book_grouping.group_rows) і чи показані вони у віртуалізованому списку
+        self.displayed_rows = []
+        self.displayed_in_list = False
+
+        # Останній запущений пошук; сигнали від попередніх (скасованих) ігноруються
+        self.active_search = None
+        self.similar_search = None  # пошук схожих книг у потоці індексу
+        self.prefetching = set()  # запити сусідніх станів історії, що завантажуються у фоні
+        self.search_started_at = None  # для часу від запуску пошуку до першого екрана результатів
+
+        self.session = session
+        # Запис сесії відкладається: сторінки результатів і кроки Undo/Redo не пишуть у базу кожен окремо
+        self.session_timer = QTimer(self)
+        self.session_timer.setSingleShot(True)
+        self.session_timer.setInterval(SESSION_SAVE_DELAY_MS)
+        self.session_timer.timeout.connect(self.flush_session)
+        self._similar_index = similar_index
+        self.backends = [GoogleBooksBackend(self.transport)]
+        if catalog is not None:
+            self.backends.append(catalog)
 
         self.init_ui()
+        if self.session is not None:
+            self.restore_session()
+
+    @property
+    def similar_index(self):
+        # Лише з потоку індексу: numpy і scipy (~300 мс імпорту) завантажуються з першими результатами пошуку
+        if self._similar_index is None:
+            from recommendations import SimilarBooksIndex
+            self._similar_index = SimilarBooksIndex(record_type=BookLeaf)
+        return self._similar_index
+
+    @similar_index.setter
+    def similar_index(self, index):
+        self._similar_index = index
 
     def init_ui(self):
         """
@@ -124,19 +424,43 @@ class BookRecommender(QWidget):
         self.search_button = QPushButton("Search", self)
         self.search_button.clicked.connect(self.search)
 
+        # Живий пошук: один запит після паузи в наборі, а не на кожне натискання клавіші
+        self.live_search_box = QCheckBox("Search as you type", self)
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.debounce_timer.timeout.connect(self.search)
+        self.search_box.textChanged.connect(self.schedule_live_search)
+
         self.check_var = QCheckBox("Publish Date", self)
         self.check_var.setChecked(True)
+        self.check_var.stateChanged.connect(self.render_results)
 
         self.check_var2 = QCheckBox("Rating", self)
         self.check_var2.setChecked(True)
+        self.check_var2.stateChanged.connect(self.render_results)
 
         self.grouping_box = QComboBox(self)
-        self.grouping_box.addItem("No Grouping")
-        self.grouping_box.addItem("Group by Year")
-        self.grouping_box.addItem("Group by Rating")
-        self.grouping_box.addItem("Group by First Letter")
-        self.grouping_box.addItem("Group by Author")
-        self.grouping_box.currentIndexChanged.connect(self.search)
+        for group_mode in GROUP_MODES:
+            self.grouping_box.addItem(group_mode)
+        self.grouping_box.currentIndexChanged.connect(self.regroup_results)
+
+        # Джерело пошуку показується, лише коли є з чого вибирати
+        self.source_label = QLabel("Source:", self)
+        self.source_box = QComboBox(self)
+        for backend in self.backends:
+            self.source_box.addItem(backend.name)
+        self.source_label.setVisible(len(self.backends) > 1)
+        self.source_box.setVisible(len(self.backends) > 1)
+        self.source_box.currentIndexChanged.connect(self.change_source)
+
+        # Кількість сторінок: більше 1 вмикає паралельне завантаження по 40 книг
+        self.pages_box = QSpinBox(self)
+        self.pages_box.setRange(1, 10)
+        self.pages_box.setValue(1)
+
+        self.list_view_box = QCheckBox("Compact list view", self)
+        self.list_view_box.stateChanged.connect(self.render_results)
 
         # --- Нові елементи для підписки на ключові слова ---
         self.keyword_input = QLineEdit(self)
@@ -153,10 +477,16 @@ class BookRecommender(QWidget):
         self.layout.addWidget(self.heading)
         self.layout.addWidget(self.search_box)
         self.layout.addWidget(self.search_button)
+        self.layout.addWidget(self.live_search_box)
         self.layout.addWidget(self.check_var)
         self.layout.addWidget(self.check_var2)
         self.layout.addWidget(QLabel("Group by:", self))
         self.layout.addWidget(self.grouping_box)
+        self.layout.addWidget(QLabel(f"Pages ({MAX_PAGE_SIZE} books each):", self))
+        self.layout.addWidget(self.pages_box)
+        self.layout.addWidget(self.source_label)
+        self.layout.addWidget(self.source_box)
+        self.layout.addWidget(self.list_view_box)
 
         # Кнопки Undo і Redo
         self.undo_button = QPushButton("Undo", self)
@@ -177,14 +507,47 @@ class BookRecommender(QWidget):
         self.layout.addWidget(self.subscribe_button)
         self.layout.addWidget(self.keywords_label)
 
+        # Статистика останнього пошуку: кількість книг, передані байти, час розбору
+        self.status_label = QLabel("", self)
+        self.status_label.setStyleSheet("color: gray; font: 13px;")
+        self.layout.addWidget(self.status_label)
+
+        # Метрики: панель поверх вікна (оновлюється раз на секунду) і експорт у файли
+        self.metrics_box = QCheckBox("Show metrics", self)
+        self.metrics_box.stateChanged.connect(self.toggle_metrics_overlay)
+        self.export_metrics_button = QPushButton("Export metrics", self)
+        self.export_metrics_button.clicked.connect(self.export_metrics)
+        self.layout.addWidget(self.metrics_box)
+        self.layout.addWidget(self.export_metrics_button)
+
+        self.metrics_overlay = QLabel(self)
+        self.metrics_overlay.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: white; font: 11px monospace; padding: 6px;")
+        self.metrics_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.metrics_overlay.hide()
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(METRICS_REFRESH_MS)
+        self.metrics_timer.timeout.connect(self.update_metrics_overlay)
+
         self.results_layout = QVBoxLayout()
         self.scroll_area = QScrollArea(self)
         self.scroll_area.setWidgetResizable(True)
         self.results_widget = QWidget()
         self.results_widget.setLayout(self.results_layout)
         self.scroll_area.setWidget(self.results_widget)
+        self.result_renderer = ProgressiveRenderer(self.results_layout, self.scroll_area.viewport(), parent=self)
+        self.result_renderer.first_screen.connect(self.observe_first_screen)
+        self.result_renderer.finished.connect(self.observe_render)
         self.layout.addWidget(self.scroll_area)
 
+        # Віртуалізований список для великих наборів результатів
+        self.results_model = BookListModel(self.cover_loader, parent=self)
+        self.results_view = BookListView(self.results_model, self)
+        self.results_view.setToolTip("Double-click a book to see similar books")
+        self.results_view.doubleClicked.connect(self.show_similar_for_index)
+        self.results_view.hide()
+        self.layout.addWidget(self.results_view)
+
     def apply_styles(self):
         """
         Застосовує стилі до віджетів за допомогою CSS-подібного синтаксису Qt.
@@ -261,21 +624,155 @@ class BookRecommender(QWidget):
         keyword = self.keyword_input.text().strip().lower()
         if keyword:
             self.keyword_subscriber.add_keyword(keyword)
-            keywords_list = ', '.join(sorted(self.keyword_subscriber.keywords))
-            self.keywords_label.setText(f"Subscribed keywords: {keywords_list}")
+            self.update_keywords_label()
             self.keyword_input.clear()
+            if self.session is not None:
+                self.session.add_keyword(keyword)
+
+    def update_keywords_label(self):
+        """
+        Показує підписані ключові слова в алфавітному порядку.
+        """
+        keywords_list = ', '.join(sorted(self.keyword_subscriber.keywords))
+        self.keywords_label.setText(f"Subscribed keywords: {keywords_list}")
+
+    def register_metrics(self):
+        """
+        Реєструє показники, що читаються з кешів і пулу потоків у момент знімка.
+        """
+        gauge = self.metrics.gauge
+        gauge("search_threads_active", self.threadpool.activeThreadCount, "Search worker threads running")
+        gauge("search_cache_hits", lambda: self.search_cache.hits, "Fresh search cache hits", kind="counter")
+        gauge("search_cache_stale_hits", lambda: self.search_cache.stale_hits, "Stale search cache hits",
+              kind="counter")
+        gauge("search_cache_misses", lambda: self.search_cache.misses, "Search cache misses", kind="counter")
+        gauge("thumbnail_cache_hits", lambda: self.thumbnail_cache.hits, "Cover memory cache hits",
+              kind="counter")
+        gauge("thumbnail_cache_disk_hits", lambda: self.thumbnail_cache.disk_hits, "Cover disk cache hits",
+              kind="counter")
+        gauge("thumbnail_cache_misses", lambda: self.thumbnail_cache.misses, "Cover cache misses",
+              kind="counter")
+        gauge("result_widgets_created", lambda: self.widget_pool.created, "Result cards and headings created",
+              kind="counter")
+        gauge("result_widgets_reused", lambda: self.widget_pool.reused, "Result cards and headings taken from the pool",
+              kind="counter")
+        gauge("search_pages_coalesced", lambda: self.search_flights.shared,
+              "Result page requests served by an identical request already in flight", kind="counter")
+        gauge("cover_requests_coalesced", lambda: self.cover_loader.coalesced,
+              "Cover requests served by a download of the same URL already in flight", kind="counter")
+        gauge("result_widgets_idle", self.widget_pool.idle_count, "Hidden result widgets waiting in the pool")
+        for name, help in (("requests", "HTTP requests (search and covers)"),
+                           ("retries", "HTTP requests repeated after an error or 429/5xx"),
+                           ("retry_after", "Waits requested by a Retry-After header"),
+                           ("throttle_seconds", "Time spent waiting for the rate limiter"),
+                           ("connections_opened", "HTTP connections opened"),
+                           ("connections_reused", "HTTP requests sent over an already open connection")):
+            gauge(f"http_{name}", lambda name=name: self.transport.stats()[name], help, kind="counter")
+
+    def toggle_metrics_overlay(self):
+        """
+        Показує або ховає панель метрик.
+        """
+        if self.metrics_box.isChecked():
+            self.update_metrics_overlay()
+            self.metrics_overlay.show()
+            self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+            self.metrics_overlay.hide()
+
+    def update_metrics_overlay(self):
+        """
+        Оновлює текст панелі метрик і притискає її до правого верхнього кута.
+        """
+        self.metrics_overlay.setText(format_summary(self.metrics.snapshot()) or "No metrics yet")
+        self.metrics_overlay.adjustSize()
+        self.metrics_overlay.move(self.width() - self.metrics_overlay.width() - 10, 10)
+        self.metrics_overlay.raise_()
+
+    def export_metrics(self):
+        """
+        Записує метрики в metrics.json і metrics.prom (формат Prometheus).
+        """
+        self.metrics.export(self.metrics_dir)
+        self.status_label.setText(f"Metrics exported to {self.metrics_dir}")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.metrics_overlay.isVisible():
+            self.update_metrics_overlay()
+
+    def restore_session(self):
+        """
+        Відновлює історію, ключові слова і останні результати зі сховища сесії.
+
+        Результати поточного стану читаються зі знімка на диску, тож вікно
+        відкривається в останньому стані без мережевих запитів.
+        """
+        self.session.load_history(self.history)
+        for keyword in self.session.load_keywords():
+            self.keyword_subscriber.add_keyword(keyword)
+        if self.keyword_subscriber.keywords:
+            self.update_keywords_label()
+        if self.history.history:
+            self.restore_search_from_memento(self.history.history[-1])
+
+    def persist_session(self):
+        """
+        Планує запис змін історії у сховище сесії, якщо воно задане.
+
+        Зміни за SESSION_SAVE_DELAY_MS записуються разом у flush_session.
+        """
+        if self.session is not None and not self.session_timer.isActive():
+            self.session_timer.start()
+
+    def flush_session(self):
+        """
+        Одразу записує зміни історії у сховище сесії (також при закритті вікна).
+        """
+        self.session_timer.stop()
+        if self.session is not None:
+            self.session.save_history(self.history)
+
+    def closeEvent(self, event):
+        self.flush_session()
+        super().closeEvent(event)
+
+    def attach_results(self, query, results, replace=False):
+        """
+        Прикріплює знімок результатів до станів історії і зберігає його.
+
+        Args:
+            query (str): Запит.
+            results (tuple): Записи книг.
+            replace (bool, optional): Замінювати вже наявні знімки.
+        """
+        self.history.attach_results(query, results, replace=replace)
+        self.persist_session()
+
+    def load_saved_results(self, memento):
+        """
+        Ліниво підвантажує знімок результатів стану зі сховища сесії.
+
+        Returns:
+            bool: True, якщо memento тепер має знімок.
+        """
+        if memento.results is None and self.session is not None and memento.query:
+            results = self.session.load_results(memento.query, BookLeaf)
+            if results is not None:
+                self.history.attach_results(memento.query, results)
+        return memento.results is not None
 
     def clear_results(self):
         """
         Очищає всі віджети з layout, в якому відображаються результати пошуку.
         Використовується для оновлення або очищення вмісту перед новим пошуком.
+
+        Віджети не видаляються, а ховаються у widget_pool і прив'язуються
+        до нових книг при наступному відображенні.
         """
-        while self.results_layout.count():
-            item = self.results_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.setParent(None)
-                widget.deleteLater()
+        self.result_renderer.cancel()
+        self.widget_pool.recycle(self.results_layout)
 
     def save_current_state_as_memento(self):
         """
@@ -289,6 +786,7 @@ class BookRecommender(QWidget):
             show_rating=self.check_var2.isChecked()
         )
         self.history.save(memento)
+        self.persist_session()
 
     def restore_search_from_memento(self, memento):
         """
@@ -301,73 +799,53 @@ class BookRecommender(QWidget):
         .. note::
            Використовується паттерн **Memento** для відновлення стану.
         """
+        # Сигнали блокуються, щоб відновлення не записало в історію новий стан
+        # (зміна тексту інакше запустила б живий пошук після паузи і стерла redo)
+        self.debounce_timer.stop()
+        widgets = (self.search_box, self.grouping_box, self.check_var, self.check_var2)
+        for widget in widgets:
+            widget.blockSignals(True)
         self.search_box.setText(memento.query)
         index = self.grouping_box.findText(memento.group_mode)
         if index != -1:
             self.grouping_box.setCurrentIndex(index)
         self.check_var.setChecked(memento.show_date)
         self.check_var2.setChecked(memento.show_rating)
+        for widget in widgets:
+            widget.blockSignals(False)
         self.perform_search_from_memento(memento)
 
     def perform_search_from_memento(self, memento):
         """
         Виконує пошук за даними, збереженими в memento.
         Очищає попередні результати, якщо запит порожній - виходить.
-        Підписується на сигнал завершення роботи SearchWorker.
+        Якщо memento містить знімок результатів або запит збігається з
+        останнім виконаним, результати лише перемальовуються з пам'яті.
         """
-        self.clear_results()
-
+        self.cancel_active_search()
+        self.showing_similar = False
+        self.prefetch_neighbors()
         if not memento.query:
+            self.clear_results()
             return
 
-        # Функція для обробки результатів пошуку
-        def handle_results(data):
-            group_mode = memento.group_mode
-            grouped = {}
-            ungrouped = []
-
-            for item in data.get('items', []):
-                info = item.get('volumeInfo', {})
-                title = info.get('title', 'N/A')
-                published_date = info.get('publishedDate', 'N/A')
-                rating = info.get('averageRating', 'N/A')
-                image = info.get('imageLinks', {}).get('thumbnail', '')
-                authors = info.get('authors', [])
-
-                self.notifier.notify(title)
-                leaf = BookLeaf(title, image, published_date, rating, authors)
-
-                # Визначення ключа для групування залежно від вибраного режиму
-                if group_mode == "Group by Year":
-                    key = published_date.split('-')[0] if published_date != 'N/A' else "Unknown"
-                elif group_mode == "Group by Rating":
-                    key = str(rating) if rating != 'N/A' else "No Rating"
-                elif group_mode == "Group by First Letter":
-                    key = title[0].upper() if title and title[0].isalpha() else "#"
-                elif group_mode == "Group by Author":
-                    key = authors[0] if authors else "Unknown Author"
-                else:
-                    key = None
-
-                if key is None:
-                    ungrouped.append(leaf)
-                else:
-                    if key not in grouped:
-                        grouped[key] = BookComposite(key)
-                    grouped[key].add(leaf)
-
-            # Відображення результатів залежно від режиму групування
-            if group_mode == "No Grouping":
-                for leaf in ungrouped:
-                    leaf.display(self.results_layout, show_date=memento.show_date, show_rating=memento.show_rating)
-            else:
-                for key in sorted(grouped.keys()):
-                    grouped[key].display(self.results_layout, show_date=memento.show_date, show_rating=memento.show_rating)
+        if self.load_saved_results(memento):
+            self.current_query = memento.query
+            self.current_books = list(memento.results)
+            self.render_results()
+            return
+
+        if memento.query == self.current_query:
+            self.render_results()
+            return
+
+        self.clear_results()
 
         # Створення SearchWorker для асинхронного пошуку
-        worker = SearchWorker(memento.query)
-        worker.results_ready.connect(handle_results)
-        self.threadpool.start(worker)
+        worker = SearchWorker(memento.query, cache=self.search_cache, projection=SEARCH_PROJECTION,
+                              backend=self.search_backend(), flights=self.search_flights)
+        worker.signals.finished.connect(self.handle_search_results)
+        self.start_search_worker(worker)
 
     def undo_search(self):
         """
@@ -376,6 +854,7 @@ class BookRecommender(QWidget):
         """
         memento = self.history.undo()
         if memento:
+            self.persist_session()
             self.restore_search_from_memento(memento)
 
     def redo_search(self):
@@ -385,6 +864,7 @@ class BookRecommender(QWidget):
         """
         memento = self.history.redo()
         if memento:
+            self.persist_session()
             self.restore_search_from_memento(memento)
 
     def search(self):
@@ -392,21 +872,217 @@ class BookRecommender(QWidget):
         Запускає пошук за текстом із поля пошуку.
         Зберігає поточний стан у історію.
         Створює SearchWorker і запускає його у пулі потоків.
+
+        Якщо вибрано більше однієї сторінки, сторінки відображаються
+        по мірі надходження через handle_search_page.
+
+        Попередній пошук, що ще виконується, скасовується разом з
+        обкладинками, які ще не почали завантажуватися.
         """
+        self.debounce_timer.stop()
         self.save_current_state_as_memento()
+        self.cancel_active_search()
+        self.showing_similar = False
         self.clear_results()
         query = self.search_box.text().strip()
         if not query:
             return
+        self.search_started_at = time.perf_counter()
+
+        pages = self.pages_box.value()
+        if pages > 1:
+            worker = SearchWorker(query, max_results=MAX_PAGE_SIZE, cache=self.search_cache, pages=pages,
+                                  projection=SEARCH_PROJECTION, backend=self.search_backend(),
+                                  flights=self.search_flights)
+            self.received_pages = {}
+            worker.signals.page_ready.connect(self.handle_search_page)
+        else:
+            worker = SearchWorker(query, cache=self.search_cache, projection=SEARCH_PROJECTION,
+                                  backend=self.search_backend(), flights=self.search_flights)
+            worker.signals.finished.connect(self.handle_search_results)
 
-        self.thread_pool = QThreadPool.globalInstance()
-        worker = SearchWorker(query)
+        self.start_search_worker(worker)
 
-        # Підписуємося на сигнали завершення пошуку та помилки
-        worker.signals.finished.connect(self.handle_search_results)
+    def search_backend(self):
+        """
+        Повертає джерело пошуку, вибране в інтерфейсі.
+        """
+        return self.backends[max(self.source_box.currentIndex(), 0)]
+
+    def change_source(self):
+        """
+        Повторює поточний запит у новому джерелі пошуку.
+        """
+        self.current_query = None
+        if self.search_box.text().strip():
+            self.search()
+
+    def schedule_live_search(self):
+        """
+        Перезапускає таймер живого пошуку після кожної зміни тексту.
+
+        Пошук виконується лише коли увімкнено "Search as you type" і
+        користувач зробив паузу SEARCH_DEBOUNCE_MS.
+        """
+        if self.live_search_box.isChecked():
+            self.debounce_timer.start()
+
+    def prefetch_neighbors(self):
+        """
+        Завантажує у фоні результати для сусідніх станів Undo/Redo без знімка.
+
+        Результати прикріплюються до mementos, тож наступний крок по історії
+        відображається з пам'яті. Кеш пошуку при цьому теж прогрівається.
+        """
+        for memento in self.history.neighbors():
+            query = memento.query
+            if not query or self.load_saved_results(memento) or query in self.prefetching:
+                continue
+            if query == self.current_query:
+                self.attach_results(query, tuple(self.current_books))
+                continue
+            self.prefetching.add(query)
+            worker = SearchWorker(query, cache=self.search_cache, projection=SEARCH_PROJECTION,
+                                  backend=self.search_backend(), flights=self.search_flights)
+            worker.signals.finished.connect(partial(self.handle_prefetch_results, query))
+            worker.signals.error.connect(partial(self.handle_prefetch_error, query))
+            self.threadpool.start(worker)
+
+    def handle_prefetch_results(self, query, data, elapsed):
+        """
+        Прикріплює результати фонового завантаження до станів історії.
+
+        Args:
+            query (str): Запит сусіднього стану.
+            data (dict): JSON-дані від Google Books API.
+            elapsed (float): Час пошуку в секундах.
+        """
+        self.prefetching.discard(query)
+        books = parse_volumes(data, BookLeaf)
+        self.index_volumes(data, books)
+        self.attach_results(query, tuple(books))
+
+    def handle_prefetch_error(self, query, error):
+        """
+        Знімає позначку фонового завантаження; стан буде завантажено при переході.
+        """
+        self.prefetching.discard(query)
+
+    def start_search_worker(self, worker):
+        """
+        Робить worker поточним пошуком і запускає його у пулі потоків.
+
+        Args:
+            worker (SearchWorker): Новий пошук.
+        """
+        self.active_search = worker
+
+        # Підписуємося на сигнали статистики та помилки
+        worker.signals.stats.connect(self.handle_search_stats)
         worker.signals.error.connect(self.handle_search_error)
 
-        self.thread_pool.start(worker)
+        self.threadpool.start(worker)
+
+    def cancel_active_search(self):
+        """
+        Скасовує поточний пошук і обкладинки, що ще стоять у черзі.
+
+        Результат пошуку схожих книг, що ще виконується, буде проігноровано.
+        """
+        self.similar_search = None
+        if self.active_search is not None:
+            self.active_search.cancel()
+            self.active_search = None
+            self.cover_loader.cancel_pending()
+
+    def is_current_search(self):
+        """
+        Перевіряє, що сигнал надійшов від останнього запущеного пошуку.
+
+        Прямий виклик обробника (не через сигнал) вважається актуальним.
+
+        Returns:
+            bool: False для сигналів від застарілих пошуків.
+        """
+        sender = self.sender()
+        if sender is None:
+            return True
+        return self.active_search is not None and sender is self.active_search.signals
+
+    def result_query(self):
+        """
+        Повертає запит, до якого належать отримані результати.
+        """
+        if self.active_search is not None:
+            return self.active_search.query
+        return self.search_box.text().strip()
+
+    def regroup_results(self):
+        """
+        Застосовує новий режим групування до останніх результатів.
+
+        Мережевий запит виконується лише тоді, коли текст у полі пошуку
+        відрізняється від останнього виконаного запиту. Список схожих книг
+        перегруповується локально і не записується в історію.
+        """
+        if self.showing_similar:
+            self.render_results()
+            return
+        if self.search_box.text().strip() != self.current_query:
+            self.search()
+            return
+        self.save_current_state_as_memento()
+        self.render_results()
+
+    def handle_search_page(self, data, page):
+        """
+        Обробляє одну сторінку результатів багатосторінкового пошуку.
+
+        Сторінки можуть надходити в довільному порядку, тому книги
+        об'єднуються з розібраних записів усіх отриманих сторінок у порядку
+        їх номерів, а у відображення вставляються лише рядки нової сторінки.
+        Коли надходить остання запитана сторінка, наступна завантажується
+        у фоні в кеш пошуку.
+
+        Args:
+            data (dict): JSON-дані сторінки від Google Books API.
+            page (int): Номер сторінки, починаючи з 0.
+        """
+        if not self.is_current_search():
+            return
+        books = self.parse_results(data)
+        self.notifier.notify_many([book.title for book in books], [book.volume_id for book in books])
+
+        # Зберігаються лише розібрані записи, сирий JSON сторінки відкидається
+        self.received_pages[page] = books
+        self.current_query = self.result_query()
+        self.current_books = merge_record_pages(self.received_pages)
+        self.attach_results(self.current_query, tuple(self.current_books), replace=True)
+        if len(self.received_pages) == 1:
+            self.render_results()
+        else:
+            self.render_added_results()
+
+        worker = self.active_search
+        if worker is not None and page + 1 == worker.start_page + worker.pages:
+            self.prefetch_next_page(worker)
+
+    def prefetch_next_page(self, worker):
+        """
+        Завантажує у фоні в кеш пошуку сторінку, наступну за останньою запитаною.
+
+        Пошук тієї ж фрази з більшою кількістю сторінок бере її з кешу.
+        Для джерела без кешу (локальний каталог) нічого не робить.
+
+        Args:
+            worker (SearchWorker): Пошук, остання сторінка якого щойно надійшла.
+        """
+        if worker.cache is None:
+            return
+        prefetch = SearchWorker(worker.query, max_results=worker.max_results, cache=worker.cache,
+                                projection=worker.projection, backend=worker.backend, flights=self.search_flights,
+                                start_page=worker.start_page + worker.pages)
+        self.threadpool.start(prefetch)
 
     def handle_search_results(self, data, elapsed):
         """
@@ -416,73 +1092,308 @@ class BookRecommender(QWidget):
             data (dict): JSON-дані від Google Books API.
             elapsed (float): Час пошуку в секундах.
         """
-        group_mode = self.grouping_box.currentText()
-        grouped = {}
-        ungrouped = []
-
-        start_grouping = time.perf_counter()  # починаємо вимірювати час групування
-
-        for item in data.get('items', []):
-            info = item.get('volumeInfo', {})
-            title = info.get('title', 'N/A')
-            published_date = info.get('publishedDate', 'N/A')
-            rating = info.get('averageRating', 'N/A')
-            image = info.get('imageLinks', {}).get('thumbnail', '')
-            authors = info.get('authors', [])
-
-            self.notifier.notify(title)
-
-            leaf = BookLeaf(title, image, published_date, rating, authors)
-
-            # Визначення ключа групування в залежності від режиму
-            if group_mode == "Group by Year":
-                key = published_date.split('-')[0] if published_date != 'N/A' else "Unknown"
-            elif group_mode == "Group by Rating":
-                key = str(rating) if rating != 'N/A' else "No Rating"
-            elif group_mode == "Group by First Letter":
-                key = title[0].upper() if title and title[0].isalpha() else "#"
-            elif group_mode == "Group by Author":
-                key = authors[0] if authors else "Unknown Author"
-            else:
-                key = None
+        if not self.is_current_search():
+            return
+        books = self.parse_results(data)
+        self.notifier.notify_many([book.title for book in books], [book.volume_id for book in books])
 
-            if key is None:
-                ungrouped.append(leaf)
-            else:
-                if key not in grouped:
-                    grouped[key] = BookComposite(key)
-                grouped[key].add(leaf)
-
-        # Відображення результатів пошуку з урахуванням вибраних прапорців
-        if group_mode == "No Grouping":
-            for leaf in ungrouped:
-                leaf.display(self.results_layout,
-                            show_date=self.check_var.isChecked(),
-                            show_rating=self.check_var2.isChecked())
-        else:
-            for key in sorted(grouped.keys()):
-                grouped[key].display(self.results_layout,
-                                    show_date=self.check_var.isChecked(),
-                                    show_rating=self.check_var2.isChecked())
+        self.current_query = self.result_query()
+        self.current_books = books
+        self.attach_results(self.current_query, tuple(books), replace=True)
+        self.render_results()
+        self.prefetch_neighbors()
+
+    def parse_results(self, data):
+        """
+        Розбирає сторінку результатів у BookLeaf і додає книги до індексу схожих.
+
+        Args:
+            data (dict): JSON-дані від Google Books API.
+
+        Returns:
+            list[BookLeaf]: Книги у порядку відповіді.
+        """
+        start = time.perf_counter()
+        books = parse_volumes(data, BookLeaf)
+        self.metrics.histogram("records_parse_seconds", "Parsing API items into book records").observe(
+            time.perf_counter() - start)
+        self.index_volumes(data, books)
+        return books
+
+    def index_volumes(self, data, books):
+        """
+        Додає книги сторінки до індексу схожих у потоці індексу.
+
+        Потік індексу один, тож книги додаються в порядку надходження сторінок.
+
+        Args:
+            data (dict): JSON-дані від Google Books API.
+            books (list[BookLeaf]): Книги, розібрані з data.
+        """
+        def add():
+            start = time.perf_counter()
+            self.similar_index.add_volumes(data, books)
+            self.metrics.histogram("similar_index_add_seconds", "Adding a result page to the similar-books index") \
+                .observe(time.perf_counter() - start)
+
+        self.start_index_worker(IndexWorker(add))
+
+    def start_index_worker(self, worker):
+        """
+        Запускає операцію з індексом схожих книг у потоці індексу.
 
-        end_grouping = time.perf_counter()
+        Args:
+            worker (IndexWorker): Операція; її помилку обробляє handle_index_error.
+        """
+        worker.signals.failed.connect(partial(self.handle_index_error, worker))
+        self.index_pool.start(worker)
+
+    def handle_index_error(self, worker, error):
+        """
+        Замінює індекс схожих книг, операція з яким завершилась помилкою.
+
+        Пошкоджений файл індексу або несумісні з ним дані інакше ламали б
+        кожну наступну операцію, тому далі використовується новий індекс у
+        пам'яті (створюється при першому зверненні). Файл на диску не змінюється.
+
+        Args:
+            worker (IndexWorker): Операція, що завершилась помилкою.
+            error (str): Повідомлення про помилку.
+        """
+        self.metrics.counter("similar_index_errors_total", "Similar-books index operations that failed").inc()
+        self.similar_index = None
+        if worker is self.similar_search:
+            self.similar_search = None
+            self.status_label.setText(f"Similar books unavailable: {error}")
+
+    def handle_search_stats(self, stats):
+        """
+        Показує, скільки книг отримано, скільки байтів передано мережею і скільки тривав розбір.
+
+        Args:
+            stats (dict): Статистика від SearchWorker.
+        """
+        # Мережа і розбір уже відбулися, тож метрики записуються і для застарілих пошуків
+        if stats["pages_fetched"]:
+            self.metrics.histogram("search_fetch_seconds", "Search time with network fetch, all pages").observe(
+                stats["elapsed"])
+            self.metrics.histogram("search_parse_seconds", "Streaming JSON parse time per search").observe(
+                stats["parse_time"])
+        self.metrics.counter("search_bytes_total", "Search response bytes over network").inc(stats["bytes"])
+        self.metrics.counter("search_pages_fetched_total", "Result pages fetched from the backend").inc(
+            stats["pages_fetched"])
+        self.metrics.counter("search_pages_cached_total", "Result pages served from the search cache").inc(
+            stats["pages_cached"])
+        if not self.is_current_search():
+            return
+        self.status_label.setText(
+            f"{stats['items']} books in {stats['elapsed'] * 1000:.0f} ms · "
+            f"{stats['bytes'] / 1024:.1f} KB over network · "
+            f"parse {stats['parse_time'] * 1000:.1f} ms · "
+            f"{stats['pages_cached']} of {stats['pages_cached'] + stats['pages_fetched']} pages from cache"
+        )
+
+    def render_results(self):
+        """
+        Перебудовує відображення останніх результатів без мережевих запитів.
+
+        Застосовує поточний режим групування і прапорці "Publish Date"/"Rating".
+        Обкладинки беруться з кешу, тому перегрупування не завантажує їх повторно.
+
+        Понад VIRTUAL_VIEW_THRESHOLD книг (або з увімкненим "Compact list view")
+        результати показуються у BookListView, де малюються лише видимі рядки.
+        Інакше картки додає ProgressiveRenderer: перший екран одразу, решту —
+        порціями по RENDER_BUDGET_MS між тиками циклу подій.
+        """
+        self.clear_results()
+        show_date = self.check_var.isChecked()
+        show_rating = self.check_var2.isChecked()
+        start = time.perf_counter()
+        groups = group_books(self.current_books, self.grouping_box.currentText())
+        grouped = time.perf_counter()
+        self.metrics.histogram("grouping_seconds", "Grouping results").observe(grouped - start)
+
+        self.displayed_rows = group_rows(groups)
+        self.displayed_in_list = self.use_list_view()
+        self.scroll_area.setVisible(not self.displayed_in_list)
+        self.results_view.setVisible(self.displayed_in_list)
+        if self.displayed_in_list:
+            self.results_model.set_groups(groups, show_date, show_rating)
+            elapsed = time.perf_counter() - grouped
+            self.observe_first_screen(elapsed)
+            self.observe_render(elapsed)
+            return
+        self.results_model.set_groups([])
+        self.result_renderer.start([self.row_step(row) for row in self.displayed_rows])
+
+    def render_added_results(self):
+        """
+        Вставляє у відображення лише рядки книг, яких там ще немає.
+
+        Показані картки (або рядки списку) не перебудовуються: нові книги і
+        заголовки нових груп вставляються на свої місця, а картки, що ще
+        додаються поступово, додаються першими. Якщо змінюється вигляд
+        (картки чи список) або показаний рядок зник з нових (дублікат з
+        попередньої сторінки), результати перебудовуються повністю.
+        """
+        rows = group_rows(group_books(self.current_books, self.grouping_box.currentText()))
+        inserted = added_rows(self.displayed_rows, rows)
+        if inserted is None or self.use_list_view() != self.displayed_in_list:
+            self.render_results()
+            return
+        self.displayed_rows = rows
+        if self.displayed_in_list:
+            self.results_model.insert_rows(inserted)
+        elif inserted:
+            self.result_renderer.extend([self.row_step(row, position) for position, row in inserted])
+
+    def use_list_view(self):
+        """
+        Повертає True, якщо поточні результати показуються у BookListView.
+        """
+        return self.list_view_box.isChecked() or len(self.current_books) > VIRTUAL_VIEW_THRESHOLD
+
+    def row_step(self, row, position=-1):
+        """
+        Повертає крок ProgressiveRenderer, що додає віджет рядка результатів.
+
+        Args:
+            row (tuple): Рядок з book_grouping.group_rows().
+            position (int, optional): Позиція віджета в layout. За замовчуванням — у кінці.
+        """
+        key, book = row
+        if book is None:
+            return partial(BookComposite(key).display_heading, self.results_layout, self.widget_pool, position)
+        return partial(book.display, self.results_layout, show_date=self.check_var.isChecked(),
+                       show_rating=self.check_var2.isChecked(), cover_loader=self.cover_loader,
+                       on_similar=self.show_similar, pool=self.widget_pool, position=position)
+
+    def observe_first_screen(self, elapsed):
+        """
+        Записує час до першого екрана результатів, а для нового пошуку — і час від його запуску.
+        """
+        self.metrics.histogram("render_first_screen_seconds", "Building the first screen of results").observe(elapsed)
+        if self.search_started_at is not None:
+            self.metrics.histogram("time_to_first_result_seconds", "From search start to first results on screen") \
+                .observe(time.perf_counter() - self.search_started_at)
+            self.search_started_at = None
+
+    def observe_render(self, elapsed):
+        """
+        Записує час від початку відображення до останньої картки.
+        """
+        self.metrics.histogram("render_seconds", "Building all result widgets").observe(elapsed)
+
+    def show_similar(self, book):
+        """
+        Показує книги, схожі на вибрану, з індексу вже отриманих результатів.
+
+        Схожі книги шукаються серед усіх книг, які приходили в пошуках цієї
+        сесії. Пошук виконує джерело лише одним запитом: категорії та опис
+        книги-зразка, яких немає в проєкції карток. Пошук іде в потоці
+        індексу після книг, що ще додаються, і відображається в handle_similar_results.
+        Повторний пошук (кнопка Search) повертає результати запиту, зазвичай з кешу.
+
+        Args:
+            book (BookRecord): Книга-зразок.
+        """
+        self.cancel_active_search()
+        worker = IndexWorker(partial(self.find_similar, book, self.search_backend()))
+        worker.signals.finished.connect(partial(self.handle_similar_results, worker, book))
+        self.similar_search = worker
+        self.status_label.setText(f"Looking for books similar to '{book.title}'...")
+        self.start_index_worker(worker)
+
+    def find_similar(self, book, backend):
+        """
+        Шукає схожі книги (виконується в потоці індексу).
+
+        Без категорій та опису (помилка мережі або джерело їх не має)
+        книга шукається за полями картки.
+
+        Args:
+            book (BookRecord): Книга-зразок.
+            backend (SearchBackend): Джерело, що надає категорії та опис книги.
+
+        Returns:
+            list[BookRecord]: До SIMILAR_BOOKS книг у порядку спадання подібності.
+        """
+        text = None
+        if book.volume_id:
+            try:
+                text = backend.volume_text(book.volume_id)
+            except Exception:
+                pass
+        categories, description = text or ((), "")
+        return [record for record, score in self.similar_index.similar(book, SIMILAR_BOOKS, categories, description)]
+
+    def handle_similar_results(self, worker, book, books):
+        """
+        Відображає схожі книги, якщо за цей час не почався інший пошук.
 
-        # Виводимо час пошуку та час групування
-        # print(f"Search time: {elapsed:.2f} seconds")
-        # print(f"Grouping and display time: {end_grouping - start_grouping:.2f} seconds")
+        Args:
+            worker (IndexWorker): Пошук, що надіслав результат.
+            book (BookRecord): Книга-зразок.
+            books (list[BookRecord]): Схожі книги.
+        """
+        if worker is not self.similar_search:
+            return
+        self.similar_search = None
+        # Результати запиту більше не показуються: повтор того самого запиту завантажить їх знову
+        self.current_query = None
+        self.current_books = books
+        self.showing_similar = True
+        self.render_results()
+        self.status_label.setText(f"{len(self.current_books)} books similar to '{book.title}'")
+
+    def show_similar_for_index(self, index):
+        """
+        Показує схожі книги для рядка віртуалізованого списку (подвійний клік).
+        """
+        book = index.data(BookRole)
+        if book is not None:
+            self.show_similar(book)
 
     def handle_search_error(self, error):
         """
         Обробляє помилки під час пошуку.
 
         Args:
-            error (tuple): Кортеж з інформацією про помилку.
+            error (str): Повідомлення про помилку.
         """
-        exctype, value, traceback_str = error
-        print(f"Search error: {value}")
+        self.metrics.counter("search_errors_total", "Searches that failed").inc()
+        if not self.is_current_search():
+            return
+        self.status_label.setText(f"Search error: {error}")
+
+
+def create_window():
+    """
+    Створює головне вікно з кешами, сесією і каталогом у ~/.book_recommender.
+
+    Індекс схожих книг з диска відкривається в потоці індексу разом з
+    імпортом numpy і scipy, тож вікно з'являється, не чекаючи на них.
+
+    Returns:
+        BookRecommender: Вікно, ще не показане.
+    """
+    catalog = LocalCatalogBackend(DEFAULT_CATALOG_PATH) if os.path.exists(DEFAULT_CATALOG_PATH) else None
+    recommender = BookRecommender(search_cache=SearchCache(path=DEFAULT_SEARCH_CACHE_PATH),
+                                  session=SessionStore(DEFAULT_SESSION_PATH),
+                                  catalog=catalog)
+
+    def open_similar_index():
+        # Перше завдання потоку індексу: книги перших результатів уже додаються в індекс на диску
+        import recommendations
+        recommender.similar_index = recommendations.SimilarBooksIndex(recommendations.DEFAULT_SIMILAR_PATH,
+                                                                      record_type=BookLeaf)
+
+    recommender.start_index_worker(IndexWorker(open_similar_index))
+    return recommender
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    recommender = BookRecommender()
+    recommender = create_window()
     recommender.show()
     sys.exit(app.exec_())
\ No newline at end of file
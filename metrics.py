@@ -0,0 +1,234 @@
+# Метрики продуктивності: гістограми затримок, лічильники і показники
+
+import bisect
+import json
+import os
+import threading
+
+DEFAULT_METRICS_DIR = os.path.join(os.path.expanduser("~"), ".book_recommender", "metrics")
+METRICS_PREFIX = "book_recommender_"
+
+# Межі кошиків у секундах: від пів мілісекунди до десяти секунд
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Гістограма з фіксованими кошиками, як histogram у Prometheus.
+
+    Значення не зберігаються: лише кількість у кожному кошику, сума і
+    кількість спостережень, тож пам'ять не росте з часом роботи.
+
+    Args:
+        name (str): Назва метрики.
+        help (str, optional): Опис метрики.
+        buckets (tuple, optional): Верхні межі кошиків за зростанням.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # останній кошик — +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """
+        Додає спостереження (наприклад, тривалість у секундах).
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: count, sum, кумулятивні кошики та оцінки p50/p95.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "count": running,
+            "sum": total,
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], cumulative)),
+            "p50": self._quantile(cumulative, 0.5),
+            "p95": self._quantile(cumulative, 0.95),
+        }
+
+    def _quantile(self, cumulative, q):
+        # Лінійна інтерполяція всередині кошика, як histogram_quantile у Prometheus
+        total = cumulative[-1]
+        if not total:
+            return None
+        rank = q * total
+        index = bisect.bisect_left(cumulative, rank)
+        if index >= len(self.buckets):
+            return self.buckets[-1]
+        lower = self.buckets[index - 1] if index else 0.0
+        below = cumulative[index - 1] if index else 0
+        in_bucket = cumulative[index] - below
+        return lower + (self.buckets[index] - lower) * (rank - below) / in_bucket
+
+
+class Counter:
+    """
+    Лічильник, що лише зростає (байти, влучання в кеш тощо).
+    """
+    kind = "counter"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def snapshot(self):
+        return self._value
+
+
+class Gauge:
+    """
+    Показник, що обчислюється в момент зняття знімка (глибина черги тощо).
+
+    Args:
+        name (str): Назва метрики.
+        function (callable): Повертає поточне значення.
+        help (str, optional): Опис метрики.
+        kind (str, optional): "gauge" або "counter" для лічильників, які
+            ведуть інші об'єкти (наприклад, hits у кешах).
+    """
+    def __init__(self, name, function, help="", kind="gauge"):
+        self.name = name
+        self.help = help
+        self.function = function
+        self.kind = kind
+
+    def snapshot(self):
+        return self.function()
+
+
+class MetricsRegistry:
+    """
+    Набір метрик застосунку з експортом у JSON і текстовий формат Prometheus.
+
+    Гістограми й лічильники можна оновлювати з будь-якого потоку. Показники
+    (gauge) читають стан Qt-об'єктів, тому знімок знімається в GUI-потоці.
+
+    Файли експорту підходять для textfile collector з node_exporter:
+    metrics.prom перезаписується атомарно.
+    """
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS):
+        """
+        Повертає гістограму з такою назвою, створюючи її за потреби.
+        """
+        return self._get(name, lambda: Histogram(name, help, buckets))
+
+    def counter(self, name, help=""):
+        """
+        Повертає лічильник з такою назвою, створюючи його за потреби.
+        """
+        return self._get(name, lambda: Counter(name, help))
+
+    def gauge(self, name, function, help="", kind="gauge"):
+        """
+        Реєструє показник, значення якого повертає function.
+        """
+        gauge = Gauge(name, function, help, kind)
+        with self._lock:
+            self._metrics[name] = gauge
+        return gauge
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: Назва метрики -> значення (для гістограм — словник).
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self):
+        """
+        Повертає метрики у текстовому форматі Prometheus (exposition format 0.0.4).
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            name = METRICS_PREFIX + metric.name
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            value = metric.snapshot()
+            if metric.kind == "histogram":
+                for bound, count in value["buckets"].items():
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+                lines.append(f"{name}_sum {value['sum']}")
+                lines.append(f"{name}_count {value['count']}")
+            else:
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory=DEFAULT_METRICS_DIR):
+        """
+        Записує metrics.json і metrics.prom у каталог.
+
+        Returns:
+            tuple: Шляхи до записаних файлів.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for filename, text in (("metrics.json", self.to_json()), ("metrics.prom", self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+        return tuple(paths)
+
+    def _get(self, name, factory):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+
+def format_summary(snapshot):
+    """
+    Форматує знімок метрик у короткі рядки для панелі у вікні.
+
+    Гістограми показуються як кількість, p50 і p95 у мілісекундах.
+
+    Returns:
+        str: Багаторядковий текст.
+    """
+    lines = []
+    for name, value in sorted(snapshot.items()):
+        if isinstance(value, dict):
+            if not value["count"]:
+                continue
+            lines.append(f"{name}: n={value['count']} p50={value['p50'] * 1000:.1f} ms "
+                         f"p95={value['p95'] * 1000:.1f} ms")
+        else:
+            lines.append(f"{name}: {value}")
+    return "\n".join(lines)
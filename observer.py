@@ -1,5 +1,11 @@
 # Оbserver
 
+import threading
+import time
+from collections import OrderedDict, deque
+
+from keyword_matcher import KeywordAutomaton
+
 class Observer:
     def update(self, book):
         """
@@ -10,15 +16,54 @@ class Observer:
         """
         pass
 
+    def update_many(self, books):
+        """
+        Пакетне оновлення: за замовчуванням викликає update для кожної книги.
+
+        .. note::
+           Спостерігачі можуть перевизначити цей метод для ефективнішої обробки пачки.
+        """
+        for book in books:
+            self.update(book)
+
 class BookNotifier:
     """
         Ініціалізує список спостерігачів.
 
+        У синхронному режимі (за замовчуванням) notify викликає спостерігачів
+        одразу. З async_dispatch=True сповіщення кладуться в обмежену чергу, а
+        окремий потік доставляє їх спостерігачам пачками через update_many,
+        тож повільний спостерігач не затримує відображення результатів.
+
+        Якщо черга переповнена, найстаріші сповіщення відкидаються (лічильник
+        dropped): актуальнішими вважаються книги з останнього пошуку.
+
+        Якщо разом із книгою передано її ідентифікатор (volume id), повторне
+        сповіщення про ту саму книгу протягом dedup_window секунд пропускається.
+
+        Args:
+            async_dispatch (bool, optional): Доставляти сповіщення у фоновому потоці.
+            max_queue (int, optional): Місткість черги в асинхронному режимі.
+            batch_size (int, optional): Максимальний розмір пачки для update_many.
+            dedup_window (float, optional): Вікно придушення дублікатів у секундах. None вимикає.
+
         .. note::
            Цей клас є суб'єктом (Subject) у паттерні **Observer**.
     """
-    def __init__(self):
+    def __init__(self, async_dispatch=False, max_queue=1000, batch_size=100, dedup_window=300.0):
         self.observers = []
+        self.async_dispatch = async_dispatch
+        self.batch_size = batch_size
+        self.dedup_window = dedup_window
+        self.delivered = 0
+        self.dropped = 0
+        self.suppressed = 0
+        self._queue = deque(maxlen=max_queue)
+        self._seen = OrderedDict()  # volume id -> час останнього сповіщення
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._thread = None
+        self._closed = False
 
     def subscribe(self, observer):
         """
@@ -29,26 +74,140 @@ class BookNotifier:
         """
         self.observers.append(observer)
 
-    def notify(self, book):
+    def notify(self, book, book_id=None):
         """
         Повідомляє усіх підписаних спостерігачів про подію.
 
+        Args:
+            book: Дані про книгу (наприклад, назва).
+            book_id (str, optional): Ідентифікатор для придушення дублікатів.
+
         .. note::
            Метод сповіщення у паттерні **Observer**.
         """
+        self.notify_many([book], [book_id])
+
+    def notify_many(self, books, book_ids=None):
+        """
+        Повідомляє спостерігачів про цілу сторінку книг одним викликом.
+
+        Args:
+            books (list): Дані про книги.
+            book_ids (list, optional): Ідентифікатори книг (None — без придушення дублікатів).
+
+        .. note::
+           Пакетний варіант notify у паттерні **Observer**.
+        """
+        books = self._deduplicate(books, book_ids)
+        if not books:
+            return
+        if not self.async_dispatch:
+            self._deliver(books)
+            return
+
+        with self._condition:
+            for book in books:
+                if len(self._queue) == self._queue.maxlen:
+                    self.dropped += 1  # deque з maxlen сам витісняє найстаріший елемент
+                self._queue.append(book)
+            self._ensure_thread()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Чекає, доки всі сповіщення з черги будуть доставлені.
+
+        Returns:
+            bool: True, якщо черга спорожніла до закінчення timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+
+    def close(self):
+        """
+        Зупиняє фоновий потік доставки після спорожнення черги.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        """
+        Повертає лічильники доставки.
+
+        Returns:
+            dict: delivered, dropped, suppressed, queued.
+        """
+        with self._condition:
+            return {
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "suppressed": self.suppressed,
+                "queued": len(self._queue),
+            }
+
+    def _deduplicate(self, books, book_ids):
+        if book_ids is None or self.dedup_window is None:
+            return list(books)
+        now = time.monotonic()
+        result = []
+        with self._condition:
+            # Записи, старші за вікно, лежать на початку OrderedDict
+            while self._seen and now - next(iter(self._seen.values())) > self.dedup_window:
+                self._seen.popitem(last=False)
+            for book, book_id in zip(books, book_ids):
+                if book_id is not None:
+                    if book_id in self._seen:
+                        self.suppressed += 1
+                        continue
+                    self._seen[book_id] = now
+                result.append(book)
+        return result
+
+    def _deliver(self, books):
         for observer in self.observers:
-            observer.update(book)
+            try:
+                observer.update_many(books)
+            except Exception as e:
+                # Помилка одного спостерігача не повинна зупиняти доставку іншим
+                print(f"Observer error: {e}")
+        with self._condition:
+            self.delivered += len(books)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, name="BookNotifier", daemon=True)
+            self._thread.start()
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                self._in_flight = len(batch)
+            self._deliver(batch)
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
 
 
 class UserKeywordSubscriber(Observer):
     """
         Ініціалізує набір ключових слів для спостереження.
 
+        Ключові слова компілюються в автомат Ахо-Корасік, тому кожна назва
+        перевіряється за один прохід незалежно від кількості підписок.
+
         .. note::
            Конкретний спостерігач у паттерні **Observer**.
     """
     def __init__(self):
         self.keywords = set()
+        self._matcher = KeywordAutomaton()
 
     def add_keyword(self, keyword):
         """
@@ -57,7 +216,9 @@ class UserKeywordSubscriber(Observer):
         .. note::
            Внутрішня логіка спостерігача (Observer).
         """
-        self.keywords.add(keyword.lower())
+        keyword = keyword.lower()
+        self.keywords.add(keyword)
+        self._matcher.add(keyword)
 
     def update(self, book_title):
         """
@@ -66,6 +227,16 @@ class UserKeywordSubscriber(Observer):
         .. note::
            Перевизначення методу update в паттерні **Observer**.
         """
-        for keyword in self.keywords:
-            if keyword in book_title.lower():
+        for keyword in self._matcher.find(book_title):
+            print(f"📢 Found book with '{keyword}': {book_title}")
+
+    def update_many(self, book_titles):
+        """
+        Перевіряє цілу сторінку назв одним пакетом.
+
+        .. note::
+           Пакетне перевизначення update у паттерні **Observer**.
+        """
+        for book_title, found in zip(book_titles, self._matcher.find_many(book_titles)):
+            for keyword in found:
                 print(f"📢 Found book with '{keyword}': {book_title}")
@@ -0,0 +1,487 @@
+# Рекомендації "схожі книги" (TF-IDF і косинусна подібність)
+
+import json
+import math
+import os
+import re
+import sqlite3
+import zlib
+from collections import Counter
+
+import numpy as np
+import scipy.sparse as sp
+
+from book_records import BookRecord
+
+N_FEATURES = 1 << 20
+DEFAULT_SIMILAR_PATH = os.path.join(os.path.expanduser("~"), ".book_recommender", "similar")
+
+# Вага полів у векторі книги: слово з назви важить утричі більше, ніж з опису
+TITLE_WEIGHT = 3.0
+AUTHOR_WEIGHT = 2.0
+CATEGORY_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+_WORD = re.compile(r"\w{2,}")
+
+
+def book_features(title, authors=(), categories=(), description=""):
+    """
+    Рахує зважені ознаки книги.
+
+    Слова назви та опису — спільні ознаки (слово з назви однієї книги
+    збігається зі словом в описі іншої), автори і категорії — окремі
+    ознаки цілими значеннями.
+
+    Args:
+        title (str): Назва.
+        authors (iterable, optional): Автори.
+        categories (iterable, optional): Категорії.
+        description (str, optional): Опис.
+
+    Returns:
+        Counter: Ознака -> зважена частота.
+    """
+    features = Counter()
+    for word in _WORD.findall(title.lower()):
+        features[word] += TITLE_WEIGHT
+    for word in _WORD.findall(description.lower()):
+        features[word] += DESCRIPTION_WEIGHT
+    for author in authors:
+        features["a:" + author.lower()] += AUTHOR_WEIGHT
+    for category in categories:
+        features["c:" + category.lower()] += CATEGORY_WEIGHT
+    return features
+
+
+def hash_features(features, n_features=N_FEATURES):
+    """
+    Переводить ознаки у стовпці розрідженого вектора (hashing trick).
+
+    Використовується crc32, а не hash(), щоб номери стовпців не залежали
+    від запуску. Частота згладжується як 1 + log(tf).
+
+    Returns:
+        tuple: (columns, values) — numpy-масиви int32 і float32 з унікальними стовпцями.
+    """
+    columns = {}
+    mask = n_features - 1
+    for feature, count in features.items():
+        column = zlib.crc32(feature.encode("utf-8")) & mask
+        columns[column] = columns.get(column, 0.0) + count
+    cols = np.fromiter(columns.keys(), dtype=np.int32, count=len(columns))
+    values = np.fromiter((1.0 + math.log(count) for count in columns.values()), dtype=np.float32, count=len(columns))
+    return cols, values
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    row INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _map_file(path, dtype, length):
+    """
+    Відкриває файл як масив numpy у пам'яті (memmap), за потреби збільшуючи файл.
+    """
+    itemsize = np.dtype(dtype).itemsize
+    if os.path.exists(path):
+        length = max(length, os.path.getsize(path) // itemsize)
+        mode = "r+"
+    else:
+        mode = "w+"
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(max(length, 1),))
+
+
+def _ranges(starts, lengths):
+    # Індекси всіх елементів відрізків [start, start + length) одним масивом
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+
+class _GrowableArray:
+    """
+    Масив numpy з амортизованим додаванням у кінець (подвоєння місткості).
+
+    Якщо задано path, масив відображено з файлу (memmap) і він зберігається
+    на диску без окремого кроку запису.
+    """
+    __slots__ = ("data", "size", "path")
+
+    def __init__(self, dtype, capacity=1024, path=None, size=0):
+        self.path = path
+        self.size = size
+        if path is None:
+            self.data = np.empty(max(capacity, size), dtype=dtype)
+        else:
+            self.data = _map_file(path, dtype, max(capacity, size))
+
+    def extend(self, values):
+        end = self.size + len(values)
+        if end > len(self.data):
+            capacity = max(end, 2 * len(self.data))
+            if self.path is None:
+                grown = np.empty(capacity, dtype=self.data.dtype)
+                grown[:self.size] = self.data[:self.size]
+            else:
+                self.data.flush()
+                grown = _map_file(self.path, self.data.dtype, capacity)
+            self.data = grown
+        self.data[self.size:end] = values
+        self.size = end
+
+    def view(self):
+        return self.data[:self.size]
+
+    def flush(self):
+        if self.path is not None:
+            self.data.flush()
+
+
+class SimilarBooksIndex:
+    """
+    Індекс "схожих книг" за TF-IDF з косинусною подібністю.
+
+    Кожна книга — розріджений вектор ознак з назви, авторів, категорій
+    та опису. Вектори зберігаються рядками (прямий індекс, CSR), а пошук
+    іде двома частинами:
+
+    * основна — наближений інвертований індекс (CSC зі статичним
+      обрізанням): у стовпці кожної ознаки лишаються posting_limit книг
+      з найбільшою вагою. Запит бере query_terms найважчих ознак книги,
+      набирає кандидатів за частковою сумою і переоцінює rerank найкращих
+      точним косинусом за прямим індексом. Час запиту обмежений
+      query_terms * posting_limit і майже не залежить від розміру індексу;
+    * дельта — книги, додані після останнього злиття; їх мало, тож вони
+      перемножуються з вектором запиту точно.
+
+    Нова книга зважується поточним IDF і лише дописується в дельту. Коли
+    дельта перевищує merge_fraction основної частини, будується нова
+    основна частина з перерахованим для всіх книг IDF, тож вартість злиттів
+    амортизована. З query_terms=None і posting_limit=None пошук точний.
+
+    Якщо задано path, масиви індексу відображаються з файлів каталогу
+    (memmap), а записи книг лежать у SQLite поруч: відкриття індексу не
+    читає його в пам'ять, а додані книги одразу потрапляють на диск.
+
+    Індекс не потокобезпечний, але не прив'язаний до потоку, що його
+    створив: звернення мають іти по черзі (BookRecommender виконує їх в
+    одному фоновому потоці).
+
+    Args:
+        path (str, optional): Каталог індексу. За замовчуванням індекс лише в пам'яті.
+        n_features (int, optional): Розмірність простору ознак (степінь двійки).
+        record_type (type, optional): Клас записів у результатах (наприклад, BookLeaf).
+        merge_fraction (float, optional): Відносний розмір дельти, після якого виконується злиття.
+        min_delta (int, optional): Мінімальний розмір дельти для злиття.
+        query_terms (int | None, optional): Скільки найважчих ознак запиту використовувати.
+        posting_limit (int | None, optional): Скільки книг лишати в стовпці ознаки.
+        rerank (int, optional): Скільки кандидатів переоцінювати точно.
+
+    Attributes:
+        merges (int): Кількість злиттів (і номер поточної основної частини на диску).
+    """
+    def __init__(self, path=None, n_features=N_FEATURES, record_type=BookRecord, merge_fraction=0.1,
+                 min_delta=1000, query_terms=16, posting_limit=500, rerank=50):
+        self.path = path
+        self.n_features = n_features
+        self.record_type = record_type
+        self.merge_fraction = merge_fraction
+        self.min_delta = min_delta
+        self.query_terms = query_terms
+        self.posting_limit = posting_limit
+        self.rerank = rerank
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "books.sqlite3") if path is not None else ":memory:",
+                                     check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        meta = dict(self._conn.execute("SELECT name, value FROM meta"))
+        if meta.get("n_features", n_features) != n_features:
+            raise ValueError(f"index at {path} uses {meta['n_features']} features, not {n_features}")
+        self._count = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM books").fetchone()[0]
+        self.merges = meta.get("merges", 0)
+        self._main_rows = meta.get("main_rows", 0)
+
+        self._indptr = _GrowableArray(np.int64, path=self._file("indptr"), size=self._count + 1)
+        if self._count == 0:
+            self._indptr.data[0] = 0
+        nnz = int(self._indptr.data[self._count])
+        self._indices = _GrowableArray(np.int32, path=self._file("indices"), size=nnz)
+        self._tf = _GrowableArray(np.float32, path=self._file("tf"), size=nnz)
+        self._weights = _GrowableArray(np.float32, path=self._file("weights"), size=nnz)  # tf * idf, нормовані по рядку
+        if path is None:
+            self._df = np.zeros(n_features, dtype=np.int32)
+        else:
+            self._df = _map_file(self._file("df"), np.int32, n_features)
+
+        # Основна частина: обрізаний CSC рядків [0, _main_rows)
+        self._main_indptr = self._load_main("main_indptr", np.int64)
+        self._main_postings = self._load_main("main_rows", np.int32)
+        self._main_weights = self._load_main("main_weights", np.float32)
+        self._delta = None      # CSR рядків [_main_rows, n), скидається при додаванні
+        self._query = np.zeros(n_features, dtype=np.float32)
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def book_key(record):
+        """
+        Повертає ключ книги: volume_id або назву, якщо id немає.
+        """
+        return record.volume_id or record.title
+
+    def add(self, record, categories=(), description=""):
+        """
+        Додає книгу до індексу; вже відома книга пропускається.
+
+        Args:
+            record (BookRecord): Запис книги.
+            categories (iterable, optional): Категорії.
+            description (str, optional): Опис.
+
+        Returns:
+            bool: True, якщо книгу додано.
+        """
+        with self._conn:
+            return self._add(record, categories, description)
+
+    def add_volumes(self, data, records):
+        """
+        Додає книги зі сторінки відповіді API однією транзакцією.
+
+        Args:
+            data (dict): Відповідь API; з items беруться категорії та опис.
+            records (list): Записи, розібрані з тієї ж відповіді (у тому ж порядку).
+
+        Returns:
+            int: Кількість нових книг.
+        """
+        added = 0
+        with self._conn:
+            for item, record in zip(data.get("items", []), records):
+                info = item.get("volumeInfo", {})
+                added += self._add(record, info.get("categories", ()), info.get("description", ""))
+        return added
+
+    def record(self, row):
+        """
+        Повертає запис книги за номером рядка.
+        """
+        return self._records([row])[0]
+
+    def similar(self, record, k=10, categories=(), description=""):
+        """
+        Повертає k книг, найбільш схожих на задану.
+
+        Книга, якої немає в індексі (наприклад, відновлена з сесії), шукається
+        за своїми назвою та авторами. Якщо передано категорії чи опис,
+        вектор запиту будується з них разом з назвою та авторами, навіть
+        коли книга вже в індексі (її там могли додати лише з полів картки).
+
+        Args:
+            record (BookRecord): Книга-зразок.
+            k (int, optional): Кількість результатів.
+            categories (iterable, optional): Категорії книги-зразка.
+            description (str, optional): Опис книги-зразка.
+
+        Returns:
+            list[tuple]: Пари (запис, подібність від 0 до 1) у порядку спадання.
+        """
+        row = self._row(self.book_key(record))
+        if row is not None and not (categories or description):
+            start, end = self._indptr.data[row], self._indptr.data[row + 1]
+            cols = self._indices.data[start:end]
+            weights = self._weights.data[start:end]
+        else:
+            cols, values = hash_features(book_features(record.title, record.authors, categories, description),
+                                         self.n_features)
+            weights = self._weigh(cols, values)
+        if self._count == 0 or not weights.any():
+            return []
+
+        rows, scores = [], []
+        if self._main_rows:
+            rows_main, scores_main = self._search_main(cols, weights, k + 1)
+            rows.append(rows_main)
+            scores.append(scores_main)
+        if self._count > self._main_rows:
+            if self._delta is None:
+                self._delta = self._rows_matrix(self._main_rows, self._count)
+            query = self._query
+            query[cols] = weights
+            rows.append(np.arange(self._main_rows, self._count))
+            scores.append(self._delta @ query)
+            query[cols] = 0.0
+        rows, scores = np.concatenate(rows), np.concatenate(scores)
+        keep = (scores > 0) & (rows != row)
+        rows, scores = rows[keep], scores[keep]
+
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        records = self._records(rows[order].tolist())
+        return list(zip(records, scores[order].tolist()))
+
+    def merge(self):
+        """
+        Будує нову основну частину з усіх книг і перераховує IDF.
+        """
+        n = self._count
+        indptr = self._indptr.view()
+        weights = self._tf.view() * self._idf(self._indices.view())
+        # Норми рядків через кумулятивну суму квадратів (порожні рядки дають 0)
+        squares = np.concatenate(([0.0], np.cumsum(weights.astype(np.float64) ** 2)))
+        norms = np.sqrt(squares[indptr[1:]] - squares[indptr[:-1]])
+        norms[norms == 0] = 1.0
+        weights /= np.repeat(norms, np.diff(indptr)).astype(np.float32)
+        self._weights.data[:len(weights)] = weights
+
+        main = self._rows_matrix(0, n).tocsc()
+        main_indptr = main.indptr.astype(np.int64)
+        postings, values = main.indices, main.data
+        if self.posting_limit is not None:
+            # Статичне обрізання: у довгих стовпцях лишаються книги з найбільшою вагою
+            lengths = np.diff(main_indptr)
+            keep = np.ones(len(postings), dtype=bool)
+            for col in np.flatnonzero(lengths > self.posting_limit):
+                start, end = main_indptr[col], main_indptr[col + 1]
+                drop = end - start - self.posting_limit
+                keep[start + np.argpartition(values[start:end], drop - 1)[:drop]] = False
+            postings, values = postings[keep], values[keep]
+            main_indptr = np.concatenate(([0], np.cumsum(np.minimum(lengths, self.posting_limit))))
+
+        previous = self.merges
+        self.merges += 1
+        self._main_indptr = self._save_main("main_indptr", main_indptr.astype(np.int64))
+        self._main_postings = self._save_main("main_rows", postings.astype(np.int32))
+        self._main_weights = self._save_main("main_weights", values.astype(np.float32))
+        self._main_rows = n
+        self._delta = None
+        if self.path is not None:
+            for array in (self._indptr, self._indices, self._tf, self._weights):
+                array.flush()
+            self._df.flush()
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                ("n_features", self.n_features), ("merges", self.merges), ("main_rows", n)])
+        if self.path is not None:
+            for name in ("main_indptr", "main_rows", "main_weights"):
+                try:
+                    os.remove(self._file(f"{name}.{previous}"))
+                except OSError:
+                    pass
+
+    def close(self):
+        """
+        Скидає масиви на диск і закриває базу записів.
+        """
+        for array in (self._indptr, self._indices, self._tf, self._weights):
+            array.flush()
+        if self.path is not None:
+            self._df.flush()
+        self._conn.close()
+
+    def _add(self, record, categories, description):
+        key = self.book_key(record)
+        data = json.dumps([record.title, record.poster, record.date, record.rating, list(record.authors),
+                           record.volume_id], ensure_ascii=False, separators=(",", ":"))
+        if self._conn.execute("INSERT OR IGNORE INTO books VALUES (?, ?, ?)",
+                              (self._count, key, data)).rowcount == 0:
+            return False
+        cols, values = hash_features(book_features(record.title, record.authors, categories, description),
+                                     self.n_features)
+        self._count += 1
+        self._df[cols] += 1
+        self._indices.extend(cols)
+        self._tf.extend(values)
+        self._weights.extend(self._weigh(cols, values))
+        self._indptr.extend([self._indices.size])
+        self._delta = None
+        if self._count - self._main_rows >= max(self.min_delta, self.merge_fraction * self._main_rows):
+            self.merge()
+        return True
+
+    def _search_main(self, cols, weights, k):
+        # Кандидати з основної частини з точними оцінками
+        terms = np.arange(len(cols))
+        if self.query_terms is not None and len(cols) > self.query_terms:
+            terms = np.argpartition(-weights, self.query_terms - 1)[:self.query_terms]
+        starts = self._main_indptr[cols[terms]]
+        lengths = self._main_indptr[cols[terms] + 1] - starts
+        positions = _ranges(starts, lengths)
+        postings = self._main_postings[positions]
+        values = self._main_weights[positions] * np.repeat(weights[terms], lengths)
+
+        if self.query_terms is None and self.posting_limit is None:
+            scores = np.bincount(postings, weights=values, minlength=self._main_rows)
+            top = np.argpartition(-scores, min(k, self._main_rows) - 1)[:k]
+            return top, scores[top]
+
+        candidates, inverse = np.unique(postings, return_inverse=True)
+        rerank = max(self.rerank, k)
+        if len(candidates) > rerank:
+            partial = np.bincount(inverse, weights=values)
+            candidates = candidates[np.argpartition(-partial, rerank - 1)[:rerank]]
+        return candidates, self._score_rows(candidates, cols, weights)
+
+    def _score_rows(self, rows, cols, weights):
+        # Точний косинус запиту з рядками прямого індексу
+        query = self._query
+        query[cols] = weights
+        starts = self._indptr.data[rows]
+        lengths = self._indptr.data[rows + 1] - starts
+        positions = _ranges(starts, lengths)
+        products = self._weights.data[positions] * query[self._indices.data[positions]]
+        query[cols] = 0.0
+        return np.bincount(np.repeat(np.arange(len(rows)), lengths), weights=products, minlength=len(rows))
+
+    def _row(self, key):
+        found = self._conn.execute("SELECT row FROM books WHERE key = ?", (key,)).fetchone()
+        return found[0] if found else None
+
+    def _records(self, rows):
+        placeholders = ", ".join("?" * len(rows))
+        found = dict(self._conn.execute(f"SELECT row, data FROM books WHERE row IN ({placeholders})", rows))
+        return [self.record_type(*json.loads(found[row])) for row in rows]
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin") if self.path is not None else None
+
+    def _load_main(self, name, dtype):
+        path = self._file(f"{name}.{self.merges}")
+        if path is None or not os.path.exists(path) or not os.path.getsize(path):
+            return np.zeros(1 if name == "main_indptr" else 0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def _save_main(self, name, array):
+        if self.path is None or not len(array):
+            return array
+        path = self._file(f"{name}.{self.merges}")
+        array.tofile(path)
+        return np.memmap(path, dtype=array.dtype, mode="r")
+
+    def _idf(self, cols):
+        # Згладжений IDF, як у scikit-learn: log((1 + n) / (1 + df)) + 1
+        return (np.log((1.0 + self._count) / (1.0 + self._df[cols])) + 1.0).astype(np.float32)
+
+    def _weigh(self, cols, values):
+        weights = values * self._idf(cols)
+        norm = np.linalg.norm(weights)
+        return weights / norm if norm else weights
+
+    def _rows_matrix(self, start_row, end_row):
+        indptr = self._indptr.data[start_row:end_row + 1]
+        start, end = indptr[0], indptr[-1]
+        return sp.csr_matrix((self._weights.data[start:end], self._indices.data[start:end], indptr - start),
+                             shape=(end_row - start_row, self.n_features))
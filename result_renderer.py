@@ -0,0 +1,123 @@
+# Поступове відображення результатів з бюджетом часу на кадр
+
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+RENDER_BUDGET_MS = 8  # скільки GUI-потік може будувати віджети за один тик циклу подій
+
+
+class ProgressiveRenderer(QObject):
+    """
+    Додає віджети результатів у layout порціями між тиками циклу подій.
+
+    Кроки виконуються одразу в start(), поки додані віджети не заповнять
+    висоту viewport (перший екран). Решта кроків виконується порціями,
+    кожна не довша за budget_ms, з таймера з нульовим інтервалом: між
+    порціями вікно перемальовується і обробляє введення.
+
+    Args:
+        layout (QLayout): Layout, у який кроки додають віджети.
+        viewport (QWidget): Видима область; її висота визначає перший екран.
+        budget_ms (float, optional): Бюджет однієї порції в мілісекундах.
+
+    Attributes:
+        first_screen (pyqtSignal): Секунди від start() до заповнення першого екрана.
+        finished (pyqtSignal): Секунди від start() до останнього віджета.
+    """
+    first_screen = pyqtSignal(float)
+    finished = pyqtSignal(float)
+
+    def __init__(self, layout, viewport, budget_ms=RENDER_BUDGET_MS, parent=None):
+        super().__init__(parent)
+        self.layout = layout
+        self.viewport = viewport
+        self.budget_ms = budget_ms
+        self._steps = []
+        self._next = 0
+        self._started = 0.0
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._tick)
+
+    @property
+    def active(self):
+        return self._next < len(self._steps)
+
+    def start(self, steps):
+        """
+        Скасовує попереднє відображення і починає нове.
+
+        Args:
+            steps (list): Виклики без аргументів; кожен додає в layout один віджет.
+        """
+        self.cancel()
+        self._steps = list(steps)
+        self._started = time.perf_counter()
+        height = self.viewport.height()
+        spacing = max(self.layout.spacing(), 0)
+        filled = 0
+        while self.active and filled < height:
+            self._steps[self._next]()
+            self._next += 1
+            # Новий віджет ще прихований, тож висота береться з самого віджета, а не з елемента layout
+            item = self.layout.itemAt(self.layout.count() - 1)
+            if item is not None and item.widget() is not None:
+                filled += item.widget().sizeHint().height() + spacing
+        self.first_screen.emit(time.perf_counter() - self._started)
+        if self.active:
+            self._timer.start()
+        else:
+            self._finish()
+
+    def extend(self, steps):
+        """
+        Додає кроки після тих, що ще не виконані, не скасовуючи відображення.
+
+        Якщо відображення вже завершилось, кроки починають нове (як у start()).
+
+        Args:
+            steps (list): Виклики без аргументів; кожен додає в layout один віджет.
+        """
+        if not self.active:
+            self.start(steps)
+            return
+        self._steps.extend(steps)
+
+    def cancel(self):
+        """
+        Зупиняє відображення; кроки, що лишилися, не виконуються.
+        """
+        self._timer.stop()
+        self._steps = []
+        self._next = 0
+
+    def finish(self):
+        """
+        Виконує всі кроки, що лишилися, одразу.
+        """
+        if not self.active:
+            return
+        self._timer.stop()
+        while self.active:
+            self._steps[self._next]()
+            self._next += 1
+        self._finish()
+
+    def _tick(self):
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        # Щонайменше один крок за тик, навіть якщо він довший за бюджет
+        while True:
+            self._steps[self._next]()
+            self._next += 1
+            if not self.active or time.perf_counter() >= deadline:
+                break
+        if not self.active:
+            self._timer.stop()
+            self._finish()
+
+    def _finish(self):
+        elapsed = time.perf_counter() - self._started
+        self._steps = []
+        self._next = 0
+        self.finished.emit(elapsed)
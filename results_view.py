@@ -0,0 +1,207 @@
+# Віртуалізований список результатів (Model/View)
+
+from collections import OrderedDict
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate
+
+from book_grouping import group_rows
+from cover_loader import COVER_SIZE
+
+BookRole = Qt.UserRole + 1
+IsHeaderRole = Qt.UserRole + 2
+
+HEADER_HEIGHT = 40
+HEADER_FONT_SCALE = 1.2  # у скільки разів шрифт заголовка групи більший за шрифт рядка
+CARD_PADDING = 8
+CARD_HEIGHT = COVER_SIZE[1] + 2 * CARD_PADDING
+
+
+class BookListModel(QAbstractListModel):
+    """
+    Плоска модель результатів: рядки-заголовки груп і рядки-книги.
+
+    Модель не створює віджетів: кожен рядок малює BookDelegate, а QListView
+    звертається лише до видимих рядків. Обкладинки запитуються у
+    CoverLoader тільки тоді, коли рядок вперше стає видимим, і тримаються
+    в обмеженому LRU, тому пам'ять не росте з кількістю результатів.
+
+    Args:
+        cover_loader (CoverLoader, optional): Завантажувач обкладинок.
+        max_covers (int, optional): Скільки QPixmap тримати в пам'яті моделі.
+    """
+    def __init__(self, cover_loader=None, max_covers=256, parent=None):
+        super().__init__(parent)
+        self.cover_loader = cover_loader
+        self.max_covers = max_covers
+        self.show_date = True
+        self.show_rating = True
+        self._rows = []           # (key, None) для заголовка або (None, книга)
+        self._rows_by_url = {}    # url -> номери рядків з цією обкладинкою
+        self._covers = OrderedDict()
+        self._requested = set()
+        if cover_loader is not None:
+            cover_loader.cover_ready.connect(self._on_cover_ready)
+
+    def set_groups(self, groups, show_date=True, show_rating=True):
+        """
+        Замінює вміст моделі.
+
+        Args:
+            groups (list): Результат book_grouping.group_books().
+            show_date (bool, optional): Показувати дату публікації.
+            show_rating (bool, optional): Показувати рейтинг.
+        """
+        self.beginResetModel()
+        self.show_date = show_date
+        self.show_rating = show_rating
+        self._rows = group_rows(groups)
+        self._requested = set(self._covers)
+        self._index_covers()
+        self.endResetModel()
+
+    def insert_rows(self, rows):
+        """
+        Вставляє рядки без скидання моделі.
+
+        Використовується для нової сторінки результатів: view не втрачає
+        прокрутку і вибір, а перемальовує лише вставлені рядки.
+
+        Args:
+            rows (list): Пари (позиція, рядок) з book_grouping.added_rows().
+        """
+        for position, row in rows:
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self.endInsertRows()
+        self._index_covers()
+
+    def _index_covers(self):
+        # Номери рядків змінюються після вставки, тож відповідність обкладинкам будується заново
+        self._rows_by_url = {}
+        for row, (key, book) in enumerate(self._rows):
+            if book is not None and book.poster:
+                self._rows_by_url.setdefault(book.poster, []).append(row)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        key, book = self._rows[index.row()]
+        if role == IsHeaderRole:
+            return book is None
+        if role == Qt.DisplayRole:
+            return key if book is None else book.title
+        if role == BookRole:
+            return book
+        if role == Qt.DecorationRole and book is not None and book.poster:
+            return self._cover(book.poster)
+        return None
+
+    def _cover(self, url):
+        pixmap = self._covers.get(url)
+        if pixmap is not None:
+            self._covers.move_to_end(url)
+            return pixmap
+        if url not in self._requested and self.cover_loader is not None:
+            self._requested.add(url)
+            self.cover_loader.load(url)
+        return None
+
+    def _on_cover_ready(self, url, pixmap):
+        rows = self._rows_by_url.get(url)
+        if not rows:
+            return
+        self._covers[url] = pixmap
+        self._covers.move_to_end(url)
+        while len(self._covers) > self.max_covers:
+            evicted_url, _ = self._covers.popitem(last=False)
+            # витіснену обкладинку можна буде запитати знову (з ThumbnailCache)
+            self._requested.discard(evicted_url)
+        for row in rows:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class BookDelegate(QStyledItemDelegate):
+    """
+    Малює рядок BookListModel: заголовок групи або картку книги.
+
+    Картка містить обкладинку (або заглушку), назву, авторів, дату і рейтинг
+    відповідно до прапорців моделі.
+    """
+    def sizeHint(self, option, index):
+        if index.data(IsHeaderRole):
+            return QSize(option.rect.width(), HEADER_HEIGHT)
+        return QSize(option.rect.width(), CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        if index.data(IsHeaderRole):
+            font = QFont(option.font)
+            font.setBold(True)
+            # Стиль вікна задає розмір у пікселях (font-size: 16px), тоді pointSizeF() дорівнює -1
+            if font.pixelSize() > 0:
+                font.setPixelSize(round(font.pixelSize() * HEADER_FONT_SCALE))
+            else:
+                font.setPointSizeF(font.pointSizeF() * HEADER_FONT_SCALE)
+            painter.setFont(font)
+            painter.setPen(QColor("darkblue"))
+            painter.drawText(rect.adjusted(CARD_PADDING, 10, 0, 0), Qt.AlignLeft | Qt.AlignVCenter,
+                             index.data(Qt.DisplayRole))
+            painter.restore()
+            return
+
+        book = index.data(BookRole)
+        card = rect.adjusted(0, 2, 0, -2)
+        painter.fillRect(card, QColor("#DDEEFF") if option.state & QStyle.State_Selected else QColor("white"))
+
+        cover_rect = QRect(card.left() + CARD_PADDING, card.top() + CARD_PADDING - 2, *COVER_SIZE)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None:
+            painter.drawPixmap(cover_rect, pixmap)
+        else:
+            painter.fillRect(cover_rect, QColor("#EEEEEE"))
+
+        lines = [book.title]
+        if book.authors:
+            lines.append(f"Author(s): {', '.join(book.authors)}")
+        if index.model().show_date:
+            lines.append(f"Date: {book.date}")
+        if index.model().show_rating:
+            lines.append(f"Rating: {book.rating}")
+
+        text_rect = card.adjusted(COVER_SIZE[0] + 2 * CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        line_height = option.fontMetrics.lineSpacing() + 4
+        painter.setPen(QColor("black"))
+        for i, line in enumerate(lines):
+            font = QFont(option.font)
+            font.setBold(i == 0)
+            painter.setFont(font)
+            line_rect = QRect(text_rect.left(), text_rect.top() + i * line_height, text_rect.width(), line_height)
+            painter.drawText(line_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                             painter.fontMetrics().elidedText(line, Qt.ElideRight, line_rect.width()))
+        painter.restore()
+
+
+class BookListView(QListView):
+    """
+    QListView, налаштований для BookListModel і BookDelegate.
+
+    Розміри рядків обчислюються пакетами, тож навіть десятки тисяч рядків
+    не блокують GUI-потік при заповненні.
+    """
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(BookDelegate(self))
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setStyleSheet("background-color: #FAFAFA;")
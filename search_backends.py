@@ -0,0 +1,71 @@
+# Джерела результатів пошуку
+
+from books_api import fetch_volume_text, fetch_volumes
+
+
+class SearchBackend:
+    """
+    Інтерфейс джерела результатів для SearchWorker.
+
+    Реалізація повертає сторінку у форматі відповіді Google Books API
+    (словник з items), тому розбір, групування і відображення не залежать
+    від того, звідки взято книги.
+
+    Attributes:
+        name (str): Назва джерела для інтерфейсу.
+        cacheable (bool): Чи варто кешувати відповіді в SearchCache.
+    """
+    name = "backend"
+    cacheable = False
+
+    def search(self, query, max_results=20, start_index=0, fields=None, cancel_event=None):
+        """
+        Повертає одну сторінку результатів.
+
+        Args:
+            query (str): Запит пошуку.
+            max_results (int, optional): Розмір сторінки.
+            start_index (int, optional): Зсув сторінки.
+            fields (str, optional): Проєкція полів (див. FIELD_PROJECTIONS).
+            cancel_event (threading.Event, optional): Подія скасування пошуку.
+
+        Returns:
+            tuple: (data, stats), де stats містить щонайменше bytes, parse_time та items.
+        """
+        pass
+
+    def volume_text(self, volume_id):
+        """
+        Повертає категорії та опис книги для пошуку схожих.
+
+        За замовчуванням None: джерело або вже віддає їх у search(), або не має.
+
+        Args:
+            volume_id (str): Ідентифікатор тому.
+
+        Returns:
+            tuple | None: (categories, description) або None.
+        """
+        return None
+
+
+class GoogleBooksBackend(SearchBackend):
+    """
+    Пошук через Google Books API (потокове завантаження з gzip).
+
+    Args:
+        transport (HttpTransport, optional): HTTP-транспорт. За замовчуванням спільний.
+    """
+    name = "Google Books"
+    cacheable = True
+
+    def __init__(self, transport=None):
+        self.transport = transport
+
+    def search(self, query, max_results=20, start_index=0, fields=None, cancel_event=None):
+        return fetch_volumes(query, max_results, start_index, fields=fields, cancel_event=cancel_event,
+                             transport=self.transport)
+
+    def volume_text(self, volume_id):
+        # Пошук іде з проєкцією карток, тож текст книги-зразка завантажується окремо
+        return fetch_volume_text(volume_id, transport=self.transport)
@@ -0,0 +1,221 @@
+# Кеш результатів пошуку
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_SEARCH_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".book_recommender", "search_cache.json")
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_SAVE_DELAY = 5.0  # секунд між put() і записом файлу; put() за цей час потрапляють в один запис
+
+
+def normalize_query(query):
+    """
+    Нормалізує запит: нижній регістр і одинарні пробіли між словами.
+    """
+    return " ".join(query.lower().split())
+
+
+class SearchCache:
+    """
+    Кеш відповідей Google Books API з TTL і stale-while-revalidate.
+
+    Ключ складається з нормалізованого запиту, max_results, startIndex
+    і назви проєкції полів.
+    Запис, старший за ttl, вважається застарілим: він усе одно
+    повертається одразу, а викликач оновлює його у фоні.
+
+    Args:
+        ttl (float, optional): Час свіжості запису в секундах. За замовчуванням 10 хвилин.
+        max_entries (int | None, optional): Максимальна кількість записів; None — лише ліміт байтів.
+        max_bytes (int, optional): Максимальний сумарний розмір відповідей (у JSON).
+        path (str, optional): Файл для збереження кешу між запусками. None — лише пам'ять.
+        autosave (bool, optional): Записувати файл після put(). Запис відкладається
+            на save_delay секунд, тож усі сторінки пошуку потрапляють в один запис;
+            незаписані зміни зберігаються і при виході з програми. Якщо False,
+            файл записується лише явним викликом save() (пакетні прогони).
+        save_delay (float, optional): Затримка відкладеного запису в секундах.
+
+    Attributes:
+        hits (int): Свіжі влучання.
+        stale_hits (int): Влучання в застарілі записи.
+        misses (int): Промахи.
+        evictions (int): Витіснення через ліміти.
+    """
+    def __init__(self, ttl=600, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, path=None, autosave=True,
+                 save_delay=DEFAULT_SAVE_DELAY):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.autosave = autosave
+        self.save_delay = save_delay
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (stored_at, data, size)
+        self._size = 0
+        self._refreshing = set()
+        self._dirty = False  # є зміни, ще не записані у файл
+        self._save_timer = None
+        self._atexit_registered = False
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    @staticmethod
+    def make_key(query, max_results, start_index=0, projection="full"):
+        """
+        Формує ключ кешу для запиту.
+
+        Args:
+            query (str): Текст запиту.
+            max_results (int): Розмір сторінки.
+            start_index (int, optional): Зсув сторінки.
+            projection (str, optional): Назва проєкції полів з FIELD_PROJECTIONS.
+
+        Returns:
+            str: Ключ кешу.
+        """
+        return f"{normalize_query(query)}|{max_results}|{start_index}|{projection}"
+
+    def get(self, key):
+        """
+        Повертає закешовану відповідь.
+
+        Returns:
+            tuple | None: (data, is_stale) або None, якщо запису немає.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            stored_at, data, _ = entry
+            is_stale = time.time() - stored_at > self.ttl
+            if is_stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return data, is_stale
+
+    def put(self, key, data):
+        """
+        Зберігає відповідь і, якщо задано path і autosave, планує запис кешу на диск.
+
+        Args:
+            key (str): Ключ кешу.
+            data (dict): JSON-відповідь API.
+        """
+        self._insert(key, time.time(), data)
+        if self.path and self.autosave:
+            self._schedule_save()
+
+    def begin_refresh(self, key):
+        """
+        Позначає, що застарілий запис оновлюється.
+
+        Returns:
+            bool: False, якщо оновлення цього ключа вже виконується іншим потоком.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key):
+        """
+        Знімає позначку оновлення з ключа.
+        """
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def stats(self):
+        """
+        Повертає лічильники кешу.
+
+        Returns:
+            dict: hits, stale_hits, misses, evictions, entries, bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def flush(self):
+        """
+        Записує кеш у файл, якщо після останнього запису були зміни.
+        """
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            dirty = self._dirty
+        if dirty:
+            self.save()
+
+    def save(self):
+        """
+        Атомарно записує кеш у файл path.
+        """
+        with self._lock:
+            self._dirty = False
+            payload = {key: [stored_at, data] for key, (stored_at, data, _) in self._entries.items()}
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _schedule_save(self):
+        # Один таймер на всі put() за save_delay; файл до 16 МБ переписується не на кожну сторінку
+        with self._lock:
+            self._dirty = True
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+            if not self._atexit_registered:
+                self._atexit_registered = True
+                atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, (stored_at, data) in payload.items():
+            self._insert(key, stored_at, data)
+
+    def _insert(self, key, stored_at, data):
+        size = len(json.dumps(data, separators=(",", ":")))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+            self._entries[key] = (stored_at, data, size)
+            self._size += size
+            while self._size > self.max_bytes or (self.max_entries is not None
+                                                  and len(self._entries) > self.max_entries):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self.evictions += 1
@@ -1,29 +1,69 @@
 # Memento
 
+import sys
+
+
+def snapshot_size(results):
+    """
+    Оцінює розмір знімка результатів у байтах.
+
+    Args:
+        results (tuple): Записи книг.
+
+    Returns:
+        int: Приблизна кількість байтів, яку займають записи і їх рядки.
+    """
+    getsizeof = sys.getsizeof
+    size = getsizeof(results)
+    for record in results:
+        size += getsizeof(record) + getsizeof(record.title) + getsizeof(record.poster) + getsizeof(record.authors)
+    return size
+
+
 class SearchMemento:
     """
     Клас для збереження стану пошуку (Memento).
 
+    Може містити знімок розібраних результатів (results), щоб Undo/Redo
+    відновлювали стан з пам'яті без повторного пошуку.
+
     .. note::
        Цей клас є частиною паттерну **Memento**, який дозволяє зберігати і відновлювати стан об'єкта.
     """
-    def __init__(self, query, group_mode, show_date, show_rating):
+    def __init__(self, query, group_mode, show_date, show_rating, results=None):
         self.query = query
         self.group_mode = group_mode
         self.show_date = show_date
         self.show_rating = show_rating
+        self.results = results  # кортеж записів книг або None, якщо знімка ще немає
 
 class SearchHistory:
     """
     Менеджер історії станів пошуку для реалізації Undo/Redo.
 
+    Історія обмежена кількістю станів, а знімки результатів — бюджетом
+    байтів. Понад бюджет спершу відкидаються знімки станів, найдальших від
+    поточного; самі стани лишаються і за потреби шукаються заново.
+
+    Args:
+        max_entries (int, optional): Максимальна кількість станів у history і future разом.
+        max_snapshot_bytes (int, optional): Бюджет пам'яті для знімків результатів.
+
+    Attributes:
+        evicted_entries (int): Кількість витіснених найстаріших станів.
+        evicted_snapshots (int): Кількість відкинутих знімків.
+
     .. note::
        Цей клас реалізує логіку збереження, відновлення та переміщення між станами,
        що є ключовою частиною паттерну **Memento**.
     """
-    def __init__(self):
+    def __init__(self, max_entries=100, max_snapshot_bytes=8 * 1024 * 1024):
         self.history = []
         self.future = []
+        self.max_entries = max_entries
+        self.max_snapshot_bytes = max_snapshot_bytes
+        self.evicted_entries = 0
+        self.evicted_snapshots = 0
 
     def save(self, memento):
         """
@@ -31,9 +71,14 @@ class SearchHistory:
 
         .. note::
            При збереженні нового стану скидається "майбутнє" (redo) історії.
+           Якщо для цього запиту вже є знімок результатів, новий стан його перевикористовує.
         """
+        if memento.results is None:
+            memento.results = next((m.results for m in reversed(self.history)
+                                    if m.query == memento.query and m.results is not None), None)
         self.history.append(memento)
         self.future.clear()  # після нового пошуку "вперед" недоступний
+        self._enforce_limits()
 
     def undo(self):
         """
@@ -58,4 +103,95 @@ class SearchHistory:
             memento = self.future.pop()
             self.history.append(memento)
             return memento
-        return None
\ No newline at end of file
+        return None
+
+    def neighbors(self):
+        """
+        Повертає стани, до яких приведуть наступні Undo і Redo.
+
+        Returns:
+            list[SearchMemento]: Від нуля до двох сусідніх станів.
+        """
+        neighbors = []
+        if len(self.history) >= 2:
+            neighbors.append(self.history[-2])
+        if self.future:
+            neighbors.append(self.future[-1])
+        return neighbors
+
+    def attach_results(self, query, results, replace=False):
+        """
+        Прикріплює знімок результатів до всіх станів з цим запитом.
+
+        Args:
+            query (str): Запит, якому належать результати.
+            results (tuple): Розібрані записи книг.
+            replace (bool, optional): Замінювати вже наявні знімки.
+        """
+        for memento in self.history + self.future:
+            if memento.query == query and (replace or memento.results is None):
+                memento.results = results
+        self._enforce_limits()
+
+    def snapshot_bytes(self):
+        """
+        Повертає сумарний розмір знімків (спільний знімок рахується один раз).
+        """
+        seen = set()
+        total = 0
+        for memento in self.history + self.future:
+            if memento.results is not None and id(memento.results) not in seen:
+                seen.add(id(memento.results))
+                total += snapshot_size(memento.results)
+        return total
+
+    def stats(self):
+        """
+        Повертає розмір історії та лічильники витіснення.
+
+        Returns:
+            dict: entries, snapshots, snapshot_bytes, evicted_entries, evicted_snapshots.
+        """
+        return {
+            "entries": len(self.history) + len(self.future),
+            "snapshots": sum(m.results is not None for m in self.history + self.future),
+            "snapshot_bytes": self.snapshot_bytes(),
+            "evicted_entries": self.evicted_entries,
+            "evicted_snapshots": self.evicted_snapshots,
+        }
+
+    def _by_distance(self):
+        # Стани від поточного до найдальшого: undo і redo по черзі
+        past = self.history[::-1]
+        future = self.future[::-1]
+        ordered = []
+        for i in range(max(len(past), len(future))):
+            if i < len(past):
+                ordered.append(past[i])
+            if i < len(future):
+                ordered.append(future[i])
+        return ordered
+
+    def _enforce_limits(self):
+        while len(self.history) + len(self.future) > self.max_entries and len(self.history) > 1:
+            self.history.pop(0)
+            self.evicted_entries += 1
+        while len(self.history) + len(self.future) > self.max_entries and self.future:
+            self.future.pop(0)
+            self.evicted_entries += 1
+
+        sizes = {}
+        total = 0
+        for memento in self._by_distance():
+            results = memento.results
+            if results is None:
+                continue
+            if id(results) not in sizes:
+                sizes[id(results)] = snapshot_size(results)
+                total += sizes[id(results)]
+                if total > self.max_snapshot_bytes:
+                    total -= sizes[id(results)]
+                    sizes[id(results)] = None
+            if sizes[id(results)] is None:
+                memento.results = None
+                self.evicted_snapshots += 1
\ No newline at end of file
@@ -0,0 +1,215 @@
+# Збереження сесії між запусками
+
+import json
+import os
+import sqlite3
+import zlib
+
+from book_records import BookRecord
+from search_cache import normalize_query
+from search_memento import SearchMemento
+
+DEFAULT_SESSION_PATH = os.path.join(os.path.expanduser("~"), ".book_recommender", "session.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mementos (
+    stack TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    query TEXT NOT NULL,
+    group_mode TEXT NOT NULL,
+    show_date INTEGER NOT NULL,
+    show_rating INTEGER NOT NULL,
+    PRIMARY KEY (stack, position)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    query TEXT PRIMARY KEY,
+    fingerprint INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    keyword TEXT PRIMARY KEY
+);
+"""
+
+
+def _snapshot_json(results):
+    rows = [[r.title, r.poster, r.date, r.rating, list(r.authors), r.volume_id] for r in results]
+    return json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def snapshot_fingerprint(results):
+    """
+    Повертає відбиток знімка, щоб не перезаписувати незмінені результати.
+
+    CRC32 від усіх полів записів однаковий у різних процесах (на відміну
+    від hash()), тож відбитки з бази лишаються дійсними після перезапуску.
+    """
+    return zlib.crc32(_snapshot_json(results))
+
+
+def encode_snapshot(results):
+    """
+    Стискає записи книг у компактний blob (zlib-стиснений JSON).
+
+    Args:
+        results (tuple): Записи, сумісні з BookRecord.
+
+    Returns:
+        bytes: Стиснені дані.
+    """
+    return zlib.compress(_snapshot_json(results))
+
+
+def decode_snapshot(blob, record_type=BookRecord):
+    """
+    Відновлює записи книг з blob, створеного encode_snapshot.
+
+    Args:
+        blob (bytes): Стиснені дані.
+        record_type (type, optional): Клас запису (наприклад, BookLeaf).
+
+    Returns:
+        tuple: Записи у збереженому порядку.
+    """
+    rows = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return tuple(record_type(*row) for row in rows)
+
+
+class SessionStore:
+    """
+    Знімок сесії на диску: історія пошуку, ключові слова і результати.
+
+    Зберігається в SQLite і оновлюється по частинах: таблиця станів історії
+    переписується лише коли вона змінилась, знімок результатів — лише коли
+    змінився його вміст, ключові слова додаються по одному. При запуску
+    завантажуються тільки стани і ключові слова; результати читаються
+    ліниво, коли стан відображається.
+
+    Відповіді API та обкладинки між запусками зберігають SearchCache
+    і ThumbnailCache, тому тут вони не дублюються.
+
+    Args:
+        path (str): Файл бази даних (":memory:" для тестів).
+
+    Attributes:
+        writes (int): Кількість транзакцій запису.
+    """
+    def __init__(self, path=DEFAULT_SESSION_PATH):
+        self.path = path
+        self.writes = 0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._saved_rows = None
+        self._fingerprints = dict(self._conn.execute("SELECT query, fingerprint FROM snapshots"))
+        # Знімок, відбиток якого вже обчислено, для кожного запиту (знімки — незмінні кортежі)
+        self._checked = {}
+
+    def save_history(self, history):
+        """
+        Записує зміни історії та нові знімки результатів.
+
+        Відбиток обчислюється лише для знімків, яких ще не було при
+        попередньому збереженні; спільний для кількох станів знімок
+        перевіряється один раз.
+
+        Args:
+            history (SearchHistory): Поточна історія.
+        """
+        rows = [("history", i, m.query, m.group_mode, int(m.show_date), int(m.show_rating))
+                for i, m in enumerate(history.history)]
+        rows += [("future", i, m.query, m.group_mode, int(m.show_date), int(m.show_rating))
+                 for i, m in enumerate(history.future)]
+
+        results_by_key = {}
+        for memento in history.history + history.future:
+            if memento.results is not None:
+                results_by_key[normalize_query(memento.query)] = memento.results
+
+        snapshots = []
+        for key, results in results_by_key.items():
+            if self._checked.get(key) is results:
+                continue
+            self._checked[key] = results
+            fingerprint = snapshot_fingerprint(results)
+            if self._fingerprints.get(key) != fingerprint:
+                self._fingerprints[key] = fingerprint
+                snapshots.append((key, fingerprint, encode_snapshot(results)))
+
+        if rows == self._saved_rows and not snapshots:
+            return
+
+        with self._conn:
+            if rows != self._saved_rows:
+                self._conn.execute("DELETE FROM mementos")
+                self._conn.executemany("INSERT INTO mementos VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._saved_rows = rows
+            self._conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", snapshots)
+            # Знімки запитів, яких уже немає в історії, більше не потрібні
+            live = {normalize_query(row[2]) for row in rows}
+            for key in [key for key in self._fingerprints if key not in live]:
+                del self._fingerprints[key]
+                self._checked.pop(key, None)
+                self._conn.execute("DELETE FROM snapshots WHERE query = ?", (key,))
+        self.writes += 1
+
+    def load_history(self, history):
+        """
+        Заповнює історію збереженими станами (без результатів).
+
+        Args:
+            history (SearchHistory): Порожня історія.
+
+        Returns:
+            SearchHistory: Та сама історія.
+        """
+        rows = self._conn.execute(
+            "SELECT stack, position, query, group_mode, show_date, show_rating "
+            "FROM mementos ORDER BY stack, position").fetchall()
+        for stack, _, query, group_mode, show_date, show_rating in rows:
+            memento = SearchMemento(query, group_mode, bool(show_date), bool(show_rating))
+            (history.history if stack == "history" else history.future).append(memento)
+        self._saved_rows = ([row for row in rows if row[0] == "history"]
+                            + [row for row in rows if row[0] == "future"])
+        return history
+
+    def load_results(self, query, record_type=BookRecord):
+        """
+        Читає збережений знімок результатів для запиту.
+
+        Args:
+            query (str): Запит.
+            record_type (type, optional): Клас запису.
+
+        Returns:
+            tuple | None: Записи або None, якщо знімка немає.
+        """
+        row = self._conn.execute("SELECT data FROM snapshots WHERE query = ?",
+                                 (normalize_query(query),)).fetchone()
+        if row is None:
+            return None
+        return decode_snapshot(row[0], record_type)
+
+    def add_keyword(self, keyword):
+        """
+        Зберігає ключове слово підписки.
+        """
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO keywords VALUES (?)", (keyword,))
+        self.writes += 1
+
+    def load_keywords(self):
+        """
+        Повертає збережені ключові слова.
+
+        Returns:
+            list[str]: Ключові слова в алфавітному порядку.
+        """
+        return [row[0] for row in self._conn.execute("SELECT keyword FROM keywords ORDER BY keyword")]
+
+    def close(self):
+        """
+        Закриває з'єднання з базою даних.
+        """
+        self._conn.close()
@@ -0,0 +1,128 @@
+# Одне завантаження на кілька однакових запитів, що виконуються одночасно
+
+import threading
+import time
+
+
+class FlightCancelled(Exception):
+    """
+    Учасник перестав чекати на спільний результат, бо його власний запит скасовано.
+    """
+
+
+class SharedCancel:
+    """
+    Подія скасування спільного завантаження.
+
+    Встановлена, лише коли скасовано всіх учасників: поки хоч один чекає
+    на результат, завантаження не переривається, навіть якщо запит, що
+    його почав, уже не потрібен. Має is_set() і wait(), тож передається
+    туди, де очікується threading.Event.
+    """
+    def __init__(self):
+        self.events = []  # cancel_event кожного учасника; None — учасник без скасування
+        self.fired = False  # завантаження бачило скасування
+
+    def is_set(self):
+        if all(event is not None and event.is_set() for event in self.events):
+            self.fired = True
+        return self.fired
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.is_set():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            pending = next((event for event in self.events if event is None or not event.is_set()), False)
+            if pending is None:
+                # Учасник без скасування ніколи не скасується: лишається лише тайм-аут
+                time.sleep(remaining if remaining is not None else 0.05)
+            elif pending is not False:
+                pending.wait(remaining)
+        return True
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.cancel = SharedCancel()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Спільне виконання однакових запитів, що йдуть одночасно.
+
+    Перший виклик do() з ключем виконує function у своєму потоці; виклики
+    з тим самим ключем, що прийшли до її завершення, чекають і отримують
+    той самий результат (або той самий виняток). Після завершення ключ
+    звільняється: результат тут не кешується.
+
+    Attributes:
+        executed (int): Скільки разів function справді виконано.
+        shared (int): Скільки викликів отримали чужий результат (придушені дублікати).
+    """
+    def __init__(self):
+        self.executed = 0
+        self.shared = 0
+        self._calls = {}  # ключ -> _Call, що виконується
+        self._lock = threading.Lock()
+
+    def do(self, key, function, cancel_event=None):
+        """
+        Виконує function або приєднується до того самого запиту, що вже виконується.
+
+        Args:
+            key: Ключ запиту (нормалізований запит, URL тощо).
+            function (callable): Приймає SharedCancel і повертає результат.
+            cancel_event (threading.Event, optional): Скасування цього учасника.
+
+        Returns:
+            tuple: (result, shared), де shared означає, що результат отримано від іншого виклику.
+
+        Raises:
+            FlightCancelled: Якщо cancel_event встановлено, поки учасник чекав на чужий результат.
+            Exception: Виняток, з яким завершилася function.
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                # До завантаження, яке вже перериває скасування, не приєднуємося
+                leader = call is None or call.cancel.is_set()
+                if leader:
+                    call = self._calls[key] = _Call()
+                    self.executed += 1
+                else:
+                    self.shared += 1
+                call.cancel.events.append(cancel_event)
+
+            if leader:
+                try:
+                    call.result = function(call.cancel)
+                except BaseException as e:
+                    call.error = e
+                finally:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+                    call.done.set()
+                if call.error is not None:
+                    raise call.error
+                return call.result, False
+
+            while not call.done.wait(0.05):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise FlightCancelled()
+            if call.error is None:
+                return call.result, True
+            # Завантаження перервали, бо інші учасники скасувались; цей — ні, тож пробує сам
+            if not call.cancel.fired or (cancel_event is not None and cancel_event.is_set()):
+                raise call.error
+            with self._lock:
+                self.shared -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared, "in_flight": len(self._calls)}
@@ -0,0 +1,162 @@
+# Кеш обкладинок
+
+import hashlib
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".book_recommender", "thumbnails")
+
+Thumbnail = namedtuple("Thumbnail", ["width", "height", "data"])
+Thumbnail.__doc__ = "Декодована обкладинка: ширина, висота і RGB888-пікселі."
+
+_HEADER = struct.Struct("<HH")
+
+
+class ThumbnailCache:
+    """
+    Дворівневий кеш обкладинок, ключем якого є URL постера.
+
+    Перший рівень — LRU у пам'яті з уже декодованими і зменшеними
+    зображеннями, обмежений за кількістю байтів. Другий рівень — каталог
+    на диску, що зберігає ті самі пікселі (стиснуті zlib) між запусками.
+
+    Args:
+        max_bytes (int, optional): Бюджет пам'яті для LRU. За замовчуванням 32 МБ.
+        cache_dir (str, optional): Каталог дискового кешу. None вимикає диск.
+
+    Attributes:
+        hits (int): Влучання в пам'ять.
+        disk_hits (int): Влучання на диск (після промаху в пам'яті).
+        misses (int): Повні промахи.
+        evictions (int): Витіснення з LRU.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get_memory(self, url):
+        """
+        Шукає обкладинку лише в пам'яті (без дискових операцій).
+
+        Безпечно викликати з GUI-потоку. Промах тут не рахується, бо
+        пошук зазвичай продовжується методом get() у фоновому потоці.
+
+        Returns:
+            Thumbnail | None: Знайдене зображення або None.
+        """
+        with self._lock:
+            thumb = self._entries.get(url)
+            if thumb is not None:
+                self._entries.move_to_end(url)
+                self.hits += 1
+            return thumb
+
+    def get(self, url):
+        """
+        Шукає обкладинку в пам'яті, а потім на диску.
+
+        Знайдене на диску зображення піднімається в LRU.
+
+        Returns:
+            Thumbnail | None: Знайдене зображення або None.
+        """
+        thumb = self.get_memory(url)
+        if thumb is not None:
+            return thumb
+
+        thumb = self._read_disk(url)
+        with self._lock:
+            if thumb is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._store(url, thumb)
+        return thumb
+
+    def put(self, url, thumb):
+        """
+        Додає обкладинку в обидва рівні кешу.
+
+        Args:
+            url (str): URL постера.
+            thumb (Thumbnail): Декодоване зображення.
+        """
+        self._store(url, thumb)
+        self._write_disk(url, thumb)
+
+    def stats(self):
+        """
+        Повертає лічильники кешу.
+
+        Returns:
+            dict: hits, disk_hits, misses, evictions, entries, bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._size,
+            }
+
+    def _store(self, url, thumb):
+        size = len(thumb.data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(url, None)
+            if old is not None:
+                self._size -= len(old.data)
+            self._entries[url] = thumb
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.data)
+                self.evictions += 1
+
+    def _path(self, url):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name[:2], name + ".rgbz")
+
+    def _read_disk(self, url):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(url), "rb") as f:
+                blob = f.read()
+            width, height = _HEADER.unpack_from(blob)
+            data = zlib.decompress(blob[_HEADER.size:])
+        except (OSError, struct.error, zlib.error):
+            return None
+        if len(data) != width * height * 3:
+            return None
+        return Thumbnail(width, height, data)
+
+    def _write_disk(self, url, thumb):
+        if not self.cache_dir:
+            return
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_HEADER.pack(thumb.width, thumb.height))
+                f.write(zlib.compress(thumb.data, 1))
+            # атомарна заміна: інший потік ніколи не прочитає напівзаписаний файл
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
@@ -1,14 +1,30 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget
+from PyQt5.QtWidgets import QApplication, QVBoxLayout, QWidget, QLabel
 import sys
 
-from main import BookRecommender 
+from main import BookRecommender, SearchWorker
 
 app = QApplication(sys.argv)  # QApplication має бути 1 раз на сесію
 
 from observer import BookNotifier, UserKeywordSubscriber
 from book_components import BookComposite, BookLeaf  
+from cover_loader import CoverLoader
+from cover_decoder import COVER_STRIDE, CoverDecoder
+from thumbnail_cache import Thumbnail, ThumbnailCache
+from search_cache import SearchCache
+from results_view import BookListModel, IsHeaderRole
+from book_records import BookRecord, merge_record_pages, parse_volumes
+from search_memento import SearchHistory, SearchMemento, snapshot_size
+from session_store import SessionStore, snapshot_fingerprint
+from local_catalog import LocalCatalogBackend, iter_volumes, to_fts_query
+from recommendations import SimilarBooksIndex
+from metrics import Histogram, MetricsRegistry
+from batch_search import read_queries, run_batch
+from search_backends import GoogleBooksBackend
+from widget_pool import WidgetPool
+from http_transport import HttpTransport, TokenBucket, parse_retry_after
+from single_flight import FlightCancelled, SharedCancel, SingleFlight
 
 
 #--------------------------------------------------------------------
@@ -17,16 +33,104 @@ from book_components import BookComposite, BookLeaf
 #    - додавання книжок у композит;
 #    - правильне відображення книжок і заголовка в layout після виклику display().
 #
+# 1f. BookRecord:
+#    - розбір відповіді API у записи зі слотами (без __dict__);
+#    - об'єднання сторінок без дублікатів за volume_id.
+#
+# 1a. CoverLoader:
+#    - display() одразу показує заглушку замість обкладинки;
+#    - обкладинка завантажується у фоні і встановлюється в мітку через сигнал;
+#    - мітка, прив'язана до іншої обкладинки, не отримує попередню;
+#    - CoverDecoder декодує в пулі процесів у слот спільної пам'яті, QImage будується над слотом;
+#    - слот звільняється, навіть якщо CoverLoader видалено до обробки сигналу, а без вільного слота
+#      обкладинка декодується в потоці завантаження.
+#
+# 1b. ThumbnailCache:
+#    - витіснення найдавніших обкладинок при перевищенні бюджету пам'яті;
+#    - збереження обкладинок на диску між екземплярами кешу;
+#    - повторне відображення тієї ж обкладинки не виконує мережевого запиту.
+#
+# 1c. SearchCache / SearchWorker:
+#    - однакові (після нормалізації) запити потрапляють в один запис кешу;
+#    - застарілий запис повертається одразу і оновлюється у фоні;
+#    - збереження кешу на диск між запусками.
+#
+# 1h. SearchHistory / SessionStore:
+#    - історія обмежена кількістю станів, знімки результатів — бюджетом байтів (найдальші відкидаються першими);
+#    - сесія зберігається в SQLite по частинах і знімки результатів читаються ліниво;
+#    - відбиток знімка однаковий у різних процесах, тож незмінений знімок після перезапуску не переписується.
+#
+# 1d. Багатосторінковий SearchWorker:
+#    - сторінки завантажуються паралельно через startIndex;
+#    - кожна сторінка надсилається сигналом page_ready, дублікати між сторінками відкидаються.
+#
+# 1g. Потоковий розбір відповіді:
+#    - книги з items повертаються по мірі надходження байтів, навіть з розрізаними UTF-8 символами;
+#    - запит містить проєкцію полів і дозвіл на gzip.
+#
+# 1i. LocalCatalogBackend:
+#    - імпорт томів з дампів JSON lines і файлу кешу пошуку;
+#    - ранжування bm25 з вагою назви, оператори intitle:/inauthor:, екранування спецсимволів FTS5;
+#    - SearchWorker шукає в локальному каталозі без мережі й кешу.
+#
+# 1j. SimilarBooksIndex:
+#    - найсхожіші книги — зі спільними автором, категорією і словами назви;
+#    - нові книги доступні одразу (дельта), злиття перераховує IDF, книга поза індексом шукається за назвою;
+#    - наближений пошук (обрізаний інвертований індекс) збігається з точним, індекс на диску відкривається через memmap.
+#
+# 1k. MetricsRegistry:
+#    - гістограма рахує кошики і оцінює квантилі; експорт у JSON і текстовий формат Prometheus;
+#    - CoverLoader записує час завантаження і декодування обкладинок.
+#
+# 1l. Пакетний пошук (batch_search):
+#    - запити виконуються паралельно, результати групуються і виводяться рядками JSON;
+#    - повторний прогін бере сторінки з кешу, помилка одного запиту не зупиняє решту.
+#
+# 1m. Швидкий запуск:
+#    - розбір, групування, історія і спостерігач імпортуються без PyQt5, PIL, requests і numpy;
+#    - main не імпортує numpy, scipy, PIL і requests до першого використання.
+#
+# 1n. HttpTransport:
+#    - 5xx і 429 повторюються, Retry-After зупиняє обмежувач частоти для всіх потоків;
+#    - помилка з'єднання повторюється і після останньої спроби передається далі;
+#    - обмежувач частоти (token bucket) і розбір Retry-After;
+#    - запити до одного хоста йдуть одним keep-alive з'єднанням.
+#
+# 1o. SingleFlight:
+#    - одночасні однакові виклики виконують функцію один раз і отримують той самий результат або виняток;
+#    - спільне завантаження переривається лише коли скасовано всіх учасників;
+#    - скасований попередній пошук не зупиняє завантаження для нового з тим самим запитом;
+#    - обкладинка, що вже завантажується, після cancel_pending() не запитується вдруге.
+#
+# 1e. BookListModel:
+#    - заголовки груп і книжки як рядки моделі;
+#    - обкладинка запитується лише для рядків, які показує view;
+#    - нова сторінка вставляє лише свої рядки, а якщо показаний рядок зник — відображення перебудовується.
+#
 # 2. Observer Pattern:
 #    - оповіщення спостерігача, якщо в назві книги є додане ключове слово;
-#    - відсутність оповіщення, якщо ключове слово не знайдено.
+#    - відсутність оповіщення, якщо ключове слово не знайдено;
+#    - автомат Ахо-Корасік знаходить перекриті слова і оновлюється після add();
+#    - пакетне сповіщення про сторінку результатів;
+#    - асинхронна доставка пачками, придушення дублікатів за volume id, витіснення найстаріших при переповненні.
 #
 # 3. BookRecommender:
 #    - додавання ключових слів до підписки (з переведенням у нижній регістр);
 #    - ігнорування дубльованих ключових слів;
-#    - обробка пошуку з моканим API-відповіддю (requests.get);
+#    - обробка пошуку з моканим API-відповіддю (requests.Session.get);
 #    - збереження, відновлення та перевірка станів (Memento: undo/redo);
-#    - правильне відновлення стану інтерфейсу з memento-об'єкта.
+#    - правильне відновлення стану інтерфейсу з memento-об'єкта;
+#    - перегрупування і перемикання прапорців без мережевих запитів;
+#    - новіший пошук скасовує попередній, а його пізні результати ігноруються;
+#    - живий пошук з debounce запускає один запит після паузи в наборі.
+#    - undo/redo відображає знімок результатів з memento без запиту, сусідні стани завантажуються у фоні;
+#    - повторний запуск відкриває останній стан і ключові слова зі сховища сесії без мережі;
+#    - "Similar" показує схожі книги з уже отриманих результатів; з мережі — лише опис книги-зразка;
+#    - індекс схожих книг оновлюється і опитується у фоновому потоці індексу, а не в GUI-потоці;
+#    - етапи пошуку (завантаження, розбір, групування, віджети) потрапляють у метрики і панель;
+#    - картки додаються поступово: перший екран одразу, решта між тиками циклу подій;
+#    - нова сторінка вставляє лише свої картки, а наступна за останньою сторінка завантажується в кеш у фоні;
+#    - картки і заголовки попереднього пошуку прив'язуються до нових книг з пулу, пул обмежений.
 #--------------------------------------------------------------------
 
 
@@ -62,6 +166,1016 @@ class TestBookComposite(unittest.TestCase):
         self.assertTrue(self.layout.count() >= 3)
 
 
+class TestBookRecords(unittest.TestCase):
+    def test_parse_volumes_into_slotted_records(self):
+        data = {"items": [{"id": "v1", "volumeInfo": {"title": "T", "authors": ["A"], "description": "long"}}]}
+        records = parse_volumes(data, BookLeaf)
+
+        self.assertFalse(hasattr(records[0], "__dict__"))
+        self.assertEqual((records[0].title, records[0].authors, records[0].volume_id), ("T", ("A",), "v1"))
+        self.assertEqual((records[0].date, records[0].rating, records[0].poster), ("N/A", "N/A", ""))
+
+    def test_merge_pages_skips_duplicates(self):
+        pages = {
+            1: [BookRecord("B", "", "N/A", "N/A", volume_id="b"), BookRecord("A", "", "N/A", "N/A", volume_id="a")],
+            0: [BookRecord("A", "", "N/A", "N/A", volume_id="a")],
+        }
+        self.assertEqual([r.title for r in merge_record_pages(pages)], ["A", "B"])
+
+
+def make_image_bytes(size=(40, 60), color=(200, 30, 30)):
+    from io import BytesIO
+    from PIL import Image
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestCoverLoader(unittest.TestCase):
+    def wait_for(self, loader):
+        loader.threadpool.waitForDone()
+        app.processEvents()
+
+    @patch("requests.Session.get")
+    def test_display_shows_placeholder_before_download(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        loader = CoverLoader()
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+
+        BookLeaf("Book", "http://image.url/1", "2020", 4.0).display(layout, cover_loader=loader)
+
+        frame = layout.itemAt(0).widget()
+        labels = [frame.layout().itemAt(i).widget() for i in range(frame.layout().count())]
+        self.assertIn("Loading cover...", [label.text() for label in labels])
+        self.wait_for(loader)
+
+    @patch("requests.Session.get")
+    def test_cover_delivered_to_label(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        loader = CoverLoader()
+        label_a, label_b = QLabel(), QLabel()
+
+        # однаковий URL завантажується лише один раз
+        loader.load("http://image.url/2", label_a)
+        loader.load("http://image.url/2", label_b)
+        self.wait_for(loader)
+
+        self.assertEqual(mock_get.call_count, 1)
+        for label in (label_a, label_b):
+            self.assertEqual((label.pixmap().width(), label.pixmap().height()), (140, 200))
+
+    def test_rebound_label_ignores_previous_cover(self):
+        from PyQt5.QtGui import QImage
+        loader = CoverLoader()
+        label = QLabel()
+        with patch.object(loader.threadpool, "start"):
+            loader.load("http://image.url/old", label)
+            # мітку картки з пулу прив'язали до іншої книги до приходу старої обкладинки
+            loader.load("http://image.url/new", label)
+        image = QImage(140, 200, QImage.Format_RGB888)
+
+        loader._on_loaded("http://image.url/old", image)
+        self.assertIsNone(label.pixmap())
+        loader._on_loaded("http://image.url/new", image)
+        self.assertEqual(label.pixmap().width(), 140)
+
+
+class TestCoverDecoder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.decoder = CoverDecoder(processes=1, slots=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.decoder.close()
+
+    def test_pixels_written_to_shared_slot(self):
+        slot, width, height, stride = self.decoder.decode(make_image_bytes(color=(10, 120, 250)))
+        self.assertEqual((width, height, stride), (140, 200, COVER_STRIDE))
+        view = self.decoder.view(slot, height, stride)
+        self.assertEqual(bytes(view[:3]), bytes([10, 120, 250]))
+        view.release()
+        self.decoder.release(slot)
+
+        with self.assertRaises(Exception):
+            self.decoder.decode(b"not an image")
+        self.assertEqual(self.decoder.free_slots(), 2)
+
+    @patch("requests.Session.get")
+    def test_loader_builds_pixmap_from_slot(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes(color=(10, 120, 250)))
+        cache = ThumbnailCache()
+        loader = CoverLoader(cache=cache, decoder=self.decoder)
+        label = QLabel()
+        loader.load("http://image.url/shared", label)
+        loader.threadpool.waitForDone()
+        app.processEvents()
+
+        color = label.pixmap().toImage().pixelColor(70, 100)
+        self.assertEqual((color.red(), color.green(), color.blue()), (10, 120, 250))
+        self.assertEqual(self.decoder.free_slots(), 2)
+        self.assertEqual(cache.get("http://image.url/shared").data[:3], bytes([10, 120, 250]))
+
+
+    def test_decode_times_out_without_free_slot(self):
+        taken = [self.decoder.decode(make_image_bytes())[0] for _ in range(2)]
+        with self.assertRaises(TimeoutError):
+            self.decoder.decode(make_image_bytes(), timeout=0.05)
+        for slot in taken:
+            self.decoder.release(slot)
+
+    @patch("requests.Session.get")
+    def test_worker_decodes_in_thread_when_slots_busy(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        decoder = MagicMock()
+        decoder.decode.side_effect = TimeoutError
+        loader = CoverLoader(decoder=decoder)
+        label = QLabel()
+        loader.load("http://image.url/busy", label)
+        loader.threadpool.waitForDone()
+        app.processEvents()
+        self.assertEqual(label.pixmap().width(), 140)
+
+    @patch("requests.Session.get")
+    def test_slot_released_when_loader_deleted(self, mock_get):
+        import gc
+        from PyQt5 import sip
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        loader = CoverLoader(decoder=self.decoder)
+        loader.load("http://image.url/orphan", QLabel())
+        loader.threadpool.waitForDone()
+        # Сигнал decoded ще в черзі GUI-потоку, коли loader видаляють
+        sip.delete(loader)
+        app.processEvents()
+        gc.collect()
+        self.assertEqual(self.decoder.free_slots(), 2)
+
+
+class TestThumbnailCache(unittest.TestCase):
+    def make_thumb(self, value):
+        return Thumbnail(2, 2, bytes([value]) * 12)
+
+    def test_lru_evicts_oldest_over_budget(self):
+        cache = ThumbnailCache(max_bytes=24)
+        cache.put("a", self.make_thumb(1))
+        cache.put("b", self.make_thumb(2))
+        cache.get("a")                      # "a" стає найсвіжішим
+        cache.put("c", self.make_thumb(3))  # витісняє "b"
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["bytes"], 24)
+
+    def test_disk_tier_survives_restart(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ThumbnailCache(cache_dir=cache_dir).put("http://image.url/x", self.make_thumb(7))
+
+            cache = ThumbnailCache(cache_dir=cache_dir)
+            self.assertEqual(cache.get("http://image.url/x"), self.make_thumb(7))
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+    @patch("requests.Session.get")
+    def test_loader_uses_cache_on_repeat(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        loader = CoverLoader(cache=ThumbnailCache())
+        loader.load("http://image.url/3", QLabel())
+        loader.threadpool.waitForDone()
+        app.processEvents()
+
+        label = QLabel()
+        loader.load("http://image.url/3", label)
+
+        # друге відображення бере обкладинку з пам'яті синхронно
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(label.pixmap().width(), 140)
+
+
+def make_api_response(payload, chunk_size=7):
+    # Відповідь, що віддає тіло невеликими шматками, як requests із stream=True
+    import json
+    body = json.dumps(payload).encode("utf-8")
+    response = MagicMock(status_code=200)
+    response.iter_content.return_value = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    return response
+
+
+def run_worker(worker):
+    results = []
+    worker.signals.finished.connect(lambda data, elapsed: results.append(data))
+    worker.run()  # синхронно: сигнали доставляються напряму
+    return results
+
+
+class TestSearchCache(unittest.TestCase):
+    def make_response(self, title):
+        return make_api_response({"items": [{"volumeInfo": {"title": title}}]})
+
+    @patch("requests.Session.get")
+    def test_repeated_query_served_from_cache(self, mock_get):
+        mock_get.return_value = self.make_response("Cached")
+        cache = SearchCache()
+
+        run_worker(SearchWorker("Python  Books", cache=cache))
+        results = run_worker(SearchWorker(" python books", cache=cache))
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(results[0]["items"][0]["volumeInfo"]["title"], "Cached")
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    @patch("requests.Session.get")
+    def test_stale_entry_returned_then_refreshed(self, mock_get):
+        key = SearchCache.make_key("python", 20, projection="cards")
+        cache = SearchCache(ttl=0)
+        cache.put(key, {"items": [{"volumeInfo": {"title": "Old"}}]})
+        mock_get.return_value = self.make_response("New")
+
+        with patch("time.time", return_value=cache._entries[key][0] + 1):
+            results = run_worker(SearchWorker("python", cache=cache))
+
+        self.assertEqual(results, [{"items": [{"volumeInfo": {"title": "Old"}}]}])
+        data, _ = cache.get(key)
+        self.assertEqual(data["items"][0]["volumeInfo"]["title"], "New")
+
+    def test_persistence_and_entry_limit(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = SearchCache(max_entries=2, path=path)
+            for query in ("a", "b", "c"):
+                cache.put(SearchCache.make_key(query, 20), {"items": []})
+            cache.flush()
+
+            restored = SearchCache(path=path)
+            self.assertIsNone(restored.get(SearchCache.make_key("a", 20)))
+            self.assertIsNotNone(restored.get(SearchCache.make_key("c", 20)))
+            self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_byte_limit_only_without_max_entries(self):
+        cache = SearchCache(max_entries=None, max_bytes=300 * 12)
+        for i in range(300):
+            cache.put(SearchCache.make_key(f"q{i}", 20), {"items": []})
+        self.assertEqual(cache.stats()["entries"], 300)
+        cache.put(SearchCache.make_key("one more", 20), {"items": []})
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_autosave_batches_puts_into_one_write(self):
+        import os
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.json")
+            cache = SearchCache(path=path, save_delay=60)
+            with patch.object(cache, "save", wraps=cache.save) as save:
+                for page in range(5):
+                    cache.put(SearchCache.make_key("python", 40, page * 40), {"items": []})
+                self.assertFalse(os.path.exists(path))
+                cache.flush()
+                cache.flush()
+            self.assertEqual(save.call_count, 1)
+            self.assertEqual(SearchCache(path=path).stats()["entries"], 5)
+
+
+def make_records(prefix, count):
+    return tuple(BookRecord(f"{prefix} {i}", "", "N/A", "N/A", volume_id=f"{prefix}{i}") for i in range(count))
+
+
+class TestSearchHistory(unittest.TestCase):
+    def test_entry_limit_evicts_oldest(self):
+        history = SearchHistory(max_entries=3)
+        for query in ("a", "b", "c", "d"):
+            history.save(SearchMemento(query, "No Grouping", True, True))
+
+        self.assertEqual([m.query for m in history.history], ["b", "c", "d"])
+        self.assertEqual(history.stats()["evicted_entries"], 1)
+
+    def test_snapshot_budget_keeps_nearest(self):
+        budget = snapshot_size(make_records("x", 10)) * 2
+        history = SearchHistory(max_snapshot_bytes=budget)
+        for query in ("a", "b", "c"):
+            history.save(SearchMemento(query, "No Grouping", True, True))
+            history.attach_results(query, make_records(query, 10))
+        history.undo()
+
+        # Поточний стан "b" і найближчий сусід зберігають знімки, найдальший "a" — ні
+        self.assertIsNone(history.history[0].results)
+        self.assertIsNotNone(history.history[-1].results)
+        self.assertIsNotNone(history.future[-1].results)
+        self.assertLessEqual(history.snapshot_bytes(), budget)
+
+        # Новий стан з тим самим запитом перевикористовує знімок
+        history.save(SearchMemento("b", "Group by Year", True, True))
+        self.assertIs(history.history[-1].results, history.history[-2].results)
+
+
+class TestSessionStore(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = f"{self.tmp.name}/session.sqlite3"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_history_and_snapshots_roundtrip(self):
+        history = SearchHistory()
+        for query in ("python", "java"):
+            history.save(SearchMemento(query, "Group by Year", True, False))
+            history.attach_results(query, make_records(query, 3))
+        history.undo()
+
+        store = SessionStore(self.path)
+        store.save_history(history)
+        store.save_history(history)
+        store.add_keyword("python")
+        self.assertEqual(store.writes, 2)  # незмінена історія повторно не записується
+        store.close()
+
+        restored = SessionStore(self.path)
+        loaded = restored.load_history(SearchHistory())
+        self.assertEqual([m.query for m in loaded.history], ["python"])
+        self.assertEqual([m.query for m in loaded.future], ["java"])
+        self.assertIsNone(loaded.history[0].results)
+        self.assertFalse(loaded.history[0].show_rating)
+
+        records = restored.load_results("Python", BookLeaf)
+        self.assertIsInstance(records[0], BookLeaf)
+        self.assertEqual([r.title for r in records], ["python 0", "python 1", "python 2"])
+        self.assertEqual(restored.load_keywords(), ["python"])
+
+        # Знімки запитів, що випали з історії, видаляються
+        restored.save_history(SearchHistory())
+        self.assertIsNone(restored.load_results("java"))
+        restored.close()
+
+    def test_unchanged_snapshot_not_rewritten_after_restart(self):
+        import os
+        import subprocess
+        # hash() рядків залежить від PYTHONHASHSEED; відбиток не має
+        code = ("from session_store import snapshot_fingerprint; from book_records import BookRecord; "
+                "print(snapshot_fingerprint((BookRecord('Dune', '', '1965', 4.5, volume_id='d'),)))")
+        fingerprints = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            fingerprints.add(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                            check=True, env=env).stdout)
+        self.assertEqual(len(fingerprints), 1)
+
+        history = SearchHistory()
+        history.save(SearchMemento("python", "No Grouping", True, True))
+        history.attach_results("python", make_records("python", 3))
+        store = SessionStore(self.path)
+        store.save_history(history)
+        store.close()
+
+        reopened = SessionStore(self.path)
+        reopened.load_history(SearchHistory())
+        reopened.save_history(history)
+        self.assertEqual(reopened.writes, 0)
+
+        # Зміна лише рейтингу теж оновлює знімок
+        changed = make_records("python", 3)
+        changed[0].rating = 4.0
+        history.attach_results("python", changed, replace=True)
+        reopened.save_history(history)
+        self.assertEqual(reopened.writes, 1)
+        reopened.close()
+
+    def test_snapshot_fingerprinted_once_per_results_object(self):
+        history = SearchHistory()
+        for group_mode in ("No Grouping", "Group by Year"):
+            history.save(SearchMemento("python", group_mode, True, True))
+        history.attach_results("python", make_records("python", 3))
+        store = SessionStore(self.path)
+        with patch("session_store.snapshot_fingerprint", wraps=snapshot_fingerprint) as fingerprint:
+            store.save_history(history)
+            self.assertEqual(fingerprint.call_count, 1)  # два стани зі спільним знімком
+
+            history.undo()
+            store.save_history(history)
+            self.assertEqual(fingerprint.call_count, 1)
+
+            history.attach_results("python", make_records("python", 4), replace=True)
+            store.save_history(history)
+            self.assertEqual(fingerprint.call_count, 2)
+        self.assertEqual(store.writes, 3)
+        self.assertEqual(len(store.load_results("python")), 4)
+        store.close()
+
+
+class TestLocalCatalog(unittest.TestCase):
+    VOLUMES = [
+        {"id": "a", "volumeInfo": {"title": "Learning Python", "authors": ["Mark Lutz"],
+                                   "categories": ["Computers"], "description": "A complete guide"}},
+        {"id": "b", "volumeInfo": {"title": "Java Basics", "authors": ["Anna Python"],
+                                   "description": "Mentions python once"}},
+        {"id": "c", "volumeInfo": {"title": "Cooking", "description": "Recipes for every day"}},
+    ]
+
+    def setUp(self):
+        self.catalog = LocalCatalogBackend(":memory:")
+        self.catalog.import_volumes(self.VOLUMES)
+
+    def tearDown(self):
+        self.catalog.close()
+
+    def ids(self, query, **kwargs):
+        data, _ = self.catalog.search(query, **kwargs)
+        return [item["id"] for item in data["items"]]
+
+    def test_ranked_search_and_operators(self):
+        self.assertEqual(self.ids("python"), ["a", "b"])
+        self.assertEqual(self.ids("intitle:python"), ["a"])
+        self.assertEqual(self.ids("inauthor:python"), ["b"])
+        # Слово з назви і слово з опису: том знаходиться на другому рівні пошуку
+        self.assertEqual(self.ids("learning guide"), ["a"])
+        self.assertEqual(self.ids("python", max_results=1, start_index=1), ["b"])
+        self.assertEqual(self.ids('java" OR "cooking'), [])
+        self.assertEqual(to_fts_query('"; DROP'), '"drop"*')
+
+    def test_reimport_updates_index(self):
+        renamed = dict(self.VOLUMES[0], volumeInfo={"title": "Learning Rust"})
+        self.catalog.import_volumes([renamed])
+
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(self.ids("rust"), ["a"])
+        self.assertEqual(self.ids("intitle:learning intitle:python"), [])
+
+    def test_import_from_dumps(self):
+        import json
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            lines_path = f"{tmp}/volumes.jsonl"
+            with open(lines_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(self.VOLUMES[0]) + "\n")
+                f.write(json.dumps({"items": self.VOLUMES[1:]}) + "\n")
+            cache_path = f"{tmp}/search_cache.json"
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump({"python|20|0|cards": [0, {"items": [{"id": "d", "volumeInfo": {"title": "Fluent Python"}}]}]}, f)
+
+            self.assertEqual([v["id"] for v in iter_volumes(lines_path)], ["a", "b", "c"])
+            self.assertEqual([v["id"] for v in iter_volumes(cache_path)], ["d"])
+
+            self.catalog.import_volumes(iter_volumes(cache_path))
+        self.assertEqual(self.ids("fluent"), ["d"])
+
+    def test_worker_searches_catalog_offline(self):
+        cache = SearchCache()
+        with patch("requests.Session.get") as mock_get:
+            results = run_worker(SearchWorker("cooking", cache=cache, backend=self.catalog))
+
+        mock_get.assert_not_called()
+        self.assertEqual(results[0]["items"][0]["volumeInfo"]["title"], "Cooking")
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestSimilarBooks(unittest.TestCase):
+    VOLUMES = [
+        {"id": "a", "volumeInfo": {"title": "Learning Python", "authors": ["Mark Lutz"],
+                                   "categories": ["Computers"], "description": "Programming guide"}},
+        {"id": "b", "volumeInfo": {"title": "Programming Python", "authors": ["Mark Lutz"],
+                                   "categories": ["Computers"], "description": "Applications in Python"}},
+        {"id": "c", "volumeInfo": {"title": "Python Pocket Reference", "authors": ["Other Author"],
+                                   "description": "Quick reference"}},
+        {"id": "d", "volumeInfo": {"title": "Italian Cooking", "authors": ["Chef"],
+                                   "categories": ["Cooking"], "description": "Recipes"}},
+    ]
+
+    def make_index(self, **kwargs):
+        index = SimilarBooksIndex(n_features=1 << 16, **kwargs)
+        data = {"items": self.VOLUMES}
+        records = parse_volumes(data)
+        index.add_volumes(data, records)
+        return index, records
+
+    def test_ranks_shared_author_and_words_first(self):
+        index, records = self.make_index()
+        similar = index.similar(records[0], k=3)
+
+        self.assertEqual([record.volume_id for record, _ in similar], ["b", "c"])
+        self.assertGreater(similar[0][1], similar[1][1])
+        self.assertEqual(index.add_volumes({"items": self.VOLUMES[:1]}, records[:1]), 0)  # дублікат
+
+    def test_sample_text_enriches_card_only_index(self):
+        cards = [{"id": v["id"], "volumeInfo": {key: value for key, value in v["volumeInfo"].items()
+                                                if key in ("title", "authors")}} for v in self.VOLUMES]
+        index = SimilarBooksIndex(n_features=1 << 16)
+        records = parse_volumes({"items": cards})
+        index.add_volumes({"items": cards}, records)
+
+        # Назва "Python Pocket Reference" однаково близька до обох книг про Python; опис вирішує
+        similar = index.similar(records[2], k=2, description="Programming reference")
+        self.assertEqual(similar[0][0].volume_id, "b")
+
+    def test_incremental_add_and_merge(self):
+        index, records = self.make_index(min_delta=2, merge_fraction=0.5)
+        self.assertEqual(index.merges, 2)
+
+        new = parse_volumes({"items": [{"id": "e", "volumeInfo": {"title": "Cooking Pasta", "authors": ["Chef"]}}]})
+        index.add(new[0], ["Cooking"])
+        self.assertEqual(index.merges, 2)  # книга лежить у дельті, але вже знаходиться
+        self.assertEqual(index.similar(records[3], k=1)[0][0].volume_id, "e")
+
+        # Книга з відновленої сесії (поза індексом) шукається за назвою та авторами
+        outside = BookRecord("Pasta Cooking", "", "N/A", "N/A", ["Chef"], volume_id="z")
+        self.assertEqual([r.volume_id for r, _ in index.similar(outside, k=2)], ["e", "d"])
+
+    def test_pruned_postings_match_exact_search(self):
+        index, records = self.make_index(min_delta=1, query_terms=2, posting_limit=1, rerank=2)
+        self.assertEqual(max(index._main_indptr[1:] - index._main_indptr[:-1]), 1)  # posting_limit=1
+        exact, _ = self.make_index(min_delta=1, query_terms=None, posting_limit=None)
+        # Для "Learning Python" лишається лише найважча ознака в кожному стовпці, але top-1 той самий
+        self.assertEqual(index.similar(records[0], k=1)[0][0].volume_id,
+                         exact.similar(records[0], k=1)[0][0].volume_id)
+
+    def test_persisted_index_reopens_and_grows(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SimilarBooksIndex(f"{tmp}/similar", n_features=1 << 16, min_delta=2)
+            data = {"items": TestSimilarBooks.VOLUMES}
+            records = parse_volumes(data)
+            index.add_volumes(data, records)
+            index.close()
+
+            reopened = SimilarBooksIndex(f"{tmp}/similar", n_features=1 << 16, record_type=BookLeaf, min_delta=2)
+            self.assertEqual((len(reopened), reopened.merges), (4, 2))
+            similar = reopened.similar(records[0], k=3)
+            self.assertIsInstance(similar[0][0], BookLeaf)
+            self.assertEqual([r.volume_id for r, _ in similar], ["b", "c"])
+
+            # Нові книги дописуються у файли, відомі пропускаються
+            extra = parse_volumes({"items": [{"id": "e", "volumeInfo": {"title": "Python Cookbook"}}]})
+            self.assertTrue(reopened.add(extra[0]))
+            self.assertFalse(reopened.add(records[0]))
+            self.assertIn("e", [r.volume_id for r, _ in reopened.similar(records[2], k=3)])
+            reopened.close()
+
+            with self.assertRaises(ValueError):
+                SimilarBooksIndex(f"{tmp}/similar", n_features=1 << 10)
+
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_and_quantiles(self):
+        histogram = Histogram("latency", buckets=(0.01, 0.1, 1.0))
+        for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["buckets"], {"0.01": 1, "0.1": 3, "1.0": 4, "+Inf": 5})
+        self.assertAlmostEqual(snapshot["sum"], 5.605)
+        self.assertAlmostEqual(snapshot["p50"], 0.01 + 0.09 * 0.75)
+        self.assertEqual(snapshot["p95"], 1.0)
+
+    def test_export_json_and_prometheus(self):
+        import json
+        import tempfile
+        registry = MetricsRegistry()
+        registry.histogram("fetch_seconds", "Fetch time", buckets=(0.1,)).observe(0.05)
+        registry.counter("bytes_total", "Bytes").inc(42)
+        registry.gauge("queue_depth", lambda: 3)
+
+        text = registry.to_prometheus()
+        self.assertIn('# TYPE book_recommender_fetch_seconds histogram', text)
+        self.assertIn('book_recommender_fetch_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("book_recommender_bytes_total 42", text)
+        self.assertIn("book_recommender_queue_depth 3", text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path, prom_path = registry.export(tmp)
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f)["bytes_total"], 42)
+            with open(prom_path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), text)
+
+    @patch("requests.Session.get")
+    def test_cover_loader_records_download_and_decode(self, mock_get):
+        mock_get.return_value = MagicMock(content=make_image_bytes())
+        registry = MetricsRegistry()
+        loader = CoverLoader(metrics=registry)
+        loader.load("http://image.url/metrics")
+        loader.threadpool.waitForDone()
+        app.processEvents()
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["cover_download_seconds"]["count"], 1)
+        self.assertEqual(snapshot["cover_decode_seconds"]["count"], 1)
+        self.assertEqual(snapshot["cover_bytes_total"], len(make_image_bytes()))
+        self.assertEqual(snapshot["cover_queue_depth"], 0)
+
+
+class TestBatchSearch(unittest.TestCase):
+    @staticmethod
+    def fake_fetch(query, max_results=20, start_index=0, fields=None, cancel_event=None, transport=None):
+        if query == "broken":
+            raise RuntimeError("API request failed with status code 503")
+        items = [{"id": f"{query}-{i}",
+                  "volumeInfo": {"title": f"{query} {i}", "authors": [f"Author {i % 2}"]}}
+                 for i in range(start_index, min(start_index + max_results, 50))]
+        return {"items": items}, {"bytes": 0, "parse_time": 0.0, "items": len(items)}
+
+    def run_lines(self, queries, cache=None, **kwargs):
+        import io
+        import json
+        out = io.StringIO()
+        summary = run_batch(queries, GoogleBooksBackend(), out, cache, **kwargs)
+        lines = sorted((json.loads(line) for line in out.getvalue().splitlines()), key=lambda line: line["index"])
+        return lines, summary
+
+    def test_queries_grouped_as_json_lines(self):
+        import io
+        queries = list(read_queries(io.StringIO("dune\n\n# коментар\n  foundation \nbroken\n")))
+        self.assertEqual(queries, ["dune", "foundation", "broken"])
+
+        with patch("search_backends.fetch_volumes", side_effect=self.fake_fetch):
+            lines, summary = self.run_lines(queries, workers=3, group_mode="Group by Author", pages=2)
+
+        self.assertEqual([line["query"] for line in lines], queries)
+        self.assertEqual(lines[0]["books"], 50)  # друга сторінка неповна, третьої немає
+        self.assertEqual(lines[0]["pages_fetched"], 2)
+        self.assertEqual([group["group"] for group in lines[0]["groups"]], ["Author 0", "Author 1"])
+        self.assertEqual(lines[0]["groups"][1]["books"][0]["title"], "dune 1")
+        self.assertIn("503", lines[2]["error"])
+        self.assertEqual((summary["queries"], summary["errors"], summary["books"]), (3, 1, 100))
+        self.assertGreater(summary["queries_per_second"], 0)
+
+    def test_second_run_served_from_cache(self):
+        cache = SearchCache()
+        with patch("search_backends.fetch_volumes", side_effect=self.fake_fetch) as fetch:
+            self.run_lines(["dune", "Dune "], cache, workers=1)
+            self.assertEqual(fetch.call_count, 1)  # той самий ключ кешу після нормалізації
+            lines, _ = self.run_lines(["dune"], cache)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual((lines[0]["pages_fetched"], lines[0]["pages_cached"]), (0, 1))
+        self.assertIsNone(lines[0]["groups"][0]["group"])
+
+
+class TestHttpTransport(unittest.TestCase):
+    @staticmethod
+    def response(status, headers=None):
+        return MagicMock(status_code=status, headers=headers or {})
+
+    @patch("requests.Session.get")
+    def test_retries_status_and_honours_retry_after(self, mock_get):
+        import time
+        from http_transport import DEFAULT_TIMEOUT
+        mock_get.side_effect = [self.response(503), self.response(429, {"Retry-After": "0.05"}),
+                                self.response(200)]
+        transport = HttpTransport(backoff=0.001)
+
+        start = time.monotonic()
+        response = transport.get("http://api.local/volumes", params={"q": "dune"})
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_args[1]["timeout"], DEFAULT_TIMEOUT)
+        stats = transport.stats()
+        self.assertEqual((stats["attempts"], stats["retries"], stats["retry_after"]), (3, 2, 1))
+
+        # Після 429 з Retry-After чекають і інші запити до цього хоста
+        mock_get.side_effect = [self.response(429, {"Retry-After": "0.05"}), self.response(200)]
+        transport = HttpTransport(retries=0)
+        self.assertEqual(transport.get("http://api.local/volumes").status_code, 429)
+        mock_get.side_effect = [self.response(200)]
+        self.assertEqual(transport.bucket("api.local").acquire(), 0.0)
+
+    @patch("requests.Session.get")
+    def test_connection_error_raised_after_retries(self, mock_get):
+        import requests
+        mock_get.side_effect = requests.ConnectionError("refused")
+        transport = HttpTransport(retries=2, backoff=0.001)
+
+        with self.assertRaises(requests.ConnectionError):
+            transport.get("http://api.local/volumes")
+        stats = transport.stats()
+        self.assertEqual((stats["attempts"], stats["retries"], stats["failures"]), (3, 2, 1))
+
+    def test_token_bucket_and_retry_after_parsing(self):
+        bucket = TokenBucket(rate=50, burst=2)
+        waits = [bucket.acquire() for _ in range(3)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertGreater(waits[2], 0.0)
+
+        self.assertEqual(parse_retry_after("2"), 2.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:05 GMT",
+                                           now=1445412480.0), 5.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+
+    def test_keep_alive_connection_reused(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        transport = HttpTransport()
+        try:
+            for i in range(5):
+                self.assertEqual(transport.get(f"http://127.0.0.1:{server.server_port}/{i}").content, b"ok")
+        finally:
+            transport.close()
+            server.shutdown()
+            server.server_close()
+        stats = transport.stats()
+        self.assertEqual((stats["requests"], stats["connections_opened"], stats["connections_reused"]), (5, 1, 4))
+
+
+def wait_until(condition, timeout=5):
+    import time
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def run_in_threads(self, flights, count, function, key="dune"):
+        import threading
+        results = [None] * count
+
+        def call(i):
+            try:
+                results[i] = flights.do(key, function)
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_calls_share_one_execution(self):
+        import threading
+        release = threading.Event()
+        calls = []
+
+        def fetch(cancel_event):
+            calls.append(1)
+            release.wait(5)
+            return {"items": ["book"]}
+
+        flights = SingleFlight()
+        threads, results = self.run_in_threads(flights, 3, fetch)
+        wait_until(lambda: flights.shared == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True])
+        self.assertTrue(all(result is results[0][0] for result, _ in results))
+        self.assertEqual(flights.stats(), {"executed": 1, "shared": 2, "in_flight": 0})
+
+        # Виняток отримують усі учасники, а наступний виклик виконується заново
+        release.clear()
+
+        def failing(cancel_event):
+            release.wait(5)
+            raise RuntimeError("503")
+
+        threads, results = self.run_in_threads(flights, 2, failing)
+        wait_until(lambda: flights.shared == 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flights.do("dune", lambda cancel_event: "again"), ("again", False))
+
+    def test_shared_cancel_needs_every_participant(self):
+        import threading
+        first, second = threading.Event(), threading.Event()
+        cancel = SharedCancel()
+        cancel.events += [first, second]
+
+        first.set()
+        self.assertFalse(cancel.is_set())
+        self.assertFalse(cancel.wait(0.01))
+        second.set()
+        self.assertTrue(cancel.wait(0.01))
+
+        # Учасник, що чекає, виходить зі своїм скасуванням, не чекаючи на результат
+        release, own_cancel = threading.Event(), threading.Event()
+        flights = SingleFlight()
+        threads, _ = self.run_in_threads(flights, 1, lambda cancel_event: release.wait(5))
+        wait_until(lambda: flights.stats()["in_flight"] == 1)
+        own_cancel.set()
+        with self.assertRaises(FlightCancelled):
+            flights.do("dune", lambda cancel_event: None, own_cancel)
+        release.set()
+        threads[0].join()
+
+    def test_superseded_search_keeps_shared_fetch(self):
+        import threading
+        from books_api import SearchCancelled
+        started, release = threading.Event(), threading.Event()
+        fetches = []
+
+        def fake_fetch(query, *args, cancel_event=None, **kwargs):
+            fetches.append(query)
+            started.set()
+            while not release.wait(0.01):
+                if cancel_event.is_set():
+                    raise SearchCancelled()
+            return {"items": [{"volumeInfo": {"title": "Dune"}}]}, {"bytes": 10, "parse_time": 0.0, "items": 1}
+
+        flights = SingleFlight()
+        old = SearchWorker("Dune", flights=flights)
+        new = SearchWorker(" dune", flights=flights)
+        results = {old: [], new: []}
+        for worker in (old, new):
+            worker.signals.finished.connect(lambda data, elapsed, worker=worker: results[worker].append(data))
+
+        with patch("search_backends.fetch_volumes", side_effect=fake_fetch):
+            old_thread = threading.Thread(target=old.run)
+            old_thread.start()
+            started.wait(5)
+            new_thread = threading.Thread(target=new.run)
+            new_thread.start()
+            wait_until(lambda: flights.shared == 1)
+            # Новий пошук скасовує старий, але завантаження потрібне новому і не переривається
+            old.cancel()
+            new_thread.join(0.1)
+            release.set()
+            old_thread.join()
+            new_thread.join()
+        app.processEvents()  # сигнали з інших потоків доставляються через цикл подій
+
+        self.assertEqual(fetches, ["Dune"])
+        self.assertEqual(results[old], [])
+        self.assertEqual(results[new][0]["items"][0]["volumeInfo"]["title"], "Dune")
+
+    @patch("requests.Session.get")
+    def test_cover_download_shared_after_cancel_pending(self, mock_get):
+        import threading
+        release = threading.Event()
+
+        def slow_get(url, **kwargs):
+            release.wait(5)
+            return MagicMock(content=make_image_bytes())
+
+        mock_get.side_effect = slow_get
+        loader = CoverLoader()
+        old_label, new_label, same_label = QLabel(), QLabel(), QLabel()
+
+        loader.load("http://image.url/9", old_label)
+        wait_until(lambda: mock_get.call_count == 1)
+        # Новий пошук прибирає чергу, але завантаження тієї ж обкладинки вже йде
+        loader.cancel_pending()
+        loader.load("http://image.url/9", new_label)
+        loader.load("http://image.url/9", same_label)
+        wait_until(lambda: loader.flights.shared == 1)
+        release.set()
+        loader.threadpool.waitForDone()
+        app.processEvents()
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(loader.coalesced, 2)
+        for label in (new_label, same_label):
+            self.assertEqual(label.pixmap().width(), 140)
+
+
+class TestLazyImports(unittest.TestCase):
+    def loaded_modules(self, code):
+        import json
+        import os
+        import subprocess
+        result = subprocess.run(
+            [sys.executable, "-c", code + "; import json, sys; print(json.dumps(sorted(sys.modules)))"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True,
+            env=dict(os.environ, QT_QPA_PLATFORM="offscreen"))
+        return {name.split(".")[0] for name in json.loads(result.stdout.splitlines()[-1])}
+
+    def test_core_modules_without_qt(self):
+        modules = self.loaded_modules("import book_records, book_grouping, search_memento, observer, "
+                                      "search_cache, session_store, batch_search")
+        self.assertFalse(modules & {"PyQt5", "PIL", "requests", "numpy"})
+
+    def test_main_defers_heavy_dependencies(self):
+        modules = self.loaded_modules("import main")
+        self.assertIn("PyQt5", modules)
+        self.assertFalse(modules & {"PIL", "requests", "numpy", "scipy"})
+
+
+class TestPaginatedSearch(unittest.TestCase):
+    def test_pages_fetched_concurrently_and_merged(self):
+        import threading
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fake_get(url, params, **kwargs):
+            # Бар'єр пропускає потоки лише коли всі 3 запити виконуються одночасно
+            barrier.wait()
+            start = params.get("startIndex", 0)
+            return make_api_response({
+                "totalItems": 100,
+                "items": [{"id": "shared"}] + [{"id": f"book-{start + i}"} for i in range(2)],
+            })
+
+        worker = SearchWorker("python", max_results=40, pages=3)
+        pages = []
+        worker.signals.page_ready.connect(lambda data, page: pages.append(page))
+        with patch("requests.Session.get", side_effect=fake_get):
+            results = run_worker(worker)
+
+        self.assertEqual(sorted(pages), [0, 1, 2])
+        ids = [item["id"] for item in results[0]["items"]]
+        self.assertEqual(ids, ["shared", "book-0", "book-1", "book-40", "book-41", "book-80", "book-81"])
+
+
+class TestStreamingFetch(unittest.TestCase):
+    def test_decoder_yields_items_incrementally(self):
+        from books_api import StreamingVolumesDecoder
+        body = '{"kind": "books#volumes", "totalItems": 12345, "items": [{"id": "a", "t": "Кобзар"}, {"id": "b"}]}'
+        body = body.encode("utf-8")
+        decoder = StreamingVolumesDecoder()
+
+        first = decoder.feed(body[:body.index(b"{\"id\": \"b")])
+        self.assertEqual(first, [{"id": "a", "t": "Кобзар"}])
+
+        rest = []
+        for i in range(body.index(b"{\"id\": \"b"), len(body)):
+            rest += decoder.feed(body[i:i + 1])
+        rest += decoder.feed(b"", final=True)
+        self.assertEqual(rest, [{"id": "b"}])
+        self.assertEqual(decoder.meta, {"kind": "books#volumes", "totalItems": 12345})
+
+    @patch("requests.Session.get")
+    def test_fetch_requests_projection_and_gzip(self, mock_get):
+        from books_api import FIELD_PROJECTIONS, fetch_volumes
+        mock_get.return_value = make_api_response({"items": [{"id": "a"}]})
+
+        data, stats = fetch_volumes("python", fields=FIELD_PROJECTIONS["cards"])
+
+        _, kwargs = mock_get.call_args
+        self.assertEqual(kwargs["params"]["fields"], FIELD_PROJECTIONS["cards"])
+        self.assertIn("gzip", kwargs["headers"]["Accept-Encoding"])
+        self.assertTrue(kwargs["stream"])
+        self.assertEqual(data["items"], [{"id": "a"}])
+        self.assertEqual(stats["items"], 1)
+        self.assertGreater(stats["bytes"], 0)
+
+
+class TestBookListModel(unittest.TestCase):
+    def test_rows_and_lazy_covers(self):
+        from PyQt5.QtCore import Qt
+        from PyQt5.QtGui import QPixmap
+        loader = MagicMock()
+        model = BookListModel(loader)
+        books = [BookLeaf(f"Book {i}", f"http://image.url/{i}", "2020", 4.0) for i in range(3)]
+        model.set_groups([("2020", books[:2]), ("2021", books[2:])])
+
+        self.assertEqual(model.rowCount(), 5)
+        self.assertTrue(model.index(0).data(IsHeaderRole))
+        self.assertEqual(model.index(1).data(Qt.DisplayRole), "Book 0")
+        loader.load.assert_not_called()
+
+        self.assertIsNone(model.index(1).data(Qt.DecorationRole))
+        model.index(1).data(Qt.DecorationRole)
+        loader.load.assert_called_once_with("http://image.url/0")
+
+        model._on_cover_ready("http://image.url/0", QPixmap(140, 200))
+        self.assertIsNotNone(model.index(1).data(Qt.DecorationRole))
+
+    def test_header_font_scaled_under_pixel_stylesheet(self):
+        from results_view import BookListView
+        parent = QWidget()
+        parent.setStyleSheet("QWidget { font-size: 16px; }")
+        model = BookListModel()
+        model.set_groups([("2020", [BookLeaf("Book", None, "2020", 4.0)])])
+        view = BookListView(model, parent)
+        view.ensurePolished()
+        option = view.viewOptions()
+        option.rect = view.visualRect(model.index(0))
+        self.assertEqual(option.font.pixelSize(), 16)
+
+        painter = MagicMock()
+        view.itemDelegate().paint(painter, option, model.index(0))
+        font = painter.setFont.call_args.args[0]
+        self.assertEqual(font.pixelSize(), 19)
+        self.assertTrue(font.bold())
+
+    def test_added_rows_fall_back_when_shown_row_removed(self):
+        from book_grouping import added_rows, group_rows
+        a, b, c = (BookLeaf(title, "", "N/A", "N/A") for title in "abc")
+        shown = group_rows([(None, [a, c])])
+        self.assertEqual(added_rows(shown, group_rows([(None, [a, b, c])])), [(1, (None, b))])
+        self.assertIsNone(added_rows(shown, group_rows([(None, [a, b])])))
+
+
 class TestObserverPattern(unittest.TestCase):
 
     @patch("builtins.print")
@@ -91,11 +1205,96 @@ class TestObserverPattern(unittest.TestCase):
 
         mock_print.assert_not_called()
 
+    def test_automaton_overlapping_and_incremental(self):
+        from keyword_matcher import KeywordAutomaton
+        automaton = KeywordAutomaton()
+        for keyword in ("he", "she", "hers"):
+            automaton.add(keyword)
+        self.assertEqual(sorted(automaton.find("USHERS")), ["he", "hers", "she"])
+
+        automaton.add("us")
+        self.assertEqual(automaton.find_many(["ushers", "ruby"]), [["us", "she", "he", "hers"], []])
+        self.assertEqual(len(automaton), 4)
+
+    @patch("builtins.print")
+    def test_notify_many_batches_page(self, mock_print):
+        notifier = BookNotifier()
+        subscriber = UserKeywordSubscriber()
+        notifier.subscribe(subscriber)
+        subscriber.add_keyword("Python")
+
+        notifier.notify_many(["Fluent Python", "C++ Primer", "Python Cookbook"])
+
+        self.assertEqual([c.args[0] for c in mock_print.call_args_list], [
+            "📢 Found book with 'python': Fluent Python",
+            "📢 Found book with 'python': Python Cookbook",
+        ])
+
+
+
+class TestAsyncNotifier(unittest.TestCase):
+    def make_notifier(self, **kwargs):
+        import threading
+        notifier = BookNotifier(async_dispatch=True, **kwargs)
+        observer = MagicMock()
+        notifier.subscribe(observer)
+        self.addCleanup(notifier.close)
+        return notifier, observer, threading.get_ident()
+
+    def test_delivers_batches_off_caller_thread(self):
+        import threading
+        notifier, observer, caller = self.make_notifier()
+        threads = []
+        observer.update_many.side_effect = lambda books: threads.append(threading.get_ident())
+
+        notifier.notify_many(["A", "B", "C"], ["a", "b", "c"])
+        self.assertTrue(notifier.flush(timeout=5))
+
+        delivered = [book for c in observer.update_many.call_args_list for book in c.args[0]]
+        self.assertEqual(delivered, ["A", "B", "C"])
+        self.assertNotIn(caller, threads)
+
+    def test_suppresses_already_notified_ids(self):
+        notifier, observer, _ = self.make_notifier()
+        notifier.notify_many(["A", "B"], ["a", "b"])
+        notifier.notify_many(["A", "C"], ["a", "c"])  # повторний пошук
+        notifier.flush(timeout=5)
+
+        delivered = [book for c in observer.update_many.call_args_list for book in c.args[0]]
+        self.assertEqual(delivered, ["A", "B", "C"])
+        self.assertEqual(notifier.stats()["suppressed"], 1)
+
+    def test_full_queue_drops_oldest(self):
+        import threading
+        release = threading.Event()
+        notifier, observer, _ = self.make_notifier(max_queue=2, batch_size=1)
+        observer.update_many.side_effect = lambda books: release.wait(5)
+
+        notifier.notify("first")            # потік доставки зайнятий цією книгою
+        while notifier.stats()["queued"]:
+            pass
+        notifier.notify_many(["x", "y", "z"])  # "x" витісняється
+        release.set()
+        notifier.flush(timeout=5)
+
+        delivered = [c.args[0][0] for c in observer.update_many.call_args_list]
+        self.assertEqual(delivered, ["first", "y", "z"])
+        self.assertEqual(notifier.stats()["dropped"], 1)
 
 
 class TestBookRecommender(unittest.TestCase):
     def setUp(self):
-        self.window = BookRecommender()
+        # Без повторів: обкладинки, що завантажуються вже після зняття моків, не затримують tearDown
+        # Кеш обкладинок лише в пам'яті: тести не пишуть у ~/.book_recommender
+        self.window = BookRecommender(thumbnail_cache=ThumbnailCache(), transport=HttpTransport(retries=0))
+
+    def tearDown(self):
+        # Пізні сигнали фонових задач не мають дійти до вже знищеного вікна
+        self.window.cancel_active_search()
+        self.window.threadpool.waitForDone()
+        self.window.cover_loader.threadpool.waitForDone()
+        self.window.index_pool.waitForDone()
+        app.processEvents()
 
     def test_add_keyword_subscription(self):
         self.window.keyword_input.setText("Python")
@@ -107,12 +1306,10 @@ class TestBookRecommender(unittest.TestCase):
         self.assertEqual(self.window.keyword_input.text(), "")
 
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_search_with_mocked_response(self, mock_get):
         # Підготовка мок-даних як відповідь API
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response = make_api_response({
             "items": [
                 {
                     "volumeInfo": {
@@ -124,12 +1321,13 @@ class TestBookRecommender(unittest.TestCase):
                     }
                 }
             ]
-        }
+        })
         mock_get.return_value = mock_response
 
         self.window.search_box.setText("Test")
         self.window.grouping_box.setCurrentText("No Grouping")
         self.window.search()
+        self.wait_for_search()
 
         # Переконуємось, що результати відображені (в лейаутах є віджети)
         self.assertTrue(self.window.results_layout.count() > 0)
@@ -167,6 +1365,371 @@ class TestBookRecommender(unittest.TestCase):
         self.assertTrue(self.window.check_var.isChecked())
         self.assertEqual(self.window.check_var2.isChecked(), memento_redo.show_rating)
 
+    @patch('requests.Session.get')
+    def test_regroup_renders_locally(self, mock_get):
+        self.window.search_box.setText("Python")
+        self.window.handle_search_results({
+            "items": [
+                {"volumeInfo": {"title": "A", "publishedDate": "2001-01-01"}},
+                {"volumeInfo": {"title": "B", "publishedDate": "2002-01-01"}},
+                {"volumeInfo": {"title": "C", "publishedDate": "2001-05-05"}},
+            ]
+        }, 0.0)
+        self.wait_for_render()
+        self.assertEqual(self.window.results_layout.count(), 3)
+
+        self.window.grouping_box.setCurrentText("Group by Year")
+        self.wait_for_render()
+        # 2 заголовки груп + 3 книжки
+        self.assertEqual(self.window.results_layout.count(), 5)
+
+        self.window.check_var.setChecked(False)
+        self.wait_for_render()
+        self.assertEqual(self.window.results_layout.count(), 5)
+
+        mock_get.assert_not_called()
+        self.assertEqual(self.window.history.history[-1].group_mode, "Group by Year")
+
+    def test_large_result_set_uses_list_view(self):
+        self.window.search_box.setText("Python")
+        self.window.handle_search_results({
+            "items": [{"volumeInfo": {"title": f"Book {i}"}} for i in range(150)]
+        }, 0.0)
+
+        self.assertEqual(self.window.results_layout.count(), 0)
+        self.assertEqual(self.window.results_model.rowCount(), 150)
+        self.assertTrue(self.window.scroll_area.isHidden())
+
+    def wait_for_search(self):
+        self.window.threadpool.waitForDone()
+        app.processEvents()
+
+    def wait_for_index(self):
+        self.window.index_pool.waitForDone()
+        app.processEvents()
+
+    def wait_for_render(self):
+        while self.window.result_renderer.active:
+            app.processEvents()
+
+    def test_results_rendered_progressively(self):
+        self.window.search_box.setText("Python")
+        self.window.handle_search_results({
+            "items": [{"volumeInfo": {"title": f"Book {i}"}} for i in range(60)]
+        }, 0.0)
+
+        # Перший екран вже є, решта карток додається між тиками циклу подій
+        first_screen = self.window.results_layout.count()
+        self.assertGreater(first_screen, 0)
+        self.assertLess(first_screen, 60)
+        self.assertTrue(self.window.result_renderer.active)
+        snapshot = self.window.metrics.snapshot()
+        self.assertEqual(snapshot["render_first_screen_seconds"]["count"], 1)
+        self.assertNotIn("render_seconds", snapshot)
+
+        self.wait_for_render()
+        self.assertEqual(self.window.results_layout.count(), 60)
+        self.assertEqual(self.window.metrics.snapshot()["render_seconds"]["count"], 1)
+
+        # Перегрупування скасовує незавершене відображення і починає нове
+        self.window.grouping_box.setCurrentText("Group by First Letter")
+        self.window.handle_search_results({"items": [{"volumeInfo": {"title": "Only"}}]}, 0.0)
+        self.wait_for_render()
+        self.assertEqual(self.window.results_layout.count(), 2)
+
+    def test_new_page_inserts_only_its_rows(self):
+        from PyQt5.QtCore import Qt
+
+        def page(letter):
+            return {"items": [{"id": f"{letter}{i}", "volumeInfo": {"title": f"{letter} {i}"}} for i in range(2)]}
+
+        def shown_widgets():
+            layout = self.window.results_layout
+            return [layout.itemAt(i).widget() for i in range(layout.count())]
+
+        self.window.grouping_box.setCurrentText("Group by First Letter")
+        self.window.search_box.setText("python")
+        self.window.received_pages = {}
+        self.window.handle_search_page(page("B"), 1)
+        self.wait_for_render()
+        shown = shown_widgets()
+        self.assertEqual(len(shown), 3)
+
+        # Сторінка 0 надійшла пізніше: її група стає першою, картки сторінки 1 лишаються тими самими віджетами
+        self.window.handle_search_page(page("A"), 0)
+        self.wait_for_render()
+        widgets = shown_widgets()
+        self.assertEqual(widgets[0].text(), "<h3>A</h3>")
+        self.assertEqual([widget.book.title for widget in widgets[1:3]], ["A 0", "A 1"])
+        self.assertEqual(widgets[3:], shown)
+
+        # У віртуалізованому списку рядки вставляються без скидання моделі
+        self.window.list_view_box.setChecked(True)
+        resets = []
+        self.window.results_model.modelReset.connect(lambda: resets.append(True))
+        self.window.handle_search_page(page("C"), 2)
+        self.assertEqual(resets, [])
+        self.assertEqual(self.window.results_model.rowCount(), 9)
+        self.assertEqual(self.window.results_model.index(6).data(Qt.DisplayRole), "C")
+
+    def test_next_page_prefetched_into_cache(self):
+        def fake_fetch(query, max_results, start_index, **kwargs):
+            return {"items": [{"id": f"v{start_index}", "volumeInfo": {"title": f"Book {start_index}"}}]}, \
+                {"bytes": 0, "parse_time": 0.0, "items": 1}
+
+        self.window.search_box.setText("python")
+        self.window.pages_box.setValue(2)
+        with patch("search_backends.fetch_volumes", side_effect=fake_fetch) as fetch:
+            self.window.search()
+            self.wait_for_search()
+            self.wait_for_search()  # наступна сторінка запускається, коли надходить остання запитана
+        self.assertEqual(sorted(call.args[2] for call in fetch.call_args_list), [0, 40, 80])
+
+        self.window.pages_box.setValue(3)
+        with patch("search_backends.fetch_volumes", side_effect=fake_fetch) as fetch:
+            self.window.search()
+            self.wait_for_search()
+            self.wait_for_search()
+        self.assertEqual([call.args[2] for call in fetch.call_args_list], [120])
+        self.assertEqual([book.title for book in self.window.current_books], ["Book 0", "Book 40", "Book 80"])
+
+    def test_cards_reused_between_searches(self):
+        self.window.search_box.setText("Python")
+        self.window.handle_search_results({
+            "items": [{"volumeInfo": {"title": f"Book {i}", "authors": ["A"]}} for i in range(5)]
+        }, 0.0)
+        self.wait_for_render()
+        created = self.window.widget_pool.created
+
+        # Новий набір результатів прив'язує ті самі картки до інших книг
+        self.window.handle_search_results({
+            "items": [{"volumeInfo": {"title": f"Other {i}"}} for i in range(4)]
+        }, 0.0)
+        self.wait_for_render()
+        self.assertEqual(self.window.widget_pool.created, created)
+        self.assertEqual(self.window.widget_pool.reused, 4)
+        self.assertEqual(self.window.widget_pool.idle_count(), 1)
+        card = self.window.results_layout.itemAt(0).widget()
+        self.assertEqual(card.title_label.text(), "Other 0")
+        self.assertTrue(card.author_label.isHidden())
+
+        # Натискання "Similar" передає книгу, до якої картка прив'язана зараз
+        with patch.object(self.window, "show_similar") as show_similar:
+            self.window.render_results()
+            self.wait_for_render()
+            self.window.results_layout.itemAt(1).widget().similar_button.click()
+        self.assertEqual(show_similar.call_args[0][0].title, "Other 1")
+
+    def test_pool_caps_idle_widgets(self):
+        pool = WidgetPool(max_idle=2)
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        for i in range(3):
+            BookLeaf(f"Book {i}", "", "2020", 4.0).display(layout, pool=pool)
+        pool.recycle(layout)
+        self.assertEqual((layout.count(), pool.idle_count(), pool.discarded), (0, 2, 1))
+
+    def test_newer_search_supersedes_older(self):
+        import threading
+        release_old = threading.Event()
+
+        def fake_fetch(query, *args, cancel_event=None, **kwargs):
+            if query == "old":
+                release_old.wait(5)
+            return {"items": [{"volumeInfo": {"title": f"{query} book"}}]}, \
+                {"bytes": 0, "parse_time": 0.0, "items": 1}
+
+        with patch("search_backends.fetch_volumes", side_effect=fake_fetch):
+            self.window.search_box.setText("old")
+            self.window.search()
+            old_worker = self.window.active_search
+
+            self.window.search_box.setText("new")
+            self.window.search()
+            release_old.set()
+            self.wait_for_search()
+
+        self.assertTrue(old_worker.cancelled)
+        self.assertEqual([book.title for book in self.window.current_books], ["new book"])
+        self.assertEqual(self.window.current_query, "new")
+
+        # Пізній сигнал від скасованого пошуку не перезаписує результати
+        old_worker.signals.finished.emit({"items": [{"volumeInfo": {"title": "late"}}]}, 0.0)
+        self.assertEqual([book.title for book in self.window.current_books], ["new book"])
+
+    def test_live_search_debounced(self):
+        from PyQt5.QtTest import QTest
+        self.window.live_search_box.setChecked(True)
+        with patch("search_backends.fetch_volumes", return_value=({"items": []}, {"bytes": 0, "parse_time": 0.0, "items": 0})) as fetch:
+            for text in ("p", "py", "pyt", "pyth"):
+                self.window.search_box.setText(text)
+            self.assertIsNone(self.window.active_search)
+
+            QTest.qWait(self.window.debounce_timer.interval() + 200)
+            self.wait_for_search()
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(fetch.call_args.args[0], "pyth")
+
+    def test_undo_redo_use_result_snapshots(self):
+        def fake_fetch(query, *args, **kwargs):
+            return {"items": [{"volumeInfo": {"title": f"{query} book"}}]}, \
+                {"bytes": 0, "parse_time": 0.0, "items": 1}
+
+        with patch("search_backends.fetch_volumes", side_effect=fake_fetch):
+            for query in ("first", "second"):
+                self.window.search_box.setText(query)
+                self.window.search()
+                self.wait_for_search()
+
+        with patch("search_backends.fetch_volumes") as fetch:
+            self.window.undo_search()
+            self.assertEqual([book.title for book in self.window.current_books], ["first book"])
+            self.window.redo_search()
+            self.assertEqual([book.title for book in self.window.current_books], ["second book"])
+            self.wait_for_search()
+            fetch.assert_not_called()
+
+    def test_source_selector_has_own_label(self):
+        layout = self.window.layout
+        pages_label = layout.itemAt(layout.indexOf(self.window.pages_box) - 1).widget()
+        self.assertTrue(pages_label.text().startswith("Pages"))
+        self.assertEqual(layout.indexOf(self.window.source_label) + 1, layout.indexOf(self.window.source_box))
+
+    def test_undo_does_not_trigger_live_search(self):
+        from PyQt5.QtTest import QTest
+        self.window.live_search_box.setChecked(True)
+        with patch("search_backends.fetch_volumes", return_value=({"items": []}, {"bytes": 0, "parse_time": 0.0, "items": 0})):
+            for query in ("first", "second"):
+                self.window.search_box.setText(query)
+                self.window.search()
+                self.wait_for_search()
+
+            self.window.undo_search()
+            QTest.qWait(self.window.debounce_timer.interval() + 200)
+            self.wait_for_search()
+
+            self.assertEqual([m.query for m in self.window.history.history], ["first"])
+            self.assertEqual([m.query for m in self.window.history.future], ["second"])
+            self.assertEqual(self.window.history.redo().query, "second")
+
+    def test_neighbors_prefetched_in_background(self):
+        self.window.history.save(SearchMemento("older", "No Grouping", True, True))
+        self.window.history.save(SearchMemento("newer", "No Grouping", True, True))
+        self.assertEqual([m.query for m in self.window.history.neighbors()], ["older"])
+
+        with patch("search_backends.fetch_volumes", return_value=(
+                {"items": [{"volumeInfo": {"title": "Prefetched"}}]},
+                {"bytes": 0, "parse_time": 0.0, "items": 1})) as fetch:
+            self.window.prefetch_neighbors()
+            self.wait_for_search()
+
+        self.assertEqual(fetch.call_args.args[0], "older")
+        older = self.window.history.history[-2]
+        self.assertEqual([book.title for book in older.results], ["Prefetched"])
+        self.assertIsNone(self.window.history.history[-1].results)
+
+    def test_session_restored_without_network(self):
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/session.sqlite3"
+            first = BookRecommender(session=SessionStore(path), thumbnail_cache=ThumbnailCache())
+            first.keyword_input.setText("Python")
+            first.add_keyword_subscription()
+            first.search_box.setText("python")
+            first.save_current_state_as_memento()
+            first.handle_search_results({"items": [{"volumeInfo": {"title": "Saved Book"}}]}, 0.0)
+            self.assertTrue(first.session_timer.isActive())  # запис відкладено до закриття або паузи
+            first.close()
+            first.session.close()
+
+            with patch("search_backends.fetch_volumes") as fetch:
+                second = BookRecommender(session=SessionStore(path), thumbnail_cache=ThumbnailCache())
+                self.wait_for_search()
+                fetch.assert_not_called()
+            self.assertEqual(second.search_box.text(), "python")
+            self.assertEqual([book.title for book in second.current_books], ["Saved Book"])
+            self.assertEqual(second.keywords_label.text(), "Subscribed keywords: python")
+            second.session.close()
+
+    def test_similar_books_from_received_results(self):
+        from books_api import FIELD_PROJECTIONS
+        with patch("search_backends.fetch_volumes", return_value=(
+                {"items": TestSimilarBooks.VOLUMES}, {"bytes": 0, "parse_time": 0.0, "items": 4})) as fetch:
+            self.window.search_box.setText("python")
+            self.window.search()
+            self.wait_for_search()
+        self.assertEqual(fetch.call_args.kwargs["fields"], FIELD_PROJECTIONS["cards"])
+
+        with patch("search_backends.fetch_volumes") as fetch, \
+                patch("search_backends.fetch_volume_text", return_value=(("Computers",), "Programming guide")) as text:
+            self.window.show_similar(self.window.current_books[0])
+            self.wait_for_index()
+            fetch.assert_not_called()
+        self.assertEqual(text.call_args.args[0], "a")
+        self.assertEqual([book.volume_id for book in self.window.current_books], ["b", "c"])
+        self.assertEqual(self.window.status_label.text(), "2 books similar to 'Learning Python'")
+        self.wait_for_render()
+        self.assertEqual(self.window.results_layout.count(), 2)
+
+        # Зміна групування перегруповує схожі книги, а не повторює запит з поля пошуку
+        with patch("search_backends.fetch_volumes") as fetch:
+            self.window.grouping_box.setCurrentIndex(self.window.grouping_box.findText("Group by Year"))
+            self.wait_for_render()
+            fetch.assert_not_called()
+        self.assertIsNone(self.window.active_search)
+        self.assertEqual([book.volume_id for book in self.window.current_books], ["b", "c"])
+        self.assertEqual(len(self.window.history.history), 1)
+
+    def test_similar_index_updated_off_gui_thread(self):
+        import threading
+        threads = []
+        with patch.object(SimilarBooksIndex, "add_volumes", autospec=True,
+                          side_effect=lambda *args: threads.append(threading.current_thread())):
+            self.window.search_box.setText("python")
+            self.window.handle_search_results({"items": TestSimilarBooks.VOLUMES}, 0.0)
+            self.wait_for_index()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+    def test_index_error_replaces_index_instead_of_crashing(self):
+        broken = MagicMock()
+        broken.add_volumes.side_effect = ValueError("n_features mismatch")
+        broken.similar.side_effect = ValueError("n_features mismatch")
+        self.window.similar_index = broken
+        self.window.search_box.setText("python")
+        self.window.handle_search_results({"items": TestSimilarBooks.VOLUMES}, 0.0)
+        self.wait_for_index()
+        self.assertEqual(self.window.metrics.snapshot()["similar_index_errors_total"], 1)
+        self.assertIsInstance(self.window.similar_index, SimilarBooksIndex)
+
+        self.window.similar_index = broken
+        book = self.window.current_books[0]
+        with patch("search_backends.fetch_volume_text", return_value=((), "")):
+            self.window.show_similar(book)
+            self.wait_for_index()
+        self.assertIsNone(self.window.similar_search)
+        self.assertIn("n_features mismatch", self.window.status_label.text())
+        self.assertEqual([b.title for b in self.window.current_books][0], book.title)
+
+    def test_search_stages_recorded_in_metrics(self):
+        with patch("search_backends.fetch_volumes", return_value=(
+                {"items": [{"volumeInfo": {"title": "Metered"}}]}, {"bytes": 100, "parse_time": 0.002, "items": 1})):
+            self.window.search_box.setText("metered")
+            self.window.search()
+            self.wait_for_search()
+
+        snapshot = self.window.metrics.snapshot()
+        for stage in ("search_fetch_seconds", "search_parse_seconds", "records_parse_seconds",
+                      "grouping_seconds", "render_seconds"):
+            self.assertEqual(snapshot[stage]["count"], 1, stage)
+        self.assertEqual(snapshot["search_bytes_total"], 100)
+        self.assertEqual(snapshot["search_cache_misses"], 1)
+
+        self.window.metrics_box.setChecked(True)
+        self.assertTrue(self.window.metrics_overlay.isVisibleTo(self.window))
+        self.assertIn("render_seconds: n=1", self.window.metrics_overlay.text())
+
     def test_add_duplicate_keyword_ignored(self):
         self.window.keyword_input.setText("Python")
         self.window.add_keyword_subscription()
@@ -0,0 +1,69 @@
+# Пул віджетів результатів для повторного використання між пошуками
+
+DEFAULT_MAX_IDLE = 128  # скільки прихованих віджетів одного типу тримати; вистачає на список до VIRTUAL_VIEW_THRESHOLD книг
+
+
+class WidgetPool:
+    """
+    Вільні віджети результатів (картки книг, заголовки груп) за типами.
+
+    Замість видалення перед кожним пошуком віджети виймаються з layout,
+    ховаються і чекають у пулі; наступне відображення прив'язує їх до
+    нових даних (bind()) замість створення нових QFrame і QLabel. Віджети
+    лишаються дочірніми для контейнера результатів, тож повторне додавання
+    не змінює батька.
+
+    Args:
+        max_idle (int, optional): Найбільша кількість вільних віджетів одного
+            типу. Зайві віджети видаляються, щоб пул не тримав пам'ять після
+            великого набору результатів.
+
+    Attributes:
+        created (int): Створено нових віджетів.
+        reused (int): Видано віджетів з пулу.
+        discarded (int): Видалено віджетів понад max_idle.
+    """
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE):
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self._idle = {}  # тип віджета -> список прихованих віджетів
+
+    def acquire(self, widget_type):
+        """
+        Повертає вільний віджет типу widget_type або створює новий.
+
+        Віджет з пулу прихований: після додавання в layout його треба показати.
+        """
+        idle = self._idle.get(widget_type)
+        if idle:
+            self.reused += 1
+            return idle.pop()
+        self.created += 1
+        return widget_type()
+
+    def release(self, widget):
+        """
+        Ховає віджет і повертає його в пул (або видаляє, якщо пул повний).
+        """
+        idle = self._idle.setdefault(type(widget), [])
+        if len(idle) < self.max_idle:
+            widget.hide()
+            idle.append(widget)
+        else:
+            self.discarded += 1
+            widget.setParent(None)
+            widget.deleteLater()
+
+    def recycle(self, layout):
+        """
+        Виймає всі віджети з layout і повертає їх у пул.
+        """
+        while layout.count():
+            widget = layout.takeAt(layout.count() - 1).widget()
+            if widget is not None:
+                self.release(widget)
+
+    def idle_count(self):
+        return sum(len(idle) for idle in self._idle.values())